@@ -4,7 +4,7 @@
 #                                                                             
 # PROGRAMMER: Jennifer S.
 # DATE CREATED: 04/19/2018                                  
-# REVISED DATE: 
+# REVISED DATE: 10/17/2026 - matches looked up in a precomputed match index
 # PURPOSE: Alternative Programming of classify_images function using in 
 #          operation to simply function
 #
@@ -17,8 +17,14 @@ import argparse
 from time import time, sleep
 from os import listdir
 
-# Imports classifier function for using CNN to classify images 
-from classifier import classifier 
+import numpy as np
+
+# Imports classifier function for using CNN to classify images & the
+# compiled ImageNet label table
+from classifier import classify_batch, label_table
+
+# Imports precomputed matches of pet image labels & ImageNet classes
+from match_index import get_match_index
 
 # Main program function defined below
 def main():
@@ -84,15 +90,14 @@ def main():
     
 
 # Functions defined below
-def classify_images(images_dir, petlabel_dic, model):
+def classify_images(images_dir, petlabel_dic, model, batch_size=32):
     """
     Creates classifier labels with classifier function, compares labels, and 
     creates a dictionary containing both labels and comparison of them to be
     returned.
-     PLEASE NOTE: This function uses the classifier() function defined in 
-     classifier.py within this function. The proper use of this function is
-     in test_classifier.py Please refer to this program prior to using the 
-     classifier() function to classify images in this function 
+     PLEASE NOTE: This function uses the classify_batch() function defined 
+     in classifier.py within this function, which classifies the images in
+     batches and returns the same labels the classifier() function would 
      Parameters: 
       images_dir - The (full) path to the folder of images that are to be
                    classified by pretrained CNN models (string)
@@ -102,6 +107,8 @@ def classify_images(images_dir, petlabel_dic, model):
                      label is lowercase with space between each word in label 
       model - pretrained CNN whose architecture is indicated by this parameter,
               values must be: resnet alexnet vgg (string)
+      batch_size - most images classified in one forward pass of the model
+                   (int)
      Returns:
       results_dic - Dictionary with key as image filename and value as a List 
              (index)idx 0 = pet image label (string)
@@ -109,69 +116,80 @@ def classify_images(images_dir, petlabel_dic, model):
                     idx 2 = 1/0 (int)   where 1 = match between pet image and 
                     classifer labels and 0 = no match between labels
     """
-    # Creates dictionary that will have all the results key = filename
-    # value = list [Pet Label, Classifier Label, Match(1=yes,0=no)]
-    results_dic = dict()
-
-    # Process all files in the petlabels_dic - use images_dir to give fullpath
-    for key in petlabel_dic:
-       
-       # Runs classifier function to classify the images classifier function 
-       # inputs: path + filename  and  model, returns model_label 
-       # as classifier label
-       model_label = classifier(images_dir+key, model)
-       
-       # Processes the results so they can be compared with pet image labels
-       # set labels to lowercase (lower) and stripping off whitespace(strip)
-       model_label = model_label.lower()
-       model_label = model_label.strip()
-      
-       # Put separate terms that 'may' compose the classifier label into a list so
-       # that each term is an item in the list.
-       model_label_list = model_label.split(", ")
-       
-       # defines truth as pet image label 
-       truth = petlabel_dic[key]
-       
-       # If the pet image label is found within the classifier label list of terms 
-       # as an exact match to on of the terms in the list - then they are added to 
-       # results_dic as an exact match
-       if truth in model_label_list:
-           results_dic[key] = [truth, model_label, 1]
-            
-       # For those that aren't an exact term match to a term - checks if the pet_label
-       # is part of the term like: "poodle" matching to "standard poodle" OR 
-       # "cat" matching to "tabby cat" 
-       else:
-           # Sets found to False - IF pet image label is FOUND as part of a term within
-           # the list of classifier label terms then will be set to True
-           found = False
-           
-           # For loop to iterate through each term from model_label_list - splitting the
-           # the term into words where truth is compare to each word to see if there is
-           # a match - if so they are added to results_dic as a match and found = True
-           # and searching through the for loop is terminated using the break
-           for term in model_label_list:
+    # Runs classify_batch function to classify all the images in batches - 
+    # inputs: list of path + filename, model and batch size, returns list of 
+    # ImageNet class indexes of the classifier labels in the same order as
+    # the filenames
+    filenames = list(petlabel_dic)
+    img_paths = [images_dir + key for key in filenames]
+    class_ids = np.array(classify_batch(img_paths, model, batch_size,
+                                        return_ids=True), dtype=np.int64)
 
-               # splits the term into a word list using split()
-               word_list = term.split(" ")
+    # defines truth as pet image label of each file
+    truths = [petlabel_dic[key] for key in filenames]
 
-               # if the pet image label hasn't been found AND it exists in the word list
-               # like 'poodle' in ['standard', 'poodle'] or 'cat' in ['tabby', 'cat']
-               # then found = True, the results are added to results_dic and break is
-               # used to break out of the for loop since a match was found
-               if (not found) and truth in word_list:
-                   found = True
-                   results_dic[key] = [truth, model_label, 1]
-                   break 
+    # Looks up the match of each pet image label & classifier label in the
+    # precomputed match index - label_match() below only runs once for each
+    # distinct pet image label & ImageNet class, not once for every image
+    match_index = get_match_index(set(truths), label_table.normalized,
+                                  label_match)
+    matches = match_index.lookup(match_index.truth_codes(truths), class_ids)
 
-           # If pet image label isn't found within the terms that exist in the list of labels
-           # the classifier function produces then set match = 0 (not a match)
-           if not found:
-               results_dic[key] = [truth, model_label, 0]
+    # Creates dictionary that will have all the results key = filename
+    # value = list [Pet Label, Classifier Label, Match(1=yes,0=no)] where
+    # the classifier label is lowercase & stripped of whitespace
+    results_dic = dict()
+    for key, truth, class_id, match in zip(filenames, truths,
+                                           class_ids.tolist(),
+                                           matches.tolist()):
+       results_dic[key] = [truth, label_table.normalized[class_id], match]
                                   
     # Return results dictionary
     return(results_dic)
+
+
+def label_match(truth, model_label):
+    """
+    Checks whether the pet image label is one of the terms of the classifier
+    label, or one of the words of a term, using the operator 'in'.
+     Parameters: 
+      truth - pet image label, lowercase with space between words (string)
+      model_label - classifier label, lowercase & stripped (string)
+     Returns:
+      match - 1 if pet image label is a term or a word of a term in the
+              classifier label and 0 if not (int)
+    """
+    # Put separate terms that 'may' compose the classifier label into a list so
+    # that each term is an item in the list.
+    model_label_list = model_label.split(", ")
+    
+    # If the pet image label is found within the classifier label list of terms 
+    # as an exact match to on of the terms in the list - then it's an exact
+    # match
+    if truth in model_label_list:
+        return 1
+         
+    # For those that aren't an exact term match to a term - checks if the pet_label
+    # is part of the term like: "poodle" matching to "standard poodle" OR 
+    # "cat" matching to "tabby cat" 
+    #
+    # For loop to iterate through each term from model_label_list - splitting the
+    # the term into words where truth is compare to each word to see if there is
+    # a match - if so it's a match and searching through the for loop is
+    # terminated using the return
+    for term in model_label_list:
+
+        # splits the term into a word list using split()
+        word_list = term.split(" ")
+
+        # if the pet image label exists in the word list like 'poodle' in 
+        # ['standard', 'poodle'] or 'cat' in ['tabby', 'cat'] then it's a match
+        if truth in word_list:
+            return 1
+
+    # If pet image label isn't found within the terms that exist in the list of labels
+    # the classifier function produces then it's not a match
+    return 0
                 
                 
 # Call to main function to run the program
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/autotune.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Finds the fastest CPU settings for each architecture in
+#          classifier.py on this host by sweeping:
+#           - intra-op threads - threads used inside one layer (e.g. a conv)
+#           - inter-op threads - threads running independent layers at once
+#           - memory format    - channels-last (NHWC) vs contiguous (NCHW)
+#           - batch size       - images per forward pass
+#          Each setting is timed on batches of random images, so no image
+#          folder is needed. The best settings are saved to
+#          classifier.tuning_config_path under this host's name, and
+#          classifier.py applies them automatically when it's imported.
+#          Inter-op threads can only be set once per process, so each
+#          inter-op thread count is timed in its own child process that
+#          doesn't apply the saved settings.
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python autotune.py --arch <models> --threads <thread counts>
+#             --batch_sizes <batch sizes>
+#   Example calls:
+#    python autotune.py
+#    python autotune.py --arch resnet --threads 4,8,16 --batch_sizes 16,64
+##
+
+# Imports python modules
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+from time import time
+
+import torch
+
+# Imports classifier model registry, preprocessing sizes & tuning file
+import classifier
+from inference_backends import TorchBackend
+
+
+# Main program function defined below
+def main():
+    # Creates & retrieves Command Line Arguments
+    in_arg = get_input_args()
+    arch_list = in_arg.arch.split(',')
+    thread_counts = [int(count) for count in in_arg.threads.split(',')]
+    batch_sizes = [int(size) for size in in_arg.batch_sizes.split(',')]
+
+    # Child process started by sweep_interop_threads() - times the given
+    # settings with inter-op threads set before any other pytorch work and
+    # prints the results as JSON
+    if in_arg.interop_threads:
+        torch.set_num_interop_threads(in_arg.interop_threads)
+        print(json.dumps(sweep_settings(arch_list, thread_counts, batch_sizes,
+                                        in_arg.n_runs)))
+        return
+
+    check_tuning_support()
+
+    # Times every setting once for each inter-op thread count
+    results_by_interop = sweep_interop_threads(arch_list, thread_counts,
+                                               batch_sizes, in_arg.n_runs)
+    num_interop_threads, arch_tuning = best_settings(results_by_interop)
+    print_tuning(num_interop_threads, arch_tuning)
+
+    save_tuning_config(classifier.tuning_config_path, num_interop_threads,
+                       arch_tuning)
+    print("\nSaved settings for host %s to %s" %
+          (socket.gethostname(), classifier.tuning_config_path))
+
+
+# Functions defined below
+def get_input_args():
+    """
+    Retrieves and parses the command line arguments created and defined using
+    the argparse module. This function returns these arguments as an
+    ArgumentParser object.
+    Parameters:
+     None - simply using argparse module to create & store command line arguments
+    Returns:
+     parse_args() -data structure that stores the command line arguments object
+    """
+    n_cpus = os.cpu_count() or 1
+    default_threads = sorted(set([1, max(1, n_cpus // 4), max(1, n_cpus // 2),
+                                  n_cpus]))
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--arch', type=str, default='resnet,alexnet,vgg',
+                        help='comma separated models to tune')
+    parser.add_argument('--threads', type=str,
+                        default=','.join(str(count) for count in
+                                         default_threads),
+                        help='comma separated intra-op & inter-op thread '
+                             'counts to try')
+    parser.add_argument('--batch_sizes', type=str, default='8,32,64',
+                        help='comma separated batch sizes to try')
+    parser.add_argument('--n_runs', type=int, default=3,
+                        help='timed forward passes of each setting')
+
+    # Used internally to time one inter-op thread count in a new process
+    parser.add_argument('--interop_threads', type=int, default=0,
+                        help=argparse.SUPPRESS)
+
+    return parser.parse_args()
+
+
+def check_tuning_support():
+    """
+    Raises RuntimeError if the installed pytorch can't set its thread counts.
+    Parameters:
+     None
+    Returns:
+     None
+    """
+    if not hasattr(torch, 'set_num_interop_threads'):
+        raise RuntimeError("autotuning needs pytorch 1.2 or higher "
+                           "(installed: " + torch.__version__ + ")")
+
+
+def time_forward(backend, batch_tensor, n_runs):
+    """
+    Measures the images per second of a backend's forward pass on one batch
+    after a warmup pass.
+    Parameters:
+     backend - TorchBackend of the model timed
+     batch_tensor - (batch)x3x224x224 tensor of images
+     n_runs - number of timed forward passes (int)
+    Returns:
+     images_per_sec - images classified per second (float)
+    """
+    # warmup
+    backend.forward(batch_tensor)
+
+    start_time = time()
+    for _ in range(n_runs):
+        backend.forward(batch_tensor)
+    return batch_tensor.size(0) * n_runs / (time() - start_time)
+
+
+def sweep_settings(arch_list, thread_counts, batch_sizes, n_runs=3):
+    """
+    Times every combination of intra-op threads, memory format & batch size
+    for each architecture in this process.
+    Parameters:
+     arch_list - CNN architectures, values must be: resnet alexnet vgg (list
+                 of strings)
+     thread_counts - intra-op thread counts to try (list of ints)
+     batch_sizes - batch sizes to try (list of ints)
+     n_runs - timed forward passes of each setting (int)
+    Returns:
+     results - list of dictionaries with keys 'arch', 'num_threads',
+               'channels_last', 'batch_size' & 'images_per_sec'
+    """
+    memory_formats = [False, True] if hasattr(torch, 'channels_last') \
+        else [False]
+    batches = dict((batch_size, torch.randn(batch_size, 3,
+                                            classifier.crop_size,
+                                            classifier.crop_size))
+                   for batch_size in batch_sizes)
+
+    results = []
+    for arch in arch_list:
+        for channels_last in memory_formats:
+            # Builds the model with random weights - only its speed matters
+            backend = TorchBackend(classifier.model_builders[arch](),
+                                   channels_last=channels_last)
+            for num_threads in thread_counts:
+                backend.num_threads = num_threads
+                for batch_size in batch_sizes:
+                    results.append({
+                        'arch': arch,
+                        'num_threads': num_threads,
+                        'channels_last': channels_last,
+                        'batch_size': batch_size,
+                        'images_per_sec': time_forward(backend,
+                                                       batches[batch_size],
+                                                       n_runs)})
+    return results
+
+
+def sweep_interop_threads(arch_list, thread_counts, batch_sizes, n_runs=3):
+    """
+    Runs sweep_settings() in a new process for each inter-op thread count,
+    since inter-op threads can't be changed once pytorch has started.
+    Parameters:
+     arch_list - CNN architectures, values must be: resnet alexnet vgg (list
+                 of strings)
+     thread_counts - intra-op & inter-op thread counts to try (list of ints)
+     batch_sizes - batch sizes to try (list of ints)
+     n_runs - timed forward passes of each setting (int)
+    Returns:
+     results_by_interop - Dictionary with key as the inter-op thread count
+                          and value as the results of sweep_settings()
+    """
+    # Children skip the saved settings so they can set inter-op threads
+    child_env = dict(os.environ, CLASSIFIER_TUNING_CONFIG='')
+
+    results_by_interop = dict()
+    for num_interop_threads in thread_counts:
+        print("Timing %d inter-op thread(s)..." % num_interop_threads)
+        output = subprocess.check_output(
+            [sys.executable, os.path.abspath(__file__),
+             '--arch', ','.join(arch_list),
+             '--threads', ','.join(str(count) for count in thread_counts),
+             '--batch_sizes', ','.join(str(size) for size in batch_sizes),
+             '--n_runs', str(n_runs),
+             '--interop_threads', str(num_interop_threads)], env=child_env)
+        results_by_interop[num_interop_threads] = json.loads(
+            output.decode('utf-8').strip().splitlines()[-1])
+    return results_by_interop
+
+
+def best_settings(results_by_interop):
+    """
+    Picks the inter-op thread count that is fastest across all architectures,
+    then the fastest intra-op threads, memory format & batch size of each
+    architecture with that inter-op thread count.
+    Parameters:
+     results_by_interop - Dictionary from sweep_interop_threads()
+    Returns:
+     num_interop_threads - best inter-op thread count (int)
+     arch_tuning - Dictionary with key as architecture and value as the
+                   dictionary of its best result from sweep_settings()
+    """
+    def best_by_arch(results):
+        arch_tuning = dict()
+        for result in results:
+            best = arch_tuning.get(result['arch'])
+            if best is None or result['images_per_sec'] > \
+                    best['images_per_sec']:
+                arch_tuning[result['arch']] = result
+        return arch_tuning
+
+    # Inter-op threads are shared by every model in the process, so the best
+    # count is the one with the highest speed relative to the fastest run of
+    # each architecture, averaged over the architectures
+    best_by_interop = dict((num_interop_threads, best_by_arch(results))
+                           for num_interop_threads, results in
+                           results_by_interop.items())
+    fastest = dict()
+    for arch_tuning in best_by_interop.values():
+        for arch, result in arch_tuning.items():
+            fastest[arch] = max(fastest.get(arch, 0.0),
+                                result['images_per_sec'])
+
+    def mean_speed_ratio(num_interop_threads):
+        arch_tuning = best_by_interop[num_interop_threads]
+        return sum(result['images_per_sec'] / fastest[arch]
+                   for arch, result in arch_tuning.items()) / len(arch_tuning)
+
+    num_interop_threads = max(best_by_interop, key=mean_speed_ratio)
+    return num_interop_threads, best_by_interop[num_interop_threads]
+
+
+def print_tuning(num_interop_threads, arch_tuning):
+    """
+    Prints the best settings found for each architecture.
+    Parameters:
+     num_interop_threads - best inter-op thread count (int)
+     arch_tuning - Dictionary from best_settings()
+    Returns:
+     None - simply printing results.
+    """
+    print("\n*** Best CPU Settings (%d inter-op threads) ***" %
+          num_interop_threads)
+    print("%10s%14s%14s%14s%14s" % ('', 'threads', 'layout', 'batch_size',
+                                    'images/sec'))
+    for arch, result in sorted(arch_tuning.items()):
+        print("%10s%14d%14s%14d%14.1f" %
+              (arch, result['num_threads'],
+               'NHWC' if result['channels_last'] else 'NCHW',
+               result['batch_size'], result['images_per_sec']))
+
+
+def save_tuning_config(config_path, num_interop_threads, arch_tuning):
+    """
+    Saves the best settings under this host's name, keeping the settings of
+    other hosts already in the file.
+    Parameters:
+     config_path - path to the JSON file read by classifier.py (string)
+     num_interop_threads - best inter-op thread count (int)
+     arch_tuning - Dictionary from best_settings()
+    Returns:
+     None
+    """
+    config = dict()
+    if os.path.exists(config_path):
+        with open(config_path) as config_file:
+            config = json.load(config_file)
+
+    config[socket.gethostname()] = {
+        'num_interop_threads': num_interop_threads,
+        'archs': dict((arch, {'num_threads': result['num_threads'],
+                              'channels_last': result['channels_last'],
+                              'batch_size': result['batch_size'],
+                              'images_per_sec': result['images_per_sec']})
+                      for arch, result in arch_tuning.items())}
+
+    # Writes to a temporary file first so classifier.py never reads a partly
+    # written file
+    tmp_path = config_path + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp_path, 'w') as config_file:
+        json.dump(config, config_file, indent=2, sort_keys=True)
+    os.replace(tmp_path, config_path)
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
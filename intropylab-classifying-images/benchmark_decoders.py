@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/benchmark_decoders.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Compares the image decoders of image_decoders.py on a folder of
+#          images: the images per second each decoder decodes & crops, and
+#          how many of the chosen model's predictions change compared with
+#          the pil decoder (the decoder used before decoders could be
+#          chosen).
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python benchmark_decoders.py --dir <directory with images>
+#             --arch <model>
+#   Example call:
+#    python benchmark_decoders.py --dir pet_images/ --arch resnet
+##
+
+# Imports python modules
+import argparse
+import os
+from time import time
+
+# Imports classifier preprocessing & decoders
+import classifier
+from image_decoders import decoder_names
+
+# Imports scanner of the folder of images
+from image_scanner import scan_images
+
+
+# Main program function defined below
+def main():
+    # Creates & retrieves Command Line Arguments
+    in_arg = get_input_args()
+
+    # The same images check_images_solution.py classifies - files that
+    # aren't images are skipped
+    img_paths = [os.path.join(in_arg.dir, rel_path) for rel_path, _ in
+                 sorted(scan_images(in_arg.dir))]
+
+    print("*** Image Decoders (%d images, %s) ***" % (len(img_paths),
+                                                     in_arg.arch))
+    print("%14s%14s%14s%14s" % ('decoder', 'images/sec', 'n_changed',
+                                'pct_changed'))
+    pil_ids = None
+    changed_by_decoder = dict()
+    for decoder_name in decoder_names:
+        try:
+            images_per_sec = benchmark_decode(img_paths, decoder_name)
+        except RuntimeError as error:
+            print("%14s  skipped: %s" % (decoder_name, error))
+            continue
+
+        # Classifies the images with this decoder - pil comes first in
+        # decoder_names so the other decoders are compared with it. Class
+        # indexes are compared since a few labels (like crane) are shared by
+        # two classes
+        classifier.set_image_decoder(decoder_name)
+        class_ids = classifier.classify_batch(img_paths, in_arg.arch,
+                                              return_ids=True)
+        if pil_ids is None:
+            pil_ids = class_ids
+        changed_by_decoder[decoder_name] = [
+            img_path for img_path, class_id, pil_id in
+            zip(img_paths, class_ids, pil_ids) if class_id != pil_id]
+
+        n_changed = len(changed_by_decoder[decoder_name])
+        print("%14s%14.1f%14d%14.1f" % (decoder_name, images_per_sec,
+                                        n_changed,
+                                        n_changed / len(img_paths) * 100.0))
+
+    # Lists the images whose predictions changed
+    for decoder_name, changed in changed_by_decoder.items():
+        for img_path in changed:
+            print("%14s changed: %s" % (decoder_name, img_path))
+
+
+# Functions defined below
+def get_input_args():
+    """
+    Retrieves and parses the command line arguments created and defined using
+    the argparse module. This function returns these arguments as an
+    ArgumentParser object.
+    Parameters:
+     None - simply using argparse module to create & store command line arguments
+    Returns:
+     parse_args() -data structure that stores the command line arguments object
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dir', type=str, default='pet_images/',
+                        help='path to folder of images')
+    parser.add_argument('--arch', type=str, default='resnet',
+                        help='model whose predictions are compared')
+    return parser.parse_args()
+
+
+def benchmark_decode(img_paths, decoder_name):
+    """
+    Measures the images per second one decoder decodes & crops, after a
+    warmup image.
+    Parameters:
+     img_paths - paths to the image files (list of strings)
+     decoder_name - name of the decoder, one of decoder_names (string)
+    Returns:
+     images_per_sec - images decoded & cropped per second (float)
+    """
+    # warmup - also raises RuntimeError if the decoder isn't available
+    classifier.decode_crop(img_paths[0], decoder_name)
+
+    start_time = time()
+    for img_path in img_paths:
+        classifier.decode_crop(img_path, decoder_name)
+    return len(img_paths) / (time() - start_time)
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
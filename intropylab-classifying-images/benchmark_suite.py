@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/benchmark_suite.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Benchmarks classifier.py & the stages of check_images_solution.py
+#          without network access, so a change can be checked for speedups or
+#          slowdowns. Everything it measures runs on generated data:
+#           - synthetic JPEGs at several resolutions, written to a temporary
+#             folder
+#           - models with random weights (only their speed matters), or with
+#             the locally stored weights with --weights local (exported
+#             models or weights already downloaded by torchvision)
+#          It measures:
+#           - latency/<arch>/<resolution> - p50 & p99 milliseconds to classify
+#             one image with classifier()
+#           - throughput/<arch>/batch_<size> - images per second of the
+#             model's forward pass at each batch size
+#           - scale/<stage>/<images> - seconds of get_pet_labels() (on a
+#             folder of empty image files), the label matching of
+#             classify_images(), adjust_results4_isadog() and
+#             calculates_results_stats() at 10^3 to 10^6 images
+#          Results are saved as one flat JSON dictionary of metrics. Given
+#          a saved baseline, the metrics are compared with it and the program
+#          exits with status 1 if any is slower than the tolerance.
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python benchmark_suite.py --arch <models> --output <JSON file>
+#             --baseline <JSON file of an earlier run>
+#   Example calls:
+#    python benchmark_suite.py --output baseline.json
+#    python benchmark_suite.py --output current.json --baseline baseline.json
+##
+
+# Imports python modules
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import sys
+import tempfile
+from time import perf_counter
+from urllib.parse import urlsplit
+
+import numpy as np
+import torch
+import torchvision.models as models
+from PIL import Image
+
+# Imports classifier models & sessions
+import classifier
+
+# Imports the stages of check_images_solution.py that are benchmarked
+from check_images_solution import get_pet_labels, compare_labels
+from results_stats import adjust_results4_isadog, calculates_results_stats
+
+# Imports the indexes built by the stages, cleared so each scale starts cold
+from match_index import match_indexes
+from category_index import category_indexes
+
+# Imports percentiles of latencies
+from latency_stats import percentile
+
+# Pet image labels of the synthetic images - the labels of the lab's
+# pet_images folder, dogs & not dogs
+pet_label_names = ['basenji', 'basset hound', 'beagle', 'boston terrier',
+                   'boxer', 'cocker spaniel', 'collie', 'dalmatian',
+                   'german shepherd dog', 'german shorthaired pointer',
+                   'golden retriever', 'great dane', 'great pyrenees',
+                   'miniature schnauzer', 'poodle', 'saint bernard', 'rabbit',
+                   'cat', 'fox squirrel', 'gecko', 'great horned owl',
+                   'polar bear', 'skunk']
+
+
+# Main program function defined below
+def main():
+    # Creates & retrieves Command Line Arguments
+    in_arg = get_input_args()
+    arch_list = in_arg.arch.split(',')
+    resolutions = [tuple(int(size) for size in resolution.split('x'))
+                   for resolution in in_arg.resolutions.split(',')]
+    batch_sizes = [int(size) for size in in_arg.batch_sizes.split(',')]
+    scales = [int(float(scale)) for scale in in_arg.scales.split(',')]
+    random.seed(in_arg.seed)
+    np.random.seed(in_arg.seed)
+    torch.manual_seed(in_arg.seed)
+
+    # Local weights must already be on disk - the benchmark never downloads
+    if in_arg.weights == 'local':
+        for arch in arch_list:
+            check_local_weights(arch)
+
+    metrics = dict()
+    work_dir = tempfile.mkdtemp(prefix='benchmark_suite_')
+    try:
+        img_paths = write_synthetic_jpegs(os.path.join(work_dir, 'jpegs'),
+                                          resolutions)
+        for arch in arch_list:
+            if in_arg.weights == 'random':
+                use_random_weights(arch)
+            metrics.update(benchmark_latency(arch, img_paths, in_arg.n_runs))
+            metrics.update(benchmark_throughput(arch, img_paths,
+                                                batch_sizes, in_arg.n_runs))
+        metrics.update(benchmark_scales(os.path.join(work_dir, 'scan'),
+                                        scales, in_arg.dogfile))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {'meta': {'host': socket.gethostname(),
+                        'python': platform.python_version(),
+                        'torch': torch.__version__,
+                        'weights': in_arg.weights,
+                        'cpu_count': os.cpu_count()},
+               'metrics': metrics}
+    with open(in_arg.output, 'w') as output_file:
+        json.dump(results, output_file, indent=2, sort_keys=True)
+    print("Saved", len(metrics), "metrics to", in_arg.output)
+
+    # Compares with the baseline & fails if anything got slower
+    if in_arg.baseline:
+        with open(in_arg.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['metrics']
+        n_regressions = compare_with_baseline(metrics, baseline,
+                                              in_arg.tolerance)
+        if n_regressions:
+            sys.exit(1)
+
+
+# Functions defined below
+def get_input_args():
+    """
+    Retrieves and parses the command line arguments created and defined using
+    the argparse module. This function returns these arguments as an
+    ArgumentParser object.
+    Parameters:
+     None - simply using argparse module to create & store command line arguments
+    Returns:
+     parse_args() -data structure that stores the command line arguments object
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--arch', type=str, default='resnet,alexnet,vgg',
+                        help='comma separated models to benchmark')
+    parser.add_argument('--weights', type=str, default='random',
+                        choices=['random', 'local'],
+                        help='random weights, or the locally stored weights '
+                             '(exported or already downloaded)')
+    parser.add_argument('--resolutions', type=str,
+                        default='320x240,640x480,1920x1080',
+                        help='comma separated WIDTHxHEIGHT of the synthetic '
+                             'JPEGs')
+    parser.add_argument('--batch_sizes', type=str, default='1,8,32,64',
+                        help='comma separated batch sizes for throughput')
+    parser.add_argument('--scales', type=str, default='1e3,1e4,1e5,1e6',
+                        help='comma separated image counts for the stages')
+    parser.add_argument('--n_runs', type=int, default=10,
+                        help='timed runs of each latency & throughput')
+    parser.add_argument('--dogfile', type=str, default='dognames.txt',
+                        help='text file that has dognames')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the synthetic data & random weights')
+    parser.add_argument('--output', type=str, default='benchmark.json',
+                        help='JSON file the metrics are saved to')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='JSON file of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=10.0,
+                        help='percent a metric may get worse than the '
+                             'baseline before it counts as a regression')
+    return parser.parse_args()
+
+
+def use_random_weights(arch):
+    """
+    Registers a builder of arch with random weights in classifier.py, so it's
+    used instead of downloading the pretrained weights (also when the model
+    is loaded again after being evicted from the model cache).
+    Parameters:
+     arch - CNN architecture, values must be: resnet alexnet vgg (string)
+    Returns:
+     None
+    """
+    builder = classifier.model_builders[arch]
+    classifier.model_builders[arch] = lambda pretrained=False: builder()
+    classifier.use_exported_models = False
+
+
+def pretrained_weights_path(arch):
+    """
+    Returns the path torchvision downloads the pretrained weights of arch to
+    (the checkpoints folder of torch hub).
+    Parameters:
+     arch - CNN architecture, values must be: resnet alexnet vgg (string)
+    Returns:
+     weights_path - path of the weights file, whether or not it exists
+                    (string)
+    """
+    builder = classifier.model_builders[arch]
+
+    # torchvision 0.14 & higher lists each model's weights, older versions
+    # keep the URLs in the model's module
+    if hasattr(models, 'get_model_weights'):
+        url = models.get_model_weights(builder).DEFAULT.url
+    else:
+        url = sys.modules[builder.__module__].model_urls[builder.__name__]
+
+    if hasattr(torch.hub, 'get_dir'):
+        hub_dir = torch.hub.get_dir()
+    else:
+        hub_dir = os.path.expanduser(os.getenv('TORCH_HOME',
+                                               '~/.cache/torch'))
+    return os.path.join(hub_dir, 'checkpoints',
+                        os.path.basename(urlsplit(url).path))
+
+
+def check_local_weights(arch):
+    """
+    Exits with an error unless the weights of arch are stored locally, as an
+    exported model or as weights already downloaded by torchvision - loading
+    the pretrained model would otherwise download them.
+    Parameters:
+     arch - CNN architecture, values must be: resnet alexnet vgg (string)
+    Returns:
+     None
+    """
+    exported_path = classifier.exported_model_path(arch)
+    if classifier.use_exported_models and os.path.exists(exported_path):
+        return
+    weights_path = pretrained_weights_path(arch)
+    if not os.path.exists(weights_path):
+        sys.exit("benchmark_suite.py: no local weights for %s - neither %s "
+                 "nor %s exists (export the model with export_models.py or "
+                 "use --weights random)" % (arch, exported_path,
+                                            weights_path))
+
+
+def write_synthetic_jpegs(jpeg_dir, resolutions, n_per_resolution=4):
+    """
+    Writes synthetic JPEGs - smooth random color fields, which compress about
+    like photos unlike pure noise.
+    Parameters:
+     jpeg_dir - folder the JPEGs are written to (string)
+     resolutions - (width, height) of the images (list of tuples of ints)
+     n_per_resolution - images written at each resolution (int)
+    Returns:
+     img_paths_by_resolution - Dictionary with key as 'WIDTHxHEIGHT' and
+                               value as the paths of its JPEGs (list of
+                               strings)
+    """
+    os.makedirs(jpeg_dir)
+    img_paths_by_resolution = dict()
+    for width, height in resolutions:
+        resolution = '%dx%d' % (width, height)
+        img_paths_by_resolution[resolution] = []
+        for idx in range(n_per_resolution):
+            field = np.random.randint(0, 256, (8, 8, 3), dtype=np.uint8)
+            img = Image.fromarray(field).resize((width, height),
+                                                Image.BILINEAR)
+            img_path = os.path.join(jpeg_dir, '%s_%d.jpg' % (resolution, idx))
+            img.save(img_path, quality=90)
+            img_paths_by_resolution[resolution].append(img_path)
+    return img_paths_by_resolution
+
+
+def benchmark_latency(arch, img_paths_by_resolution, n_runs):
+    """
+    Measures the latency of classifying one image with classifier().
+    Parameters:
+     arch - CNN architecture (string)
+     img_paths_by_resolution - see write_synthetic_jpegs()
+     n_runs - images classified at each resolution (int)
+    Returns:
+     metrics - Dictionary with 'latency/<arch>/<resolution>/p50_ms' and
+               '.../p99_ms' metrics
+    """
+    metrics = dict()
+    classifier.classifier(next(iter(img_paths_by_resolution.values()))[0],
+                          arch)
+    for resolution, img_paths in sorted(img_paths_by_resolution.items()):
+        latencies = []
+        for run in range(n_runs):
+            start_time = perf_counter()
+            classifier.classifier(img_paths[run % len(img_paths)], arch)
+            latencies.append(perf_counter() - start_time)
+        latencies.sort()
+        key = 'latency/%s/%s/' % (arch, resolution)
+        metrics[key + 'p50_ms'] = percentile(latencies, 50) * 1000.0
+        metrics[key + 'p99_ms'] = percentile(latencies, 99) * 1000.0
+    return metrics
+
+
+def benchmark_throughput(arch, img_paths_by_resolution, batch_sizes, n_runs):
+    """
+    Measures the images per second of the model's forward pass at each batch
+    size, on batches of a preprocessed synthetic image.
+    Parameters:
+     arch - CNN architecture (string)
+     img_paths_by_resolution - see write_synthetic_jpegs()
+     batch_sizes - batch sizes to measure (list of ints)
+     n_runs - timed forward passes of each batch size (int)
+    Returns:
+     metrics - Dictionary with 'throughput/<arch>/batch_<size>/images_per_sec'
+               metrics
+    """
+    session = classifier.get_session(arch)
+    img_path = sorted(img_paths_by_resolution.values())[0][0]
+    img_tensor = session.load_image(img_path)
+
+    metrics = dict()
+    for batch_size in batch_sizes:
+        batch_tensor = torch.stack([img_tensor] * batch_size)
+        session.predict(batch_tensor)
+        start_time = perf_counter()
+        for _ in range(n_runs):
+            session.predict(batch_tensor)
+        run_time = perf_counter() - start_time
+        metrics['throughput/%s/batch_%d/images_per_sec' %
+                (arch, batch_size)] = batch_size * n_runs / run_time
+    return metrics
+
+
+def benchmark_scales(scan_dir, scales, dogfile):
+    """
+    Measures the stages of check_images_solution.py that don't run a model at
+    each number of images, on synthetic filenames & classifier labels.
+    Parameters:
+     scan_dir - folder the empty image files are written to (string)
+     scales - numbers of images (list of ints)
+     dogfile - text file that has dognames (string)
+    Returns:
+     metrics - Dictionary with 'scale/<stage>/<images>/sec' metrics
+    """
+    os.makedirs(scan_dir)
+    metrics = dict()
+    n_files = 0
+    for n_images in sorted(scales):
+        # Adds empty image files until the folder has n_images of them -
+        # get_pet_labels() only reads the filenames
+        while n_files < n_images:
+            pet_label = random.choice(pet_label_names)
+            filename = '%s_%07d.jpg' % (pet_label.replace(' ', '_').title(),
+                                        n_files)
+            open(os.path.join(scan_dir, filename), 'w').close()
+            n_files += 1
+
+        key = 'scale/%s/' + str(n_images) + '/sec'
+        start_time = perf_counter()
+        petlabel_dic = get_pet_labels(scan_dir + '/')
+        metrics[key % 'get_pet_labels'] = perf_counter() - start_time
+
+        # Classifier label of each image - random ImageNet class indexes,
+        # matched like classify_images() matches them, with cold indexes as
+        # in a run
+        filenames = list(petlabel_dic)
+        class_ids = np.random.randint(0, len(classifier.label_table.names),
+                                      len(filenames)).tolist()
+        match_indexes.clear()
+        category_indexes.clear()
+
+        start_time = perf_counter()
+        results_dic = compare_labels(petlabel_dic, filenames, class_ids)
+        metrics[key % 'classify_images_matching'] = perf_counter() - start_time
+
+        start_time = perf_counter()
+        adjust_results4_isadog(results_dic, dogfile)
+        metrics[key % 'adjust_results4_isadog'] = perf_counter() - start_time
+
+        start_time = perf_counter()
+        calculates_results_stats(results_dic)
+        metrics[key % 'calculates_results_stats'] = perf_counter() - start_time
+    return metrics
+
+
+def compare_with_baseline(metrics, baseline, tolerance):
+    """
+    Prints each metric next to its baseline & flags the ones that got worse
+    by more than tolerance percent - images_per_sec is better higher, the
+    times are better lower.
+    Parameters:
+     metrics - Dictionary of the metrics of this run
+     baseline - Dictionary of the metrics of the baseline run
+     tolerance - percent a metric may get worse (float)
+    Returns:
+     n_regressions - number of metrics that got worse than tolerance (int)
+    """
+    print("%-58s%12s%12s%9s" % ('metric', 'baseline', 'current', 'change'))
+    n_regressions = 0
+    for name in sorted(set(metrics) & set(baseline)):
+        if baseline[name] <= 0:
+            continue
+        change = (metrics[name] - baseline[name]) / baseline[name] * 100.0
+        worse = -change if name.endswith('images_per_sec') else change
+        flag = ''
+        if worse > tolerance:
+            flag = '  REGRESSION'
+            n_regressions += 1
+        print("%-58s%12.4g%12.4g%8.1f%%%s" % (name, baseline[name],
+                                              metrics[name], change, flag))
+
+    # Metrics that are only in one of the runs aren't compared
+    for name in sorted(set(metrics) ^ set(baseline)):
+        print("%-58s  only in %s" % (name, 'current' if name in metrics
+                                     else 'baseline'))
+    print("\n%d regressions over %.1f%%" % (n_regressions, tolerance))
+    return n_regressions
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
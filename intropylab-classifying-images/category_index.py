@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/category_index.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Index of categories of labels (like the dogs in dognames.txt) for
+#          checking whether labels belong to a category. Each category file
+#          has one name per line, lowercase with spaces between words. The
+#          file is read once and resolved into:
+#           - a boolean mask over the ImageNet class indexes, so checking
+#             whether a classifier label is in the category is one array
+#             index per image (or one array lookup for all of them)
+#           - the set of names, checked once per distinct pet image label
+#          Several category files (dogs, cats, etc.) can be indexed at once
+#          and each one is only read the first time it's requested.
+#
+#   Example use:
+#    category_index = get_category_index(['dognames.txt'],
+#                                        label_table.normalized)
+#    clf_is_dog = category_index.class_mask('dognames.txt')[class_ids]
+#    pet_is_dog = category_index.label_mask('dognames.txt', truths)
+##
+
+# Imports python modules
+import numpy as np
+
+
+def read_category_file(category_file):
+    """
+    Reads the names of a category file, one name per line.
+    Parameters:
+     category_file - path to the text file of names (string)
+    Returns:
+     names - set of names in the category (set of strings)
+    """
+    names = set()
+    with open(category_file, "r") as infile:
+        for line in infile:
+            # Process line by striping newline from line
+            line = line.rstrip()
+            if line not in names:
+                names.add(line)
+            else:
+                print("**Warning: Duplicate names in", category_file, line)
+    return names
+
+
+class CategoryIndex(object):
+    """
+    Names & ImageNet class masks of one or more categories, keyed by the path
+    of the category file.
+    Parameters:
+     category_files - paths to the text files of names, one file per
+                      category (list of strings)
+     class_labels - normalized (lowercase & stripped) label of each ImageNet
+                    class, indexed by class index (list of strings)
+    """
+    def __init__(self, category_files, class_labels):
+        self.class_labels = class_labels
+        self.names = dict()
+        self.class_masks = dict()
+        for category_file in category_files:
+            self.add_category(category_file)
+
+    def add_category(self, category_file):
+        """
+        Reads a category file & resolves it into a mask over the ImageNet
+        classes, unless it's already indexed.
+        Parameters:
+         category_file - path to the text file of names (string)
+        Returns:
+         None
+        """
+        if category_file in self.names:
+            return
+        names = read_category_file(category_file)
+        self.names[category_file] = names
+        self.class_masks[category_file] = np.array(
+            [label in names for label in self.class_labels], dtype=bool)
+
+    def class_mask(self, category_file):
+        """
+        Returns the mask of the ImageNet classes in a category.
+        Parameters:
+         category_file - path to the text file of names (string)
+        Returns:
+         class_mask - boolean numpy array, True at the class indexes whose
+                      label is in the category
+        """
+        self.add_category(category_file)
+        return self.class_masks[category_file]
+
+    def label_mask(self, category_file, labels):
+        """
+        Returns whether each label (like a pet image label) is in a category,
+        checking each distinct label only once.
+        Parameters:
+         category_file - path to the text file of names (string)
+         labels - labels, lowercase with spaces between words (list of
+                  strings)
+        Returns:
+         label_mask - boolean numpy array, True for the labels in the category
+        """
+        self.add_category(category_file)
+        if not labels:
+            return np.zeros(0, dtype=bool)
+
+        # Ids of the distinct labels & which of them are in the category
+        distinct, label_ids = np.unique(np.array(labels), return_inverse=True)
+        names = self.names[category_file]
+        member_ids = np.array([label in names for label in distinct.tolist()],
+                              dtype=bool)
+        return member_ids[label_ids]
+
+
+# Category indexes built so far, key = labels of the ImageNet classes
+category_indexes = dict()
+
+
+def get_category_index(category_files, class_labels):
+    """
+    Returns the CategoryIndex over class_labels with the given category files
+    added - files indexed by earlier calls aren't read again.
+    Parameters:
+     category_files - paths to the text files of names (list of strings)
+     class_labels - normalized label of each ImageNet class (list of strings)
+    Returns:
+     category_index - CategoryIndex with the categories
+    """
+    key = tuple(class_labels)
+    if key not in category_indexes:
+        category_indexes[key] = CategoryIndex([], class_labels)
+    for category_file in category_files:
+        category_indexes[key].add_category(category_file)
+    return category_indexes[key]
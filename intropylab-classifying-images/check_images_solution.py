@@ -6,6 +6,8 @@
 # DATE CREATED: 01/30/2018                                  
 # REVISED DATE: 02/27/2018  - reduce scope of program
 # REVISED DATE: 05/14/2018 - added printing functions for checking the lab
+# REVISED DATE: 10/17/2026 - only the chosen model is loaded & its load time
+#                            and memory are reported
 # PURPOSE: Check images & report results: read them in, predict their
 #          content (classifier), compare prediction to actual value labels
 #          and output results
@@ -19,19 +21,59 @@
 
 # Imports python modules
 import argparse
-from time import time, sleep
-from os import listdir
+from itertools import islice
+from time import perf_counter, sleep
+
+import numpy as np
 
 # Imports classifier function for using CNN to classify images 
-from classifier import classifier 
+from classifier import (classify_batch, classify_batch_multi,
+                        classify_batch_topk, create_decode_pool,
+                        model_images_per_sec, set_inference_backend,
+                        set_image_decoder, set_model_cache_budget,
+                        preload_models, print_model_load_stats,
+                        preprocess_params, label_table)
+
+# Imports cache of decoded & cropped images shared by all architectures
+from tensor_cache import TensorCache
+
+# Imports pool of inference processes sharing the models' weights
+from inference_pool import InferencePool
+
+# Imports persistent cache of classifier labels
+from prediction_cache import PredictionCache
+
+# Imports precomputed matches of pet image labels & ImageNet classes
+from match_index import get_match_index
+
+# Imports columnar store of the results
+from results_store import ResultsStore, concat_results
+
+# Imports journal of results for resuming runs
+from results_journal import ResultsJournal
+
+# Imports streaming scanner of the folder of images
+from image_scanner import (scan_images, iter_chunks, parse_shard,
+                           shard_records)
+
+# Imports is-a-dog adjustment, statistics & printing of the results
+from results_stats import (adjust_results4_isadog, calculates_results_stats,
+                           print_results)
+
+# Imports INT8 quantized versions of the models
+from quantize_models import register_quantized_models, quantized_suffix
+
+# Imports timing of the stages for --profile
+from pipeline_profiler import enable_profiler, profile_stage
 
 # Imports print functions that check the lab
 from print_functions_for_lab_checks import *
 
 # Main program function defined below
 def main():
-    # Measures total program runtime by collecting start time
-    start_time = time()
+    # Measures total program runtime by collecting start time from the
+    # monotonic high resolution clock
+    start_time = perf_counter()
     
     # Creates & retrieves Command Line Arugments
     in_arg = get_input_args()
@@ -39,44 +81,183 @@ def main():
     # Function that checks command line arguments using in_arg 
     check_command_line_arguments(in_arg)
 
-    
-    # Creates Pet Image Labels by creating a dictionary 
-    answers_dic = get_pet_labels(in_arg.dir)
+    # Starts timing each stage if a profile was requested
+    profiler = enable_profiler() if in_arg.profile else None
 
-    # Function that checks Pet Images Dictionary- answers_dic    
-    check_creating_pet_image_labels(answers_dic)
+    # Splits the chosen architectures - more than one (like resnet,alexnet,vgg)
+    # classifies with all of them in a single pass over the images
+    arch_list = in_arg.arch.split(',')
 
-    
-    # Creates Classifier Labels with classifier function, Compares Labels, 
-    # and creates a results dictionary 
-    result_dic = classify_images(in_arg.dir, answers_dic, in_arg.arch)
+    # Sets the memory budget of the loaded models - the least recently used
+    # models are evicted to stay within it
+    set_model_cache_budget(in_arg.model_cache_mb)
+
+    # Chooses the backend that runs the models - torch models are loaded up
+    # front, only for the chosen architectures
+    set_inference_backend(in_arg.backend)
+    if in_arg.backend == 'torch':
+        preload_models(arch_list)
 
-    # Function that checks Results Dictionary - result_dic    
-    check_classifying_images(result_dic)    
+    # Chooses the decoder that decodes & crops the images
+    set_image_decoder(in_arg.decoder)
+    
+    # Streaming mode - the (filename, pet label) records of the scan go
+    # straight to classifying, which starts before the scan finishes, instead
+    # of creating the whole dictionary first (skips checking the dictionary)
+    if in_arg.stream:
+        answers_dic = scan_images(in_arg.dir)
+        if in_arg.shard:
+            answers_dic = shard_records(answers_dic, *in_arg.shard)
+        if profiler is not None:
+            answers_dic = profiler.timed_iter('scan', answers_dic)
+    else:
+        # Creates Pet Image Labels by creating a dictionary 
+        with profile_stage('scan') as stage:
+            answers_dic = get_pet_labels(in_arg.dir)
+            stage.n_images = len(answers_dic)
+
+        # Keeps only the images of this machine's shard
+        if in_arg.shard:
+            answers_dic = dict(shard_records(answers_dic.items(),
+                                             *in_arg.shard))
+
+        # Function that checks Pet Images Dictionary- answers_dic    
+        check_creating_pet_image_labels(answers_dic)
+
+    # INT8 quantized mode - compares each chosen architecture with its 
+    # quantized version (calibrated on the first images) on the same images
+    if in_arg.quantize == 'int8':
+        register_quantized_models(calibration_paths=[
+            in_arg.dir + key for key, _ in islice(scan_images(in_arg.dir), 32)])
+        arch_list = [arch + suffix for arch in arch_list
+                     for suffix in ('', quantized_suffix)]
+        if in_arg.backend == 'torch':
+            preload_models(arch_list)
+    
+    # Creates cache of decoded & cropped images if a cache folder was given
+    tensor_cache = None
+    if in_arg.cache_dir:
+        tensor_cache = TensorCache(in_arg.cache_dir, preprocess_params(),
+                                   in_arg.cache_max_mb * 2**20)
+
+    # Opens cache of classifier labels if a database file was given
+    prediction_cache = None
+    if in_arg.prediction_db:
+        prediction_cache = PredictionCache(in_arg.prediction_db)
+
+    # Starts the processes that decode images while the model runs once for
+    # the whole run, if any were requested
+    decode_pool = create_decode_pool(in_arg.workers)
+
+    # Starts the inference processes if more than one was requested - the
+    # models are loaded once here & their weights shared with the processes
+    inference_pool = None
+    if in_arg.procs > 1:
+        inference_pool = InferencePool(arch_list, in_arg.procs, tensor_cache)
+
+    # More than one architecture - classifies with all of them in a single
+    # pass over the images & prints a side-by-side comparison
+    if len(arch_list) > 1:
+        results_stats_by_arch = compare_architectures(in_arg.dir, answers_dic,
+                                                      arch_list, in_arg.dogfile,
+                                                      in_arg.workers,
+                                                      tensor_cache,
+                                                      prediction_cache,
+                                                      inference_pool,
+                                                      decode_pool)
+
+        # Prints how much accuracy each quantized model lost
+        if in_arg.quantize == 'int8':
+            print_quantization_deltas(results_stats_by_arch)
+
+    # One architecture - checks each step of the lab along the way
+    else:
+        # Opens the journal of results if a journal file was given - with
+        # --resume the images already journaled aren't classified again. The
+        # backend is part of the settings since backends may not return
+        # exactly the same labels
+        journal = None
+        if in_arg.journal:
+            journal = ResultsJournal(in_arg.journal,
+                                     {'dir': in_arg.dir, 'arch': in_arg.arch,
+                                      'topk': in_arg.topk,
+                                      'preprocess': preprocess_params(),
+                                      'backend': in_arg.backend,
+                                      'shard': in_arg.shard},
+                                     in_arg.resume)
+
+        # Creates Classifier Labels with classifier function, Compares Labels, 
+        # and creates a results dictionary 
+        result_dic = classify_images(in_arg.dir, answers_dic, in_arg.arch,
+                                     n_workers=in_arg.workers,
+                                     tensor_cache=tensor_cache,
+                                     prediction_cache=prediction_cache,
+                                     topk=in_arg.topk, journal=journal,
+                                     inference_pool=inference_pool,
+                                     decode_pool=decode_pool)
+        if journal is not None:
+            journal.finish()
+            journal.close()
+
+        # Function that checks Results Dictionary - result_dic    
+        check_classifying_images(result_dic)    
 
     
-    # Adjusts the results dictionary to determine if classifier correctly 
-    # classified images as 'a dog' or 'not a dog'. This demonstrates if 
-    # model can correctly classify dog images as dogs (regardless of breed)
-    adjust_results4_isadog(result_dic, in_arg.dogfile)
+        # Adjusts the results dictionary to determine if classifier correctly 
+        # classified images as 'a dog' or 'not a dog'. This demonstrates if 
+        # model can correctly classify dog images as dogs (regardless of breed)
+        with profile_stage('is_a_dog', len(result_dic)):
+            adjust_results4_isadog(result_dic, in_arg.dogfile)
 
-    # Function that checks Results Dictionary for is-a-dog adjustment- result_dic  
-    check_classifying_labels_as_dogs(result_dic)
+        # Function that checks Results Dictionary for is-a-dog adjustment- result_dic  
+        check_classifying_labels_as_dogs(result_dic)
 
     
-    # Calculates results of run and puts statistics in results_stats_dic
-    results_stats_dic = calculates_results_stats(result_dic)
+        # Calculates results of run and puts statistics in results_stats_dic
+        with profile_stage('stats', len(result_dic)):
+            results_stats_dic = calculates_results_stats(result_dic)
+
+        # Function that checks Results Stats Dictionary - results_stats_dic  
+        check_calculating_results(result_dic, results_stats_dic)
+
+
+        # Prints summary results, incorrect classifications of dogs
+        # and breeds if requested
+        with profile_stage('print'):
+            print_results(result_dic, results_stats_dic, in_arg.arch, True,
+                          True)
 
-    # Function that checks Results Stats Dictionary - results_stats_dic  
-    check_calculating_results(result_dic, results_stats_dic)
+    # Stops the processes that decoded images
+    if decode_pool is not None:
+        decode_pool.close()
+        decode_pool.join()
 
+    # Prints how long the model took to load and how much memory it holds
+    print_model_load_stats()
 
-    # Prints summary results, incorrect classifications of dogs
-    # and breeds if requested
-    print_results(result_dic, results_stats_dic, in_arg.arch, True, True)
+    # Prints throughput of the inference processes if they were used
+    if inference_pool is not None:
+        inference_pool.print_stats()
+        inference_pool.close()
+
+    # Prints hit rate of the image cache if it was used
+    if tensor_cache is not None:
+        tensor_cache.print_stats()
+
+    # Prints how many labels came from the label cache vs the model
+    if prediction_cache is not None:
+        prediction_cache.print_stats()
+        prediction_cache.close()
     
+    # Prints the time of each stage & saves the profile as JSON and as a
+    # Chrome trace
+    if profiler is not None:
+        profiler.print_stats()
+        profiler.save_json(in_arg.profile + '.json')
+        profiler.save_chrome_trace(in_arg.profile + '_trace.json')
+
     # Measure total program runtime by collecting end time
-    end_time = time()
+    end_time = perf_counter()
     
     # Computes overall runtime in seconds & prints it in hh:mm:ss format
     tot_time = end_time - start_time
@@ -102,16 +283,99 @@ def get_input_args():
 
     # Creates 3 command line arguments args.dir for path to images files,
     # args.arch which CNN model to use for classification, args.labels path to
-    # text file with names of dogs.
+    # text file with names of dogs. Optional args.workers sets the number of
+    # processes that decode & preprocess images while the model runs, and
+    # args.cache_dir & args.cache_max_mb set the folder & size limit of the 
+    # cache of decoded images (no cache by default). Optional 
+    # args.prediction_db is the database file caching classifier labels and
+    # args.topk counts a match within the top k classifier labels. Optional
+    # args.quantize compares the models with their INT8 quantized versions
+    # and args.backend chooses the inference backend that runs the models.
+    # Optional args.decoder chooses how the images are decoded and
+    # args.stream classifies the images while the folder is being scanned.
+    # Optional args.journal is the journal file of results (one model only)
+    # and args.resume resumes a run that died from its journal.
+    # Optional args.shard classifies one shard of the images, the journals of
+    # all the shards are merged with merge_shards.py. Optional args.procs sets
+    # the number of inference processes that share the models' weights.
+    # Optional args.profile times each stage & saves the profile files.
+    # Optional args.model_cache_mb is the memory budget of the loaded models.
     parser.add_argument('--dir', type=str, default='pet_images/', 
                         help='path to folder of images')
     parser.add_argument('--arch', type=str, default='vgg', 
-                        help='chosen model')
+                        help='chosen model, or comma separated models to '
+                             'compare (like resnet,alexnet,vgg)')
     parser.add_argument('--dogfile', type=str, default='dognames.txt',
                         help='text file that has dognames')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='number of processes that decode images while '
+                             'the model runs (0 = none)')
+    parser.add_argument('--procs', type=int, default=1,
+                        help='number of inference processes classifying '
+                             'batches in parallel with shared model weights '
+                             '(no --topk or --prediction_db)')
+    parser.add_argument('--model_cache_mb', type=float, default=None,
+                        help='memory budget of the loaded models in MB, the '
+                             'least recently used ones are evicted & loaded '
+                             'again when needed - several --arch values must '
+                             'fit in it together (no budget by default)')
+    parser.add_argument('--cache_dir', type=str, default=None,
+                        help='folder for cache of decoded images')
+    parser.add_argument('--cache_max_mb', type=int, default=1024,
+                        help='size limit of cache of decoded images in MB')
+    parser.add_argument('--prediction_db', type=str, default=None,
+                        help='database file for cache of classifier labels')
+    parser.add_argument('--quantize', type=str, default=None,
+                        choices=['int8'],
+                        help='also run INT8 quantized models & compare them '
+                             'with the original models')
+    parser.add_argument('--backend', type=str, default='torch',
+                        choices=['torch', 'onnxruntime'],
+                        help='inference backend that runs the models')
+    parser.add_argument('--decoder', type=str, default='pil',
+                        choices=['pil', 'pil_draft', 'torchvision'],
+                        help='image decoder (pil_draft & torchvision decode '
+                             'JPEGs faster)')
+    parser.add_argument('--stream', action='store_true',
+                        help='classify images while scanning the folder '
+                             '(and its subfolders) for large folders')
+    parser.add_argument('--journal', type=str, default=None,
+                        help='journal file the results are appended to as '
+                             'images are classified (one model only)')
+    parser.add_argument('--resume', action='store_true',
+                        help='skip the images already in --journal and read '
+                             'their results back from it')
+    parser.add_argument('--shard', type=str, default=None,
+                        help='classify only shard i of N of the images, like '
+                             '0/4 - run every shard with --journal & merge '
+                             'the journals with merge_shards.py')
+    parser.add_argument('--profile', type=str, nargs='?', const='profile',
+                        default=None,
+                        help='time each stage & save the profile as '
+                             '<PROFILE>.json and a Chrome trace as '
+                             '<PROFILE>_trace.json (default profile)')
+    parser.add_argument('--topk', type=int, default=1,
+                        help='count a match if the pet label matches any of '
+                             'the top k classifier labels (one model only)')
 
     # returns parsed argument collection
-    return parser.parse_args()
+    in_arg = parser.parse_args()
+    if in_arg.resume and not in_arg.journal:
+        parser.error("--resume needs --journal")
+    if in_arg.journal and (',' in in_arg.arch or in_arg.quantize):
+        parser.error("--journal needs a single --arch without --quantize")
+    if in_arg.topk > 1 and (',' in in_arg.arch or in_arg.quantize):
+        parser.error("--topk needs a single --arch without --quantize")
+    if in_arg.procs > 1 and (in_arg.topk > 1 or in_arg.prediction_db):
+        parser.error("--procs can't be used with --topk or --prediction_db")
+
+    # Parses the shard into (shard index, count of shards)
+    if in_arg.shard:
+        try:
+            in_arg.shard = parse_shard(in_arg.shard)
+        except ValueError as error:
+            parser.error(str(error))
+    return in_arg
 
 
 def get_pet_labels(image_dir):
@@ -123,397 +387,449 @@ def get_pet_labels(image_dir):
                  classified by pretrained CNN models (string)
     Returns:
      petlabels_dic - Dictionary storing image filename (as key) and Pet Image
-                     Labels (as value)  
+                     Labels (as value) - images in folders inside image_dir 
+                     have the path relative to image_dir as filename
     """
-    # Creates list of files in directory
-    in_files = listdir(image_dir)
-    
-    # Processes each of the files to create a dictionary where the key
-    # is the filename and the value is the picture label (below).
- 
     # Creates empty dictionary for the labels
     petlabels_dic = dict()
    
-    # Processes through each file in the directory, extracting only the words
-    # of the file that contain the pet image label
-    for idx in range(0, len(in_files), 1):
-       
-       # Skips file if starts with . (like .DS_Store of Mac OSX) because it 
-       # isn't an pet image file
-       if in_files[idx][0] != ".":
-           
-           # Uses split to extract words of filename into list image_name 
-           image_name = in_files[idx].split("_")
+    # Processes through each image file found by scanning the directory (and
+    # the directories inside it) - the scan skips files that start with . 
+    # (like .DS_Store of Mac OSX) & files without an image extension, and
+    # extracts the words of the filename that contain the pet image label
+    for filename, pet_label in scan_images(image_dir):
        
-           # Creates temporary label variable to hold pet label name extracted 
-           pet_label = ""
-           
-           # Processes each of the character strings(words) split by '_' in 
-           # list image_name by processing each word - only adding to pet_label
-           # if word is all letters - then process by putting blanks between 
-           # these words and putting them in all lowercase letters
-           for word in image_name:
-               
-               # Only add to pet_label if word is all letters add blank at end
-               if word.isalpha():
-                   pet_label += word.lower() + " "
-                   
-           # strips off trailing whitespace
-           pet_label = pet_label.strip()
-           
-           # If filename doesn't already exist in dictionary add it and it's
-           # pet label - otherwise print an error message because indicates 
-           # duplicate files (filenames)
-           if in_files[idx] not in petlabels_dic:
-              petlabels_dic[in_files[idx]] = pet_label
-              
-           else:
-               print("Warning: Duplicate files exist in directory", 
-                     in_files[idx])
+       # If filename doesn't already exist in dictionary add it and it's
+       # pet label - otherwise print an error message because indicates 
+       # duplicate files (filenames)
+       if filename not in petlabels_dic:
+          petlabels_dic[filename] = pet_label
+          
+       else:
+           print("Warning: Duplicate files exist in directory", filename)
  
     # returns dictionary of labels
     return(petlabels_dic)
 
 
-def classify_images(images_dir, petlabel_dic, model):
+def classify_images(images_dir, petlabel_dic, model, batch_size=None,
+                    n_workers=0, tensor_cache=None, prediction_cache=None,
+                    topk=1, chunk_size=4096, journal=None,
+                    inference_pool=None, decode_pool=None):
     """
     Creates classifier labels with classifier function, compares labels, and 
     creates a dictionary containing both labels and comparison of them to be
     returned.
-     PLEASE NOTE: This function uses the classifier() function defined in 
-     classifier.py within this function. The proper use of this function is
-     in test_classifier.py Please refer to this program prior to using the 
-     classifier() function to classify images in this function 
+     PLEASE NOTE: This function uses the classify_batch() function defined 
+     in classifier.py within this function, which classifies the images in
+     batches and returns the same labels the classifier() function would 
      Parameters: 
       images_dir - The (full) path to the folder of images that are to be
                    classified by pretrained CNN models (string)
       petlabel_dic - Dictionary that contains the pet image(true) labels
                      that classify what's in the image, where its' key is the
                      pet image filename & it's value is pet image label where
-                     label is lowercase with space between each word in label 
+                     label is lowercase with space between each word in label,
+                     or an iterable of (filename, pet image label) records
+                     like the ones streamed by scan_images()
       model - pretrained CNN whose architecture is indicated by this parameter,
               values must be: resnet alexnet vgg (string)
+      batch_size - most images classified in one forward pass of the model,
+                   None for the tuned batch size (int)
+      n_workers - number of worker processes that decode & preprocess 
+                  upcoming images while the model runs, 0 for none (int)
+      tensor_cache - TensorCache of decoded & cropped images, None for none
+      prediction_cache - PredictionCache checked for each image's classifier
+                         label before running the model, None for none
+      topk - counts a match if the pet image label matches any of the topk
+             most probable classifier labels, the prediction cache isn't used
+             when topk is more than 1 (int)
+      chunk_size - most images classified & compared at a time - streamed
+                   records are classified one chunk at a time as they arrive
+                   (int)
+      journal - ResultsJournal the results of each chunk are appended to,
+                images already in it are skipped & their results read back
+                from it, None for no journal
+      inference_pool - InferencePool the batches of images are classified by
+                       instead of this process, None for no pool (top 1 only
+                       & without prediction_cache)
+      decode_pool - pool of decode workers from create_decode_pool() that's
+                    used for every chunk instead of n_workers, None for none
      Returns:
-      results_dic - Dictionary with key as image filename and value as a List 
+      results_dic - ResultsStore of the results in columns, that's also a 
+                    Dictionary with key as image filename and value as a List 
              (index)idx 0 = pet image label (string)
                     idx 1 = classifier label (string)
                     idx 2 = 1/0 (int)   where 1 = match between pet image and 
                     classifer labels and 0 = no match between labels
     """
-    # Creates dictionary that will have all the results key = filename
-    # value = list [Pet Label, Classifier Label, Match(1=yes,0=no)]
-    results_dic = dict()
+    records = pet_label_records(petlabel_dic)
+    results_chunks = []
+
+    # Resumes from the journal - starts with the results journaled by an
+    # earlier run & only classifies the images that aren't in it
+    if journal is not None:
+        results_chunks.append(journal.load_results(label_table.normalized))
+        records = (record for record in records
+                   if record[0] not in journal.done)
+
+    for chunk in iter_chunks(records, chunk_size):
+        chunk_dic = dict(chunk)
+        filenames = list(chunk_dic)
+        img_paths = [images_dir + key for key in filenames]
+
+        # Runs classify_batch_topk function to get the topk most probable 
+        # classes of each image - idx 1 of results_dic stays the most
+        # probable one
+        if topk > 1:
+            with profile_stage('classify', len(img_paths)):
+                topk_results = classify_batch_topk(img_paths, model, topk,
+                                                   batch_size, n_workers,
+                                                   tensor_cache, decode_pool)
+            topk_ids = [[class_id for class_id, _, _ in result]
+                        for result in topk_results]
+            class_ids = [ids[0] for ids in topk_ids]
+            results_chunks.append(compare_labels(chunk_dic, filenames,
+                                                 class_ids, topk_ids))
+            if journal is not None:
+                journal.append(results_chunks[-1])
+            continue
+
+        # Runs classify_batch function to classify all the images in batches
+        # - inputs: list of path + filename, model and batch size, returns 
+        # list of ImageNet class indexes of the classifier labels in the same
+        # order as the filenames (indexes since some labels, like crane, are
+        # shared by two classes). If there's a cache of classifier labels,
+        # the model only runs on images not cached
+        with profile_stage('classify', len(img_paths)):
+            if prediction_cache is not None:
+                class_ids = prediction_cache.classify_batch(
+                    img_paths, model, batch_size, n_workers, tensor_cache,
+                    decode_pool, return_ids=True)
+            elif inference_pool is not None:
+                class_ids = inference_pool.classify_batch(img_paths, model,
+                                                          batch_size,
+                                                          return_ids=True)
+            else:
+                class_ids = classify_batch(img_paths, model, batch_size,
+                                           n_workers, tensor_cache,
+                                           decode_pool, return_ids=True)
 
-    # Process all files in the petlabels_dic - use images_dir to give fullpath
-    for key in petlabel_dic:
-       
-       # Runs classifier function to classify the images classifier function 
-       # inputs: path + filename  and  model, returns model_label 
-       # as classifier label
-       model_label = classifier(images_dir+key, model)
-       
-       # Processes the results so they can be compared with pet image labels
-       # set labels to lowercase (lower) and stripping off whitespace(strip)
-       model_label = model_label.lower()
-       model_label = model_label.strip()
-       
-       # defines truth as pet image label and trys to find it using find() 
-       # string function to find it within classifier label(model_label).
-       truth = petlabel_dic[key]
-       found = model_label.find(truth)
-       
-       # If found (0 or greater) then make sure true answer wasn't found within
-       # another word and thus not really found, if truely found then add to 
-       # results dictionary and set match=1(yes) otherwise as match=0(no)
-       if found >= 0:
-           if ( (found == 0 and len(truth)==len(model_label)) or
-                (  ( (found == 0) or (model_label[found - 1] == " ") )  and
-                   ( (found + len(truth) == len(model_label)) or   
-                      (model_label[found + len(truth): found+len(truth)+1] in 
-                     (","," ") ) 
-                   )      
-                )
-              ):
-               # found label as stand-alone term (not within label)
-               if key not in results_dic:
-                   results_dic[key] = [truth, model_label, 1]
-                   
-           # found within a word/term not a label existing on its own 
-           else:
-               if key not in results_dic:
-                   results_dic[key] = [truth, model_label, 0]
-                   
-       # if not found set results dictionary with match=0(no)
-       else:
-           if key not in results_dic:
-               results_dic[key] = [truth, model_label, 0]
-               
-    # Return results dictionary
-    return(results_dic)
+        # Compares the labels of the chunk & journals its results
+        results_chunks.append(compare_labels(chunk_dic, filenames,
+                                             class_ids))
+        if journal is not None:
+            journal.append(results_chunks[-1])
+
+    # Joins the results of the chunks & returns results dictionary
+    return concat_results(results_chunks, label_table.normalized)
 
 
-def adjust_results4_isadog(results_dic, dogsfile):
+def classify_images_multi(images_dir, petlabel_dic, models, batch_size=None,
+                          n_workers=0, tensor_cache=None,
+                          prediction_cache=None, chunk_size=4096,
+                          inference_pool=None, decode_pool=None):
     """
-    Adjusts the results dictionary to determine if classifier correctly 
-    classified images 'as a dog' or 'not a dog' especially when not a match. 
-    Demonstrates if model architecture correctly classifies dog images even if
-    it gets dog breed wrong (not a match).
-    Parameters:
-      results_dic - Dictionary with key as image filename and value as a List 
-             (index)idx 0 = pet image label (string)
-                    idx 1 = classifier label (string)
-                    idx 2 = 1/0 (int)  where 1 = match between pet image and 
-                            classifer labels and 0 = no match between labels
-                    --- where idx 3 & idx 4 are added by this function ---
-                    idx 3 = 1/0 (int)  where 1 = pet image 'is-a' dog and 
-                            0 = pet Image 'is-NOT-a' dog. 
-                    idx 4 = 1/0 (int)  where 1 = Classifier classifies image 
-                            'as-a' dog and 0 = Classifier classifies image  
-                            'as-NOT-a' dog.
-     dogsfile - A text file that contains names of all dogs from ImageNet 
-                1000 labels (used by classifier model) and dog names from
-                the pet image files. This file has one dog name per line
-                dog names are all in lowercase with spaces separating the 
-                distinct words of the dogname. This file should have been
-                passed in as a command line argument. (string - indicates 
-                text file's name)
-    Returns:
-           None - results_dic is mutable data type so no return needed.
-    """           
-    # Creates dognames dictionary for quick matching to results_dic labels from
-    # real answer & classifier's answer
-    dognames_dic = dict()
-
-    # Reads in dognames from file, 1 name per line & automatically closes file
-    with open(dogsfile, "r") as infile:
-        # Reads in dognames from first line in file
-        line = infile.readline()
-
-        # Processes each line in file until reaching EOF (end-of-file) by 
-        # processing line and adding dognames to dognames_dic with while loop
-        while line != "":
-
-            # Process line by striping newline from line
-            line = line.rstrip()
-
-            # adds dogname to dogsnames_dic if it doesn't already exist in dic
-            if line not in dognames_dic:
-                dognames_dic[line] = 1
+    Same as classify_images() but for several model architectures at once.
+    Each image is decoded & preprocessed only once and the same tensor is
+    given to every model, instead of rerunning the program once per model.
+     Parameters: 
+      images_dir - The (full) path to the folder of images that are to be
+                   classified by pretrained CNN models (string)
+      petlabel_dic - Dictionary that contains the pet image(true) labels
+                     where its' key is the pet image filename & it's value is
+                     pet image label, or an iterable of (filename, pet image 
+                     label) records (see classify_images())
+      models - pretrained CNNs whose architectures are indicated by this 
+               parameter, values must be: resnet alexnet vgg (list of strings)
+      batch_size - most images classified in one forward pass of a model,
+                   None for the tuned batch size (int)
+      n_workers - number of worker processes that decode & preprocess 
+                  upcoming images while the models run, 0 for none (int)
+      tensor_cache - TensorCache of decoded & cropped images, None for none
+      prediction_cache - PredictionCache checked for each image's classifier
+                         label before running the models, None for none
+      chunk_size - most images classified & compared at a time (int)
+      inference_pool - InferencePool of the models the batches of images are
+                       classified by, None for no pool
+      decode_pool - pool of decode workers from create_decode_pool() that's
+                    used for every chunk instead of n_workers, None for none
+     Returns:
+      results_dic_by_arch - Dictionary with key as model architecture and 
+                            value as that model's results_dic (see 
+                            classify_images())
+    """
+    results_chunks_by_arch = dict((model, []) for model in models)
+    for chunk in iter_chunks(pet_label_records(petlabel_dic), chunk_size):
+        chunk_dic = dict(chunk)
+        filenames = list(chunk_dic)
+        img_paths = [images_dir + key for key in filenames]
+
+        # Runs classify_batch_multi function to classify the chunk's images
+        # with all the models - returns dictionary with key as model 
+        # architecture and value as list of ImageNet class indexes of the
+        # classifier labels in the same order as the filenames
+        with profile_stage('classify', len(img_paths)):
+            if prediction_cache is not None:
+                ids_by_arch = prediction_cache.classify_batch_multi(
+                    img_paths, models, batch_size, n_workers, tensor_cache,
+                    decode_pool, return_ids=True)
+            elif inference_pool is not None:
+                ids_by_arch = inference_pool.classify_batch_multi(
+                    img_paths, batch_size, return_ids=True)
             else:
-                print("**Warning: Duplicate dognames", line)            
+                ids_by_arch = classify_batch_multi(img_paths, models,
+                                                   batch_size, n_workers,
+                                                   tensor_cache, decode_pool,
+                                                   return_ids=True)
 
-            # Reads in next line in file to be processed with while loop
-            # if this line isn't empty (EOF)
-            line = infile.readline()
-    
-    
-    # Add to whether pet labels & classifier labels are dogs by appending
-    # two items to end of value(List) in results_dic. 
-    # List Index 3 = whether(1) or not(0) Pet Image Label is a dog AND 
-    # List Index 4 = whether(1) or not(0) Classifier Label is a dog
-    # How - iterate through results_dic if labels are found in dognames_dic
-    # then label "is a dog" index3/4=1 otherwise index3/4=0 "not a dog"
-    for key in results_dic:
-
-        # Pet Image Label IS of Dog (e.g. found in dognames_dic)
-        if results_dic[key][0] in dognames_dic:
-            
-            # Classifier Label IS image of Dog (e.g. found in dognames_dic)
-            # appends (1, 1) because both labels are dogs
-            if results_dic[key][1] in dognames_dic:
-                results_dic[key].extend((1, 1))
-                
-            # Classifier Label IS NOT image of dog (e.g. NOT in dognames_dic)
-            # appends (1,0) because only pet label is a dog
-            else:
-                results_dic[key].extend((1, 0))
-            
-        # Pet Image Label IS NOT a Dog image (e.g. NOT found in dognames_dic)
-        else:
-            # Classifier Label IS image of Dog (e.g. found in dognames_dic)
-            # appends (0, 1)because only Classifier labe is a dog
-            if results_dic[key][1] in dognames_dic:
-                results_dic[key].extend((0, 1))
-                
-            # Classifier Label IS NOT image of Dog (e.g. NOT in dognames_dic)
-            # appends (0, 0) because both labels aren't dogs
-            else:
-                results_dic[key].extend((0, 0))
+        # Compares the labels of each model
+        for model in models:
+            results_chunks_by_arch[model].append(
+                compare_labels(chunk_dic, filenames, ids_by_arch[model]))
+
+    # Joins the results of the chunks & returns results dictionaries
+    results_dic_by_arch = dict()
+    for model in models:
+        results_dic_by_arch[model] = concat_results(
+            results_chunks_by_arch[model], label_table.normalized)
+    return results_dic_by_arch
 
 
-def calculates_results_stats(results_dic):
+def pet_label_records(petlabel_dic):
     """
-    Calculates statistics of the results of the run using classifier's model 
-    architecture on classifying images. Then puts the results statistics in a 
-    dictionary (results_stats) so that it's returned for printing as to help
-    the user to determine the 'best' model for classifying images. Note that 
-    the statistics calculated as the results are either percentages or counts.
-    Parameters:
-      results_dic - Dictionary with key as image filename and value as a List 
+    Returns the (filename, pet image label) records of a pet labels 
+    dictionary, or the records themselves if they're streamed.
+     Parameters: 
+      petlabel_dic - Dictionary of pet image labels, or an iterable of 
+                     (filename, pet image label) records
+     Returns:
+      records - iterable of (filename, pet image label) tuples
+    """
+    if isinstance(petlabel_dic, dict):
+        return petlabel_dic.items()
+    return petlabel_dic
+
+
+def compare_labels(petlabel_dic, filenames, class_ids, topk_ids=None):
+    """
+    Compares the classifier labels of the images to their pet image labels
+    and creates a dictionary containing both labels and comparison of them to
+    be returned. Used by classify_images() & classify_images_multi().
+     Parameters: 
+      petlabel_dic - Dictionary that contains the pet image(true) labels
+                     that classify what's in the image, where its' key is the
+                     pet image filename & it's value is pet image label where
+                     label is lowercase with space between each word in label 
+      filenames - pet image filenames (list of strings)
+      class_ids - ImageNet class index of the classifier label of each image
+                  in the same order as filenames (list of ints)
+      topk_ids - None, or the class indexes of the k most probable classifier
+                 labels of each image in the same order as filenames, in
+                 which case it's a match if the pet image label matches any 
+                 of them (list of lists of ints)
+     Returns:
+      results_dic - ResultsStore of the results in columns, that's also a 
+                    Dictionary with key as image filename and value as a List 
              (index)idx 0 = pet image label (string)
                     idx 1 = classifier label (string)
-                    idx 2 = 1/0 (int)  where 1 = match between pet image and 
-                            classifer labels and 0 = no match between labels
-                    idx 3 = 1/0 (int)  where 1 = pet image 'is-a' dog and 
-                            0 = pet Image 'is-NOT-a' dog. 
-                    idx 4 = 1/0 (int)  where 1 = Classifier classifies image 
-                            'as-a' dog and 0 = Classifier classifies image  
-                            'as-NOT-a' dog.
-    Returns:
-     results_stats - Dictionary that contains the results statistics (either a
-                     percentage or a count) where the key is the statistic's 
-                     name (starting with 'pct' for percentage or 'n' for count)
-                     and the value is the statistic's value 
+                    idx 2 = 1/0 (int)   where 1 = match between pet image and 
+                    classifer labels and 0 = no match between labels
     """
-    # creates empty dictionary for results_stats
-    results_stats=dict()
-    
-    # Sets all counters to initial values of zero so that they can 
-    # be incremented while processing through the images in results_dic 
-    results_stats['n_dogs_img'] = 0
-    results_stats['n_match'] = 0
-    results_stats['n_correct_dogs'] = 0
-    results_stats['n_correct_notdogs'] = 0
-    results_stats['n_correct_breed'] = 0       
-    
-    # process through the results dictionary
-    for key in results_dic:
-        # Labels Match Exactly
-        if results_dic[key][2] == 1:
-            results_stats['n_match'] += 1
-            
-        # Pet Image Label is a Dog AND Labels match- counts Correct Breed
-        if sum(results_dic[key][2:]) == 3:
-                results_stats['n_correct_breed'] += 1
-        
-        # Pet Image Label is a Dog - counts number of dog images
-        if results_dic[key][3] == 1:
-            results_stats['n_dogs_img'] += 1
-            
-            # Classifier classifies image as Dog (& pet image is a dog)
-            # counts number of correct dog classifications
-            if results_dic[key][4] == 1:
-                results_stats['n_correct_dogs'] += 1
-                
-        # Pet Image Label is NOT a Dog
+    # Times matching the labels for --profile
+    with profile_stage('match', len(filenames)):
+        # defines truth as pet image label of each file
+        truths = [petlabel_dic[key] for key in filenames]
+
+        # Looks up the match of each pet image label & classifier label in the
+        # precomputed match index instead of comparing the strings of every
+        # image - match=1(yes) if truth is found as stand-alone term within
+        # classifier label (or within any of the top k classifier labels)
+        # otherwise 0(no), as label_match() decides for each (truth, class)
+        # pair
+        match_index = get_match_index(set(truths), label_table.normalized,
+                                      label_match)
+        truth_codes = match_index.truth_codes(truths)
+        class_ids = np.asarray(class_ids, dtype=np.int64)
+        if topk_ids is None:
+            matches = match_index.lookup(truth_codes, class_ids)
         else:
-            # Classifier classifies image as NOT a Dog(& pet image isn't a dog)
-            # counts number of correct NOT dog clasifications.
-            if results_dic[key][4] == 0:
-                results_stats['n_correct_notdogs'] += 1
+            matches = match_index.lookup(
+                truth_codes, np.asarray(topk_ids, dtype=np.int64)).max(axis=1)
+
+    # Creates the columnar results - pet labels as codes into the distinct pet
+    # labels of the match index, classifier labels as ImageNet class indexes
+    # into the lowercase & stripped labels. Used like a dictionary it has
+    # key = filename, value = list [Pet Label, Classifier Label, Match(1=yes,
+    # 0=no)]
+    results_dic = ResultsStore(filenames, list(match_index.truths),
+                               truth_codes, label_table.normalized, class_ids,
+                               matches)
+               
+    # Return results
+    return(results_dic)
 
-    # Calculates run statistics (counts & percentages) below that are calculated
-    # using counters from above.
-    
-    # calculates number of total images
-    results_stats['n_images'] = len(results_dic)
 
-    # calculates number of not-a-dog images using - images & dog images counts
-    results_stats['n_notdogs_img'] = (results_stats['n_images'] - 
-                                      results_stats['n_dogs_img']) 
+def label_match(truth, model_label):
+    """
+    Checks whether the pet image label is found within the classifier label 
+    as a stand-alone term (not within another word).
+     Parameters: 
+      truth - pet image label, lowercase with space between words (string)
+      model_label - classifier label, lowercase & stripped (string)
+     Returns:
+      match - 1 if pet image label is found as a stand-alone term in the 
+              classifier label and 0 if not (int)
+    """
+    # trys to find truth using find() string function to find it within 
+    # classifier label(model_label).
+    found = model_label.find(truth)
+       
+    # If found (0 or greater) then make sure true answer wasn't found within
+    # another word and thus not really found
+    if found >= 0:
+        if ( (found == 0 and len(truth)==len(model_label)) or
+             (  ( (found == 0) or (model_label[found - 1] == " ") )  and
+                ( (found + len(truth) == len(model_label)) or   
+                   (model_label[found + len(truth): found+len(truth)+1] in 
+                  (","," ") ) 
+                )      
+             )
+           ):
+            # found label as stand-alone term (not within label)
+            return 1
+
+    # found within a word/term not a label existing on its own, or not found
+    return 0
+
+
+def compare_architectures(images_dir, petlabel_dic, models, dogsfile,
+                          n_workers=0, tensor_cache=None,
+                          prediction_cache=None, inference_pool=None,
+                          decode_pool=None):
+    """
+    Classifies the images with several model architectures in a single pass
+    over the images, then prints the results of each architecture followed by
+    a side-by-side comparison of them.
+    Parameters:
+      images_dir - The (full) path to the folder of images that are to be
+                   classified by pretrained CNN models (string)
+      petlabel_dic - Dictionary that contains the pet image(true) labels
+                     (see classify_images())
+      models - pretrained CNNs whose architectures are indicated by this 
+               parameter, values must be: resnet alexnet vgg (list of strings)
+      dogsfile - A text file that contains names of all dogs (see 
+                 adjust_results4_isadog())
+      n_workers - number of worker processes that decode & preprocess 
+                  upcoming images while the models run, 0 for none (int)
+      tensor_cache - TensorCache of decoded & cropped images, None for none
+      prediction_cache - PredictionCache checked for each image's classifier
+                         label before running the models, None for none
+      inference_pool - InferencePool of the models the batches of images are
+                       classified by, None for no pool
+      decode_pool - pool of decode workers from create_decode_pool(), used
+                    instead of n_workers, None for none
+    Returns:
+      results_stats_by_arch - Dictionary with key as model architecture and
+                              value as that model's results_stats (see 
+                              calculates_results_stats())
+    """
+    # Classifies images with all models - key = architecture, value = 
+    # results dictionary of that architecture
+    results_dic_by_arch = classify_images_multi(images_dir, petlabel_dic,
+                                                models, n_workers=n_workers,
+                                                tensor_cache=tensor_cache,
+                                                prediction_cache=prediction_cache,
+                                                inference_pool=inference_pool,
+                                                decode_pool=decode_pool)
+
+    # Adjusts results, calculates & prints statistics for each architecture
+    results_stats_by_arch = dict()
+    for model in models:
+        n_images = len(results_dic_by_arch[model])
+        with profile_stage('is_a_dog', n_images):
+            adjust_results4_isadog(results_dic_by_arch[model], dogsfile)
+        with profile_stage('stats', n_images):
+            results_stats_by_arch[model] = calculates_results_stats(
+                                               results_dic_by_arch[model])
+        with profile_stage('print'):
+            print_results(results_dic_by_arch[model],
+                          results_stats_by_arch[model], model, True, True)
+
+    # Throughput of each model's forward passes in images per second - timed
+    # by the inference processes if they ran the models. It's kept for each
+    # architecture, so models evicted from the model cache aren't loaded
+    # again to report it
+    images_per_sec_by_arch = dict()
+    for model in models:
+        if inference_pool is not None:
+            images_per_sec_by_arch[model] = \
+                inference_pool.model_images_per_sec(model)
+        else:
+            images_per_sec_by_arch[model] = model_images_per_sec(model)
+
+    print_comparison(results_stats_by_arch, images_per_sec_by_arch)
 
-    # Calculates % correct for matches
-    results_stats['pct_match'] = (results_stats['n_match'] / 
-                                  results_stats['n_images'])*100.0
-    
-    # Calculates % correct dogs
-    results_stats['pct_correct_dogs'] = (results_stats['n_correct_dogs'] / 
-                                         results_stats['n_dogs_img'])*100.0    
-
-    # Calculates % correct breed of dog
-    results_stats['pct_correct_breed'] = (results_stats['n_correct_breed'] / 
-                                          results_stats['n_dogs_img'])*100.0
-
-    # Calculates % correct not-a-dog images
-    # Uses conditional statement for when no 'not a dog' images were submitted 
-    if results_stats['n_notdogs_img'] > 0:
-        results_stats['pct_correct_notdogs'] = (results_stats['n_correct_notdogs'] /
-                                                results_stats['n_notdogs_img'])*100.0
-    else:
-        results_stats['pct_correct_notdogs'] = 0.0
-        
-    # returns results_stast dictionary 
-    return results_stats
+    return results_stats_by_arch
 
 
-def print_results(results_dic, results_stats, model, 
-                  print_incorrect_dogs = False, print_incorrect_breed = False):
+def print_comparison(results_stats_by_arch, images_per_sec_by_arch):
     """
-    Prints summary results on the classification and then prints incorrectly 
-    classified dogs and incorrectly classified dog breeds if user indicates 
-    they want those printouts (use non-default values)
+    Prints the statistics of several model architectures side-by-side with
+    one column per architecture, so the 'best' model can be picked at a
+    glance.
     Parameters:
-      results_dic - Dictionary with key as image filename and value as a List 
-             (index)idx 0 = pet image label (string)
-                    idx 1 = classifier label (string)
-                    idx 2 = 1/0 (int)  where 1 = match between pet image and 
-                            classifer labels and 0 = no match between labels
-                    idx 3 = 1/0 (int)  where 1 = pet image 'is-a' dog and 
-                            0 = pet Image 'is-NOT-a' dog. 
-                    idx 4 = 1/0 (int)  where 1 = Classifier classifies image 
-                            'as-a' dog and 0 = Classifier classifies image  
-                            'as-NOT-a' dog.
-      results_stats - Dictionary that contains the results statistics (either a
-                     percentage or a count) where the key is the statistic's 
-                     name (starting with 'pct' for percentage or 'n' for count)
-                     and the value is the statistic's value 
-      model - pretrained CNN whose architecture is indicated by this parameter,
-              values must be: resnet alexnet vgg (string)
-      print_incorrect_dogs - True prints incorrectly classified dog images and 
-                             False doesn't print anything(default) (bool)  
-      print_incorrect_breed - True prints incorrectly classified dog breeds and 
-                              False doesn't print anything(default) (bool) 
+      results_stats_by_arch - Dictionary with key as model architecture and
+                              value as that model's results_stats (see 
+                              calculates_results_stats())
+      images_per_sec_by_arch - Dictionary with key as model architecture and
+                               value as the images per second of that model's
+                               forward passes (float)
     Returns:
            None - simply printing results.
-    """    
-    # Prints summary statistics over the run
-    print("\n\n*** Results Summary for CNN Model Architecture",model.upper(), 
-          "***")
-    print("%20s: %3d" % ('N Images', results_stats['n_images']))
-    print("%20s: %3d" % ('N Dog Images', results_stats['n_dogs_img']))
-    print("%20s: %3d" % ('N Not-Dog Images', results_stats['n_notdogs_img']))
-
-    # Prints summary statistics (percentages) on Model Run
-    print(" ")
-    for key in results_stats:
+    """
+    models = list(results_stats_by_arch)
+
+    print("\n\n*** Comparison of CNN Model Architectures ***")
+    print("%20s" % '' + "".join("%12s" % model.upper() for model in models))
+
+    # Prints counts then percentages in the order of results_stats
+    for key in results_stats_by_arch[models[0]]:
+        if key[0] == "n":
+            print("%20s" % key + "".join("%12d" %
+                  results_stats_by_arch[model][key] for model in models))
+    for key in results_stats_by_arch[models[0]]:
         if key[0] == "p":
-            print("%20s: %5.1f" % (key, results_stats[key]))
-    
+            print("%20s" % key + "".join("%12.1f" %
+                  results_stats_by_arch[model][key] for model in models))
 
-    # IF print_incorrect_dogs == True AND there were images incorrectly 
-    # classified as dogs or vice versa - print out these cases
-    if (print_incorrect_dogs and 
-        ( (results_stats['n_correct_dogs'] + results_stats['n_correct_notdogs'])
-          != results_stats['n_images'] ) 
-       ):
-        print("\nINCORRECT Dog/NOT Dog Assignments:")
-
-        # process through results dict, printing incorrectly classified dogs
-        for key in results_dic:
-
-            # Pet Image Label is a Dog - Classified as NOT-A-DOG -OR- 
-            # Pet Image Label is NOT-a-Dog - Classified as a-DOG
-            if sum(results_dic[key][3:]) == 1:
-                print("Real: %-26s   Classifier: %-30s" % (results_dic[key][0],
-                                                          results_dic[key][1]))
-
-    # IF print_incorrect_breed == True AND there were dogs whose breeds 
-    # were incorrectly classified - print out these cases                    
-    if (print_incorrect_breed and 
-        (results_stats['n_correct_dogs'] != results_stats['n_correct_breed']) 
-       ):
-        print("\nINCORRECT Dog Breed Assignment:")
-
-        # process through results dict, printing incorrectly classified breeds
-        for key in results_dic:
-
-            # Pet Image Label is-a-Dog, classified as-a-dog but is WRONG breed
-            if ( sum(results_dic[key][3:]) == 2 and
-                results_dic[key][2] == 0 ):
-                print("Real: %-26s   Classifier: %-30s" % (results_dic[key][0],
-                                                          results_dic[key][1]))
+    print("%20s" % 'images/sec' + "".join("%12.1f" %
+          images_per_sec_by_arch[model] for model in models))
                 
                 
+def print_quantization_deltas(results_stats_by_arch):
+    """
+    Prints how much the match & correct breed percentages changed between 
+    each original (fp32) model and its INT8 quantized version.
+    Parameters:
+      results_stats_by_arch - Dictionary with key as model architecture and
+                              value as that model's results_stats (see 
+                              calculates_results_stats()), including the 
+                              quantized architectures (like vgg_int8)
+    Returns:
+           None - simply printing results.
+    """
+    print("\n\n*** INT8 Quantized vs Original (fp32) Models ***")
+    print("%20s%20s%20s" % ('', 'pct_match delta', 'pct_correct_breed delta'))
+    for model in results_stats_by_arch:
+        if model + quantized_suffix in results_stats_by_arch:
+            fp32_stats = results_stats_by_arch[model]
+            int8_stats = results_stats_by_arch[model + quantized_suffix]
+            print("%20s%20.1f%20.1f" % (model.upper(),
+                  int8_stats['pct_match'] - fp32_stats['pct_match'],
+                  int8_stats['pct_correct_breed'] - 
+                  fp32_stats['pct_correct_breed']))
+                
                 
 # Call to main function to run the program
 if __name__ == "__main__":
@@ -1,74 +1,956 @@
-import ast
-from PIL import Image
+import hashlib
+import io
+import json
+import os
+import socket
+from collections import deque
+from multiprocessing import Pool
+from time import time
 import torchvision.transforms as transforms
-from torch.autograd import Variable
+import numpy as np
+import torch
+import torch.nn.functional as F
 import torchvision.models as models
-from torch import __version__
 
-resnet18 = models.resnet18(pretrained=True)
-alexnet = models.alexnet(pretrained=True)
-vgg16 = models.vgg16(pretrained=True)
+# Imports backends that run the models' forward pass
+from inference_backends import (TorchBackend, OnnxRuntimeBackend,
+                                backend_names, onnx_model_dir)
 
-models = {'resnet': resnet18, 'alexnet': alexnet, 'vgg': vgg16}
+# Imports decoders for the crop stage of the preprocessing
+from image_decoders import decoders, decoder_names
 
-# obtain ImageNet labels
-with open('imagenet1000_clsid_to_human.txt') as imagenet_classes_file:
-    imagenet_classes_dict = ast.literal_eval(imagenet_classes_file.read())
+# Imports compiled table of the ImageNet labels
+from label_table import load_label_table
 
-def classifier(img_path, model_name):
-    # load the image
-    img_pil = Image.open(img_path)
-
-    # define transforms
-    preprocess = transforms.Compose([
-        transforms.Resize(256),
-        transforms.CenterCrop(224),
-        transforms.ToTensor(),
-        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-    ])
-    
-    # preprocess the image
-    img_tensor = preprocess(img_pil)
-    
-    # resize the tensor (add dimension for batch)
-    img_tensor.unsqueeze_(0)
-    
-    # wrap input in variable, wrap input in variable - no longer needed for
-    # v 0.4 & higher code changed 04/26/2018 by Jennifer S. to handle PyTorch upgrade
-    pytorch_ver = __version__.split('.')
-    
-    # pytorch versions 0.4 & hihger - Variable depreciated so that it returns
-    # a tensor. So to address tensor as output (not wrapper) and to mimic the 
-    # affect of setting volatile = True (because we are using pretrained models
-    # for inference) we can set requires_gradient to False. Here we just set 
-    # requires_grad_ to False on our tensor 
-    if int(pytorch_ver[0]) > 0 or int(pytorch_ver[1]) >= 4:
-        img_tensor.requires_grad_(False)
-    
-    # pytorch versions less than 0.4 - uses Variable because not-depreciated
+# Imports timing of the stages for --profile
+from pipeline_profiler import profile_stage
+
+# Imports memory-budgeted cache of the loaded models
+from model_cache import ModelCache
+
+# Maps each architecture name to the torchvision function that builds it.
+# Models are NOT built at import - a model is only built (and its pretrained
+# weights loaded) the first time it's requested by load_model()
+model_builders = {'resnet': models.resnet18, 'alexnet': models.alexnet,
+                  'vgg': models.vgg16}
+
+# Folder of exported (TorchScript) models written by export_models.py - when
+# an architecture's exported model is found here, load_model() loads it
+# instead of building the model with torchvision. Set use_exported_models to
+# False to always build the models with torchvision.
+exported_model_dir = 'exported_models/'
+use_exported_models = True
+
+# File of the best CPU settings found by autotune.py for each host - the
+# settings for this host are applied when this module is imported. Setting
+# the CLASSIFIER_TUNING_CONFIG environment variable to '' skips them.
+tuning_config_path = os.environ.get('CLASSIFIER_TUNING_CONFIG',
+                                    'autotune_config.json')
+
+# Models that are loaded, key = architecture name - with a memory budget
+# (set_model_cache_budget() or the CLASSIFIER_MODEL_CACHE_MB environment
+# variable) the least recently used models are evicted to stay within it and
+# loaded again when they're requested. Evicting a model also drops its
+# session (see drop_session()).
+model_cache = ModelCache(
+    int(float(os.environ['CLASSIFIER_MODEL_CACHE_MB']) * 2**20)
+    if os.environ.get('CLASSIFIER_MODEL_CACHE_MB') else None,
+    on_evict=lambda model_name: drop_session(model_name))
+
+# Load statistics for models that have been built so far, key = architecture
+# name and value = dictionary with 'load_time' (seconds of the last load),
+# 'n_bytes' (bytes held by the model's parameters & buffers) and 'n_loads'
+# (times it was loaded, more than 1 if it was evicted)
+model_load_stats = dict()
+
+# Throughput of the forward passes of each architecture's sessions, key =
+# architecture name and value = dictionary with 'n_images' & 'forward_time'
+# (seconds) - kept here instead of in the sessions, since a session is
+# dropped when its model is evicted from model_cache
+forward_stats = dict()
+
+# Backend that runs the models' forward pass for new sessions - one of
+# backend_names, changed with set_inference_backend()
+inference_backend = 'torch'
+
+# Preprocessing applied to every image before it's given to a model - built
+# once here instead of for every image. It's split in two stages so that the
+# uint8 crop (the expensive decode & resize) can be cached by TensorCache and
+# shared by all architectures - crop_params describes the crop stage and must
+# change whenever crop_image changes.
+# The constants are also embedded in exported models (see export_models.py).
+resize_size = 256
+crop_size = 224
+normalize_mean = [0.485, 0.456, 0.406]
+normalize_std = [0.229, 0.224, 0.225]
+crop_image = transforms.Compose([
+    transforms.Resize(resize_size),
+    transforms.CenterCrop(crop_size)
+])
+crop_params = 'Resize(%d),CenterCrop(%d)' % (resize_size, crop_size)
+normalize_image = transforms.Compose([
+    transforms.ToTensor(),
+    transforms.Normalize(mean=normalize_mean, std=normalize_std)
+])
+preprocess = transforms.Compose([crop_image, normalize_image])
+
+# Decoder that produces the crop stage of the preprocessing - one of
+# decoder_names, changed with set_image_decoder()
+image_decoder = 'pil'
+
+
+def load_tuning_config(config_path):
+    """
+    Returns the CPU settings autotune.py found best for this host.
+    Parameters:
+     config_path - path to the JSON file written by autotune.py (string)
+    Returns:
+     host_tuning - Dictionary with 'num_interop_threads' (int) and 'archs', a
+                   dictionary with key as architecture and value as a
+                   dictionary of 'num_threads' (int), 'channels_last' (bool)
+                   and 'batch_size' (int) - empty if this host wasn't tuned
+    """
+    if not config_path or not os.path.exists(config_path):
+        return dict()
+    with open(config_path) as config_file:
+        return json.load(config_file).get(socket.gethostname(), dict())
+
+
+# Applies the tuned CPU settings of this host - inter-op threads can only be
+# set before pytorch starts any parallel work, so it's done at import
+host_tuning = load_tuning_config(tuning_config_path)
+if ('num_interop_threads' in host_tuning and
+        hasattr(torch, 'set_num_interop_threads')):
+    try:
+        torch.set_num_interop_threads(host_tuning['num_interop_threads'])
+    except RuntimeError:
+        # parallel work already started (e.g. set by another module)
+        pass
+
+# obtain ImageNet labels - loaded from the compiled table, which is compiled
+# again from the text file only when the text file changes
+label_table = load_label_table('imagenet1000_clsid_to_human.txt')
+
+
+def model_nbytes(model):
+    """
+    Counts the bytes of memory held by a model's parameters and buffers.
+    Quantized models keep their weights packed outside of parameters(), so
+    for those the size of their saved state_dict is counted instead. Exported
+    models are frozen - their weights are inlined into the graph as constants
+    - so the bytes counted when they were exported are used.
+    Parameters:
+     model - pytorch model (torch.nn.Module or torch.jit.ScriptModule)
+    Returns:
+     n_bytes - number of bytes held by the model's tensors (int)
+    """
+    if hasattr(model, 'weights_nbytes'):
+        return int(model.weights_nbytes)
+
+    n_bytes = 0
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        n_bytes += tensor.numel() * tensor.element_size()
+
+    if n_bytes == 0:
+        state_buffer = io.BytesIO()
+        torch.save(model.state_dict(), state_buffer)
+        n_bytes = len(state_buffer.getvalue())
+    return n_bytes
+
+
+def load_model(model_name):
+    """
+    Returns the pretrained model for architecture model_name, building it and
+    recording how long that took and how much memory it holds the first time
+    it's requested (or the first time after it was evicted from
+    model_cache).
+    Parameters:
+     model_name - CNN architecture, values must be: resnet alexnet vgg (string)
+    Returns:
+     model - pretrained CNN model (torch.nn.Module)
+    """
+    if model_name not in model_builders:
+        raise ValueError("model_name must be one of: " +
+                         ", ".join(sorted(model_builders)) + " (got " +
+                         repr(model_name) + ")")
+
+    model = model_cache.get(model_name)
+    if model is not None:
+        return model
+
+    # Builds model only if it isn't loaded - from its exported model file if
+    # there is one. A model loaded before has a known size, so older models
+    # are evicted first to keep the old & new models from being held at once
+    if model_name in model_load_stats:
+        model_cache.make_room(model_load_stats[model_name]['n_bytes'])
+    start_time = time()
+    exported_path = exported_model_path(model_name)
+    if use_exported_models and os.path.exists(exported_path):
+        model = load_exported_model(exported_path)
     else:
-        # apply model to input
-        # wrap input in variable
-        data = Variable(img_tensor, volatile = True) 
-
-    # apply model to input
-    model = models[model_name]
-
-    # puts model in evaluation mode
-    # instead of (default)training mode
-    model = model.eval()
-    
-    # apply data to model - adjusted based upon version to account for 
-    # operating on a Tensor for version 0.4 & higher.
-    if int(pytorch_ver[0]) > 0 or int(pytorch_ver[1]) >= 4:
-        output = model(img_tensor)
-
-    # pytorch versions less than 0.4
+        model = model_builders[model_name](pretrained=True)
+    load_time = time() - start_time
+
+    previous_stats = model_load_stats.get(model_name, dict())
+    model_load_stats[model_name] = {'load_time': load_time,
+                                    'n_bytes': model_nbytes(model),
+                                    'n_loads': previous_stats.get('n_loads',
+                                                                  0) + 1}
+
+    # A model loaded again after being evicted has the same weights, so the
+    # fingerprint from model_fingerprint() is kept
+    if 'fingerprint' in previous_stats:
+        model_load_stats[model_name]['fingerprint'] = \
+            previous_stats['fingerprint']
+    model_cache.put(model_name, model, model_load_stats[model_name]['n_bytes'])
+    return model
+
+
+def exported_model_path(model_name):
+    """
+    Returns the path of the exported model file for architecture model_name.
+    Parameters:
+     model_name - CNN architecture (string)
+    Returns:
+     path - path to the file in exported_model_dir (string)
+    """
+    return os.path.join(exported_model_dir, model_name + '.pt')
+
+
+def load_exported_model(exported_path):
+    """
+    Loads an exported (TorchScript) model written by export_models.py and
+    checks that the preprocessing constants embedded in it match the
+    preprocessing used here, so a model exported for other preprocessing is
+    never used by mistake.
+    Parameters:
+     exported_path - path to the exported model file (string)
+    Returns:
+     model - exported model (torch.jit.ScriptModule)
+    """
+    model = torch.jit.load(exported_path)
+    if (int(model.resize_size) != resize_size or
+            int(model.crop_size) != crop_size or
+            not torch.allclose(model.mean.view(-1),
+                               torch.tensor(normalize_mean)) or
+            not torch.allclose(model.std.view(-1),
+                               torch.tensor(normalize_std))):
+        raise ValueError(exported_path + " was exported with different "
+                         "preprocessing - export it again with "
+                         "export_models.py")
+
+    # The frozen model's weights can't be sized or hashed, so the ones
+    # recorded when it was exported are needed
+    if (not hasattr(model, 'weights_nbytes') or
+            not hasattr(model, 'weights_sha1')):
+        raise ValueError(exported_path + " was exported without the size & "
+                         "hash of its weights - export it again with "
+                         "export_models.py")
+    return model
+
+
+def preload_models(model_names):
+    """
+    Builds the models for the chosen architectures up front so the cost of
+    loading them isn't paid while classifying the first image.
+    Parameters:
+     model_names - list of CNN architectures, values must be: resnet alexnet
+                   vgg (list of strings)
+    Returns:
+     None - models are kept in model_cache
+    """
+    for model_name in model_names:
+        load_model(model_name)
+
+
+def model_fingerprint(model_name):
+    """
+    Returns a hash of the weights of the model for architecture model_name,
+    so results saved for one set of weights can be told apart from results
+    of another (e.g. after torchvision updates its pretrained weights).
+    Computed the first time it's requested and kept in model_load_stats, so
+    the model is only loaded (again, if it was evicted) the first time.
+    Parameters:
+     model_name - CNN architecture, values must be: resnet alexnet vgg (string)
+    Returns:
+     fingerprint - hexadecimal hash of the model's weights (string)
+    """
+    if 'fingerprint' not in model_load_stats.get(model_name, dict()):
+        model = load_model(model_name)
+        # Exported models are frozen, so the hash of the weights they were
+        # exported from is used - the same hash as the torchvision model's
+        if hasattr(model, 'weights_sha1'):
+            fingerprint = bytes(model.weights_sha1.tolist()).hex()
+        else:
+            fingerprint = weights_hash(model).hexdigest()
+        model_load_stats[model_name]['fingerprint'] = fingerprint
+
+    return model_load_stats[model_name]['fingerprint']
+
+
+def weights_hash(model):
+    """
+    Hashes the weights in a model's state_dict.
+    Parameters:
+     model - pytorch model (torch.nn.Module)
+    Returns:
+     weights_hash - SHA-1 hash object of the model's weights
+    """
+    state_hash = hashlib.sha1()
+    state_dict = model.state_dict()
+    for name in sorted(state_dict):
+        state_hash.update(name.encode('utf-8'))
+        value = state_dict[name]
+
+        # Quantized & packed weights can't be viewed as numpy arrays so
+        # they're hashed in their saved form instead
+        if (isinstance(value, torch.Tensor) and
+                not getattr(value, 'is_quantized', False)):
+            state_hash.update(value.cpu().contiguous().numpy()
+                              .reshape(-1).view(np.uint8))
+        else:
+            value_buffer = io.BytesIO()
+            torch.save(value, value_buffer)
+            state_hash.update(value_buffer.getvalue())
+    return state_hash
+
+
+def check_model_cache_budget(model_names):
+    """
+    Checks that the models of architectures used together (every batch goes
+    through each of them) fit in the budget of model_cache at once -
+    otherwise they'd evict each other and be loaded again for every batch.
+    Models that weren't loaded (like with the onnxruntime backend) aren't
+    counted.
+    Parameters:
+     model_names - CNN architectures, already loaded (list of strings)
+    Returns:
+     None - raises ValueError if the models don't fit
+    """
+    if model_cache.max_bytes is None:
+        return
+    loaded_names = [model_name for model_name in model_names
+                    if model_name in model_load_stats]
+    n_bytes = sum(model_load_stats[model_name]['n_bytes']
+                  for model_name in set(loaded_names))
+    if n_bytes > model_cache.max_bytes:
+        raise ValueError("model cache budget of %.1f MB can't hold %s at "
+                         "once (%.1f MB) - raise the budget or classify with "
+                         "fewer architectures" %
+                         (model_cache.max_bytes / 2**20,
+                          ", ".join(loaded_names), n_bytes / 2**20))
+
+
+def model_images_per_sec(model_name):
+    """
+    Returns the throughput of the forward passes of architecture model_name's
+    sessions so far, including sessions dropped when the model was evicted.
+    Parameters:
+     model_name - CNN architecture (string)
+    Returns:
+     images_per_sec - images classified per second of forward passes, 0.0
+                      if the model hasn't run (float)
+    """
+    model_stats = forward_stats.get(model_name)
+    if model_stats is None or model_stats['forward_time'] <= 0.0:
+        return 0.0
+    return model_stats['n_images'] / model_stats['forward_time']
+
+
+def print_model_load_stats():
+    """
+    Prints how long each loaded model took to load, how much memory it holds,
+    whether it's still resident in model_cache & how many times it was
+    evicted.
+    Parameters:
+     None - uses model_load_stats & model_cache
+    Returns:
+     None - simply printing results.
+    """
+    print("\n*** Model Load Statistics ***")
+    cache_stats = model_cache.stats()
+    for model_name in model_load_stats:
+        model_stats = cache_stats['models'].get(model_name, dict())
+        print("%10s: %6.2f sec  %8.1f MB  %8.1f MB resident  %d loads  "
+              "%d evictions" %
+              (model_name, model_load_stats[model_name]['load_time'],
+               model_load_stats[model_name]['n_bytes'] / 2**20,
+               model_stats.get('resident_bytes', 0) / 2**20,
+               model_load_stats[model_name]['n_loads'],
+               model_stats.get('n_evictions', 0)))
+    print("%10s: %8.1f MB resident of %s budget, %d evictions" %
+          ('cache', cache_stats['resident_bytes'] / 2**20,
+           'no' if cache_stats['max_bytes'] is None else
+           '%.1f MB' % (cache_stats['max_bytes'] / 2**20),
+           cache_stats['n_evictions']))
+
+
+def set_model_cache_budget(max_mb):
+    """
+    Sets the memory budget of model_cache, evicting the least recently used
+    models if it's over the new budget.
+    Parameters:
+     max_mb - most megabytes held by the loaded models, None for no budget
+              (float)
+    Returns:
+     None
+    """
+    model_cache.set_max_bytes(None if max_mb is None else
+                              int(max_mb * 2**20))
+
+
+def set_image_decoder(decoder_name):
+    """
+    Chooses the decoder that produces the crop stage of the preprocessing.
+    Parameters:
+     decoder_name - name of the decoder, one of decoder_names (string)
+    Returns:
+     None
+    """
+    global image_decoder
+    if decoder_name not in decoder_names:
+        raise ValueError("decoder must be one of: " + ", ".join(decoder_names)
+                         + " (got " + repr(decoder_name) + ")")
+    image_decoder = decoder_name
+
+
+def preprocess_params():
+    """
+    Returns the description of the preprocessing used for cache keys - the
+    crop stage plus the image decoder. The pil decoder keeps the keys of
+    caches made before decoders could be chosen.
+    Parameters:
+     None
+    Returns:
+     params - description of the preprocessing (string)
+    """
+    if image_decoder == 'pil':
+        return crop_params
+    return crop_params + ',' + image_decoder
+
+
+def decode_crop(img_path, decoder=None):
+    """
+    Decodes an image and returns its uint8 Resize/CenterCrop crop.
+    Parameters:
+     img_path - path to the image file (string)
+     decoder - name of the decoder, one of decoder_names, None for the
+               current image_decoder (string)
+    Returns:
+     crop - 224x224(x3) uint8 numpy array
+    """
+    return decoders[decoder or image_decoder](img_path, crop_image,
+                                              resize_size)
+
+
+def load_image_array(img_path, tensor_cache=None, decoder=None):
+    """
+    Loads & preprocesses one image into a 3x224x224 array. Used by the worker
+    processes of iter_image_batches(), so it returns a numpy array that's
+    cheap to send back to the main process.
+    Parameters:
+     img_path - path to the image file (string)
+     tensor_cache - TensorCache of image crops to use, None for no cache
+     decoder - name of the image decoder, None for the current image_decoder
+               (string)
+    Returns:
+     img_array - 3x224x224 float32 numpy array of the preprocessed image
+     hit - True if the crop came from tensor_cache (bool)
+     n_bytes - bytes written to tensor_cache, for TensorCache.record() in
+               the main process (int)
+    """
+    # Decodes & crops the image only if there's no cache or its crop isn't
+    # cached yet
+    hit = False
+    n_bytes = 0
+    if tensor_cache is None:
+        with profile_stage('decode', 1):
+            crop = decode_crop(img_path, decoder)
+    else:
+        key = tensor_cache.image_key(img_path)
+        crop = tensor_cache.get(key)
+        hit = crop is not None
+        if not hit:
+            with profile_stage('decode', 1):
+                crop = decode_crop(img_path, decoder)
+            n_bytes = tensor_cache.put(key, crop)
+
+    with profile_stage('preprocess', 1):
+        img_array = normalize_image(crop).numpy()
+    return img_array, hit, n_bytes
+
+
+def init_decode_worker():
+    """
+    Sets up a decode worker process - runs once in each process of a decode
+    pool. Forked workers inherit the main process' intra-op threads, so each
+    one is limited to a single thread to keep the workers (and the model
+    running in the main process) from oversubscribing the cores.
+    Parameters:
+     None
+    Returns:
+     None
+    """
+    torch.set_num_threads(1)
+
+
+def create_decode_pool(n_workers):
+    """
+    Creates the pool of worker processes that decode & preprocess images for
+    iter_image_batches(). Created once per run and passed to the classify
+    functions, so the workers aren't started again for every call.
+    Parameters:
+     n_workers - number of worker processes, 0 for none (int)
+    Returns:
+     decode_pool - multiprocessing Pool, None if n_workers is 0
+    """
+    if n_workers <= 0:
+        return None
+    return Pool(n_workers, initializer=init_decode_worker)
+
+
+def iter_image_batches(img_paths, batch_size=32, n_workers=0, n_prefetch=2,
+                       tensor_cache=None, decode_pool=None):
+    """
+    Yields the preprocessed images as (batch)x3x224x224 tensors, in the same
+    order as img_paths. With a decode pool (or n_workers > 0) the images are
+    decoded and preprocessed by worker processes that keep working on
+    upcoming batches while the caller runs the model on the current one. At
+    most n_prefetch batches of images are queued up ahead of the caller.
+    Parameters:
+     img_paths - paths to the image files (list of strings)
+     batch_size - most images in one batch (int)
+     n_workers - number of worker processes started for this call only when
+                 no decode_pool is given, 0 decodes the images in this
+                 process one batch at a time (int)
+     n_prefetch - most batches decoded ahead of the caller (int)
+     tensor_cache - TensorCache of image crops to use, None for no cache
+     decode_pool - pool from create_decode_pool() used instead of starting
+                   workers, None for none
+    Returns:
+     generator of (batch)x3x224x224 tensors of preprocessed images
+    """
+    if decode_pool is None and n_workers <= 0:
+        for start in range(0, len(img_paths), batch_size):
+            batch = []
+            for img_path in img_paths[start:start + batch_size]:
+                img_array, hit, n_bytes = load_image_array(img_path,
+                                                           tensor_cache,
+                                                           image_decoder)
+                if tensor_cache is not None:
+                    tensor_cache.record(img_path, hit, n_bytes)
+                batch.append(torch.from_numpy(img_array))
+            yield torch.stack(batch)
+        return
+
+    pool = decode_pool or create_decode_pool(n_workers)
+    try:
+        # pending holds the paths & results of images sent to the workers in
+        # order, bounded so at most n_prefetch batches are decoded ahead
+        pending = deque()
+        max_pending = max(1, n_prefetch) * batch_size
+        next_idx = 0
+        while next_idx < len(img_paths) or pending:
+            while next_idx < len(img_paths) and len(pending) < max_pending:
+                img_path = img_paths[next_idx]
+                # the decoder is passed along since workers may not share
+                # this process' globals
+                pending.append((img_path, pool.apply_async(
+                    load_image_array, (img_path, tensor_cache,
+                                       image_decoder))))
+                next_idx += 1
+
+            # Waits only for the images of the current batch
+            batch = []
+            for _ in range(min(batch_size, len(pending))):
+                img_path, result = pending.popleft()
+                img_array, hit, n_bytes = result.get()
+
+                # The workers got copies of tensor_cache, so the bytes they
+                # wrote are counted (and crops evicted) here
+                if tensor_cache is not None:
+                    tensor_cache.record(img_path, hit, n_bytes)
+                batch.append(torch.from_numpy(img_array))
+            yield torch.stack(batch)
+    finally:
+        # A pool started for this call only is stopped, a decode_pool is
+        # kept for the next call
+        if decode_pool is None:
+            pool.terminate()
+
+
+def onnx_model_path(model_name):
+    """
+    Returns the path of the ONNX model file for architecture model_name.
+    Parameters:
+     model_name - CNN architecture (string)
+    Returns:
+     path - path to the file in onnx_model_dir (string)
+    """
+    return os.path.join(onnx_model_dir, model_name + '.onnx')
+
+
+def create_backend(model_name, backend_name):
+    """
+    Creates the inference backend that runs the model for architecture
+    model_name.
+    Parameters:
+     model_name - CNN architecture, values must be: resnet alexnet vgg (string)
+     backend_name - name of the backend, one of backend_names (string)
+    Returns:
+     backend - TorchBackend or OnnxRuntimeBackend
+    """
+    if backend_name == 'torch':
+        arch_tuning = host_tuning.get('archs', dict()).get(model_name, dict())
+        return TorchBackend(load_model(model_name),
+                            arch_tuning.get('num_threads'),
+                            arch_tuning.get('channels_last', False))
+    if backend_name == 'onnxruntime':
+        onnx_path = onnx_model_path(model_name)
+        if not os.path.exists(onnx_path):
+            raise ValueError(onnx_path + " not found - export it with "
+                             "export_models.py --format onnx")
+        return OnnxRuntimeBackend(onnx_path)
+    raise ValueError("backend must be one of: " + ", ".join(backend_names) +
+                     " (got " + repr(backend_name) + ")")
+
+
+def tuned_batch_size(model_name):
+    """
+    Returns the batch size autotune.py found best for architecture model_name
+    on this host.
+    Parameters:
+     model_name - CNN architecture (string)
+    Returns:
+     batch_size - tuned batch size, 32 if the host wasn't tuned (int)
+    """
+    return host_tuning.get('archs', dict()).get(model_name, dict()).get(
+        'batch_size', 32)
+
+
+def set_inference_backend(backend_name):
+    """
+    Chooses the inference backend used by classifier(), classify_batch() and
+    the other functions of this module from now on.
+    Parameters:
+     backend_name - name of the backend, one of backend_names (string)
+    Returns:
+     None
+    """
+    global inference_backend
+    if backend_name not in backend_names:
+        raise ValueError("backend must be one of: " + ", ".join(backend_names)
+                         + " (got " + repr(backend_name) + ")")
+    inference_backend = backend_name
+
+    # Sessions made with the previous backend are made again when needed
+    sessions.clear()
+
+
+class ClassifierSession(object):
+    """
+    Holds everything needed to classify images with one CNN architecture - the
+    inference backend running the model with gradients turned off, the
+    preprocessing pipeline and the ImageNet labels - so that classifying an
+    image only costs decoding it and the model's forward pass.
+    Parameters:
+     model_name - CNN architecture, values must be: resnet alexnet vgg (string)
+     n_warmup - number of forward passes run on a blank image when the session
+                is created, so the first real image isn't slowed down by
+                one-time setup inside the backend (int)
+     backend - name of the inference backend, one of backend_names, None for
+               the current inference_backend (string)
+    """
+    def __init__(self, model_name, n_warmup=1, backend=None):
+        self.model_name = model_name
+        self.preprocess = preprocess
+        self.labels = label_table.names
+        self.backend = create_backend(model_name, backend or inference_backend)
+
+        # Batch size autotune.py found best for this architecture on this host
+        self.batch_size = tuned_batch_size(model_name)
+
+        # Warms up the backend directly, so the warmup isn't counted by
+        # images_per_sec() or model_images_per_sec()
+        for _ in range(n_warmup):
+            self.backend.forward(torch.zeros(1, 3, crop_size, crop_size))
+
+        # Counts images & seconds spent in the model's forward pass for
+        # images_per_sec()
+        self.n_images = 0
+        self.forward_time = 0.0
+
+    def forward(self, batch_tensor):
+        """
+        Applies the model to a batch of preprocessed images.
+        Parameters:
+         batch_tensor - (batch)x3x224x224 tensor of preprocessed images
+        Returns:
+         output - (batch)x1000 tensor of class scores
+        """
+        start_time = time()
+        with profile_stage('forward', batch_tensor.size(0)):
+            output = self.backend.forward(batch_tensor)
+        forward_time = time() - start_time
+        self.forward_time += forward_time
+        self.n_images += batch_tensor.size(0)
+
+        # Also counted for the architecture, for model_images_per_sec()
+        model_stats = forward_stats.setdefault(
+            self.model_name, {'n_images': 0, 'forward_time': 0.0})
+        model_stats['forward_time'] += forward_time
+        model_stats['n_images'] += batch_tensor.size(0)
+        return output
+
+    def images_per_sec(self):
+        """
+        Returns the throughput of the model's forward pass so far.
+        Parameters:
+         None
+        Returns:
+         images_per_sec - images classified per second of forward passes
+                          (float)
+        """
+        if self.forward_time <= 0.0:
+            return 0.0
+        return self.n_images / self.forward_time
+
+    def load_image(self, img_path):
+        """
+        Loads & preprocesses one image into a 3x224x224 tensor.
+        Parameters:
+         img_path - path to the image file (string)
+        Returns:
+         img_tensor - 3x224x224 tensor of the preprocessed image
+        """
+        with profile_stage('decode', 1):
+            crop = decode_crop(img_path)
+        with profile_stage('preprocess', 1):
+            return normalize_image(crop)
+
+    def predict(self, batch_tensor):
+        """
+        Returns the index of the predicted class of each image in a batch.
+        Parameters:
+         batch_tensor - (batch)x3x224x224 tensor of preprocessed images
+        Returns:
+         pred_idxs - ImageNet class index of each image (list of ints)
+        """
+        return self.forward(batch_tensor).max(1)[1].tolist()
+
+    def predict_topk(self, batch_tensor, k=5):
+        """
+        Returns the k most probable classes of each image in a batch with
+        their softmax probabilities, computed for the whole batch at once.
+        Parameters:
+         batch_tensor - (batch)x3x224x224 tensor of preprocessed images
+         k - number of classes returned per image (int)
+        Returns:
+         topk_probs - (batch)xk tensor of probabilities, most probable first
+         topk_idxs - (batch)xk tensor of ImageNet class indexes
+        """
+        return F.softmax(self.forward(batch_tensor), dim=1).topk(k, 1)
+
+    def classify(self, img_path):
+        """
+        Classifies one image.
+        Parameters:
+         img_path - path to the image file (string)
+        Returns:
+         label - ImageNet label of the image (string)
+        """
+        pred_idx = self.predict(self.load_image(img_path).unsqueeze(0))[0]
+        return self.labels[pred_idx]
+
+    def classify_batch(self, img_paths, batch_size=None, n_workers=0,
+                       n_prefetch=2, tensor_cache=None, decode_pool=None,
+                       return_ids=False):
+        """
+        Classifies many images, stacking the preprocessed images into batches
+        so the model runs one forward pass per batch instead of one per image.
+        Parameters:
+         img_paths - paths to the image files to classify (list of strings)
+         batch_size - most images given to the model in one forward pass,
+                      None for the session's (tuned) batch size (int)
+         n_workers - number of worker processes that decode & preprocess
+                     upcoming images while the model runs, 0 for none (int)
+         n_prefetch - most batches decoded ahead of the model (int)
+         tensor_cache - TensorCache of image crops to use, None for no cache
+         decode_pool - pool of decode workers from create_decode_pool(),
+                       used instead of n_workers, None for none
+         return_ids - True returns the ImageNet class indexes instead of the
+                      labels - some classes share a label (like crane) (bool)
+        Returns:
+         labels - ImageNet label (or class index) of each image, in the same
+                  order as img_paths (list of strings or ints)
+        """
+        pred_idxs = []
+        batch_size = batch_size or self.batch_size
+        for batch_tensor in iter_image_batches(img_paths, batch_size,
+                                               n_workers, n_prefetch,
+                                               tensor_cache, decode_pool):
+            pred_idxs.extend(self.predict(batch_tensor))
+        if return_ids:
+            return pred_idxs
+        return [self.labels[pred_idx] for pred_idx in pred_idxs]
+
+
+# Default session for each architecture used by classifier() and
+# classify_batch(), key = architecture name
+sessions = dict()
+
+
+def get_session(model_name):
+    """
+    Returns the default ClassifierSession for architecture model_name,
+    creating it the first time it's requested.
+    Parameters:
+     model_name - CNN architecture, values must be: resnet alexnet vgg (string)
+    Returns:
+     session - ClassifierSession for model_name
+    """
+    if model_name not in sessions:
+        sessions[model_name] = ClassifierSession(model_name)
     else:
-        # apply data to model
-        output = model(data)
+        # Marks the session's model as recently used in model_cache
+        model_cache.get(model_name)
+    return sessions[model_name]
+
+
+def drop_session(model_name):
+    """
+    Drops the default session of architecture model_name (called when its
+    model is evicted from model_cache, so the session doesn't keep the
+    evicted model in memory).
+    Parameters:
+     model_name - CNN architecture (string)
+    Returns:
+     None
+    """
+    sessions.pop(model_name, None)
+
+
+def classify_batch_topk(img_paths, model_name, k=5, batch_size=None,
+                        n_workers=0, tensor_cache=None, decode_pool=None):
+    """
+    Classifies many images with one model like classify_batch(), but returns
+    the k most probable classes of each image instead of only the best one.
+    Parameters:
+     img_paths - paths to the image files to classify (list of strings)
+     model_name - CNN architecture, values must be: resnet alexnet vgg (string)
+     k - number of classes returned per image (int)
+     batch_size - most images given to the model in one forward pass, None
+                  for the session's (tuned) batch size (int)
+     n_workers - number of worker processes that decode & preprocess
+                 upcoming images while the model runs, 0 for none (int)
+     tensor_cache - TensorCache of image crops to use, None for no cache
+     decode_pool - pool of decode workers from create_decode_pool(), used
+                   instead of n_workers, None for none
+    Returns:
+     topk_results - for each image in the same order as img_paths, a list of
+                    k (class index, ImageNet label, probability) tuples with
+                    the most probable class first (list of lists of tuples)
+    """
+    session = get_session(model_name)
+    batch_size = batch_size or session.batch_size
+    topk_results = []
+    for batch_tensor in iter_image_batches(img_paths, batch_size, n_workers,
+                                           tensor_cache=tensor_cache,
+                                           decode_pool=decode_pool):
+        topk_probs, topk_idxs = session.predict_topk(batch_tensor, k)
+
+        # Converts the whole batch to python lists at once
+        for probs, idxs in zip(topk_probs.tolist(), topk_idxs.tolist()):
+            topk_results.append([(idx, session.labels[idx], prob)
+                                 for idx, prob in zip(idxs, probs)])
+
+    return topk_results
+
+
+def classify_batch_multi(img_paths, model_names, batch_size=None, n_workers=0,
+                         tensor_cache=None, decode_pool=None,
+                         return_ids=False):
+    """
+    Classifies many images with several models, decoding & preprocessing each
+    image only once and giving the same batch tensor to every model.
+    Parameters:
+     img_paths - paths to the image files to classify (list of strings)
+     model_names - CNN architectures, values must be: resnet alexnet vgg
+                   (list of strings)
+     batch_size - most images given to a model in one forward pass, None
+                  for the smallest (tuned) batch size of the sessions (int)
+     n_workers - number of worker processes that decode & preprocess
+                 upcoming images while the models run, 0 for none (int)
+     tensor_cache - TensorCache of image crops to use, None for no cache
+     decode_pool - pool of decode workers from create_decode_pool(), used
+                   instead of n_workers, None for none
+     return_ids - True returns the ImageNet class indexes instead of the
+                  labels (bool)
+    Returns:
+     labels_dic - Dictionary with key as architecture and value as the
+                  ImageNet label (or class index) of each image, in the same
+                  order as img_paths (list of strings or ints)
+    """
+    # Loads every model up front & checks they fit in model_cache together.
+    # The sessions are looked up again for each batch instead of being held
+    # here, so an evicted model is never kept in memory by this function
+    for model_name in model_names:
+        get_session(model_name)
+    check_model_cache_budget(model_names)
+    labels_dic = dict((model_name, []) for model_name in model_names)
+    batch_size = batch_size or min(get_session(model_name).batch_size
+                                   for model_name in model_names)
+
+    for batch_tensor in iter_image_batches(img_paths, batch_size, n_workers,
+                                           tensor_cache=tensor_cache,
+                                           decode_pool=decode_pool):
+        for model_name in model_names:
+            labels_dic[model_name].extend(
+                get_session(model_name).predict(batch_tensor))
+
+    if not return_ids:
+        for model_name in model_names:
+            labels_dic[model_name] = [label_table.names[pred_idx] for pred_idx
+                                      in labels_dic[model_name]]
+    return labels_dic
+
+
+def classifier(img_path, model_name):
+    """
+    Classifies one image with the pretrained CNN for architecture model_name.
+    Parameters:
+     img_path - path to the image file (string)
+     model_name - CNN architecture, values must be: resnet alexnet vgg (string)
+    Returns:
+     label - ImageNet label of the image (string)
+    """
+    return get_session(model_name).classify(img_path)
 
-    # return index corresponding to predicted class
-    pred_idx = output.data.numpy().argmax()
 
-    return imagenet_classes_dict[pred_idx]
+def classify_batch(img_paths, model_name, batch_size=None, n_workers=0,
+                   tensor_cache=None, decode_pool=None, return_ids=False):
+    """
+    Classifies many images with one model, stacking the preprocessed images
+    into batches so the model runs one forward pass per batch instead of one
+    per image.
+    Parameters:
+     img_paths - paths to the image files to classify (list of strings)
+     model_name - CNN architecture, values must be: resnet alexnet vgg (string)
+     batch_size - most images given to the model in one forward pass, None
+                  for the session's (tuned) batch size (int)
+     n_workers - number of worker processes that decode & preprocess
+                 upcoming images while the model runs, 0 for none (int)
+     tensor_cache - TensorCache of image crops to use, None for no cache
+     decode_pool - pool of decode workers from create_decode_pool(), used
+                   instead of n_workers, None for none
+     return_ids - True returns the ImageNet class indexes instead of the
+                  labels (bool)
+    Returns:
+     labels - ImageNet label (or class index) of each image, in the same
+              order as img_paths (list of strings or ints)
+    """
+    return get_session(model_name).classify_batch(img_paths, batch_size,
+                                                  n_workers,
+                                                  tensor_cache=tensor_cache,
+                                                  decode_pool=decode_pool,
+                                                  return_ids=return_ids)
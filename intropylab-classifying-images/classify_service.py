@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/classify_service.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Long-running HTTP service that classifies images with the models
+#          of classifier.py, so other programs don't pay for starting python &
+#          loading a model on every image. It's an asyncio server (python
+#          standard library only) that listens on localhost by default.
+#          Requests that arrive at about the same time are grouped into
+#          micro-batches: a model's batch runs once it has max_batch_size
+#          images or when its first image has waited max_wait_ms, whichever
+#          comes first. The batches run one at a time in a separate thread so
+#          the server keeps accepting requests while a model runs. With
+#          --model_cache_mb only the recently used models stay loaded & the
+#          others are loaded again when a request needs them.
+#          Endpoints:
+#           POST /classify - body {"img_path": <path>, "arch": <model>}
+#                            ("arch" is optional), returns {"label": <ImageNet
+#                            label>, "class_id": <ImageNet class index>}
+#           GET /metrics   - queue depth, batch size distribution & p50/p99
+#                            latency of each model, and the resident bytes &
+#                            evictions of the model cache, as JSON
+#          Image paths are read by the service, so they must be readable
+#          from the service's current folder (absolute paths are safest).
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python classify_service.py --arch <models> --host <address>
+#             --port <port> --max_batch_size <images> --max_wait_ms <ms>
+#   Example call:
+#    python classify_service.py --arch vgg,resnet --port 8000
+#    (then see load_generator.py)
+##
+
+# Imports python modules
+import argparse
+import asyncio
+import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+from urllib.parse import urlsplit
+
+import torch
+
+# Imports classifier functions & settings
+from classifier import (get_session, set_inference_backend,
+                        set_image_decoder, set_model_cache_budget,
+                        model_cache, crop_size)
+
+# Imports percentiles of latencies
+from latency_stats import LatencyStats
+
+# Most bytes of a request's headers & body
+max_header_bytes = 2**16
+max_body_bytes = 2**20
+
+
+# Main program function defined below
+def main():
+    # Creates & retrieves Command Line Arguments
+    in_arg = get_input_args()
+    set_inference_backend(in_arg.backend)
+    set_image_decoder(in_arg.decoder)
+    set_model_cache_budget(in_arg.model_cache_mb)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    service = ClassifyService(in_arg.arch.split(','), in_arg.max_batch_size,
+                              in_arg.max_wait_ms / 1000.0)
+    server = loop.run_until_complete(service.start(in_arg.host, in_arg.port))
+    print("Classifying with", ", ".join(service.batchers), "on http://%s:%d"
+          % (in_arg.host, in_arg.port))
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+        service.executor.shutdown()
+        loop.close()
+
+
+# Functions defined below
+def get_input_args():
+    """
+    Retrieves and parses the command line arguments created and defined using
+    the argparse module. This function returns these arguments as an
+    ArgumentParser object.
+    Parameters:
+     None - simply using argparse module to create & store command line arguments
+    Returns:
+     parse_args() -data structure that stores the command line arguments object
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--arch', type=str, default='vgg',
+                        help='comma separated models to serve, the first one '
+                             'is used when a request has no arch')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='address to listen on')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='port to listen on')
+    parser.add_argument('--max_batch_size', type=int, default=32,
+                        help='most images in a micro-batch')
+    parser.add_argument('--max_wait_ms', type=float, default=5.0,
+                        help='most milliseconds the first image of a '
+                             'micro-batch waits for more images')
+    parser.add_argument('--backend', type=str, default='torch',
+                        help='inference backend that runs the models')
+    parser.add_argument('--decoder', type=str, default='pil',
+                        help='how the images are decoded')
+    parser.add_argument('--model_cache_mb', type=float, default=None,
+                        help='memory budget of the loaded models in MB, the '
+                             'least recently used ones are evicted (no '
+                             'budget by default)')
+    return parser.parse_args()
+
+
+def classify_images_batch(model_name, img_paths):
+    """
+    Classifies a micro-batch of images with one forward pass - runs in the
+    service's model thread. An image that can't be loaded only fails its own
+    request.
+    Parameters:
+     model_name - CNN architecture, loaded again here if it was evicted from
+                  the model cache (string)
+     img_paths - paths to the image files (list of strings)
+    Returns:
+     results - for each image, (class index, ImageNet label) or the exception
+               raised loading it (list)
+    """
+    session = get_session(model_name)
+    results = [None] * len(img_paths)
+    img_tensors = []
+    for idx, img_path in enumerate(img_paths):
+        # Any error decoding or preprocessing the image (like a mode the
+        # decoder can't make RGB) fails only its own request, and images of
+        # the wrong shape are caught here instead of failing torch.stack()
+        # for the whole micro-batch
+        try:
+            img_tensor = session.load_image(img_path)
+            if tuple(img_tensor.shape) != (3, crop_size, crop_size):
+                raise ValueError("preprocessed to shape %s instead of 3x%dx%d"
+                                 % ('x'.join(str(n) for n in
+                                             img_tensor.shape),
+                                    crop_size, crop_size))
+            img_tensors.append((idx, img_tensor))
+        except (IOError, OSError, ValueError) as error:
+            results[idx] = error
+        except Exception as error:
+            results[idx] = ValueError(str(error))
+
+    if img_tensors:
+        pred_idxs = session.predict(torch.stack([img_tensor for _, img_tensor
+                                                 in img_tensors]))
+        for (idx, _), pred_idx in zip(img_tensors, pred_idxs):
+            results[idx] = (pred_idx, session.labels[pred_idx])
+    return results
+
+
+class MicroBatcher(object):
+    """
+    Queue of the images waiting for one model, grouped into micro-batches.
+    Parameters:
+     model_name - CNN architecture (string)
+     max_batch_size - most images in a micro-batch (int)
+     max_wait - most seconds the first image of a micro-batch waits for more
+                images (float)
+     executor - single thread executor that runs the models
+    """
+    def __init__(self, model_name, max_batch_size, max_wait, executor):
+        # Loads the model up front - the session is looked up again for each
+        # micro-batch since the model cache may evict it
+        get_session(model_name)
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.executor = executor
+        self.queue = asyncio.Queue()
+        self.image_queued = asyncio.Event()
+
+        # Metrics - count of micro-batches of each size & latency of each
+        # request from arriving to its result
+        self.batch_sizes = Counter()
+        self.latency_stats = LatencyStats()
+
+    async def classify(self, img_path):
+        """
+        Queues an image & waits for its result.
+        Parameters:
+         img_path - path to the image file (string)
+        Returns:
+         result - (class index, ImageNet label) tuple
+        """
+        start_time = time()
+        future = asyncio.get_event_loop().create_future()
+        self.queue.put_nowait((img_path, future))
+        self.image_queued.set()
+        try:
+            return await future
+        finally:
+            self.latency_stats.add(time() - start_time)
+
+    async def next_batch(self):
+        """
+        Waits for the next micro-batch - the first queued image plus the ones
+        queued before the batch is full or max_wait has passed.
+        Parameters:
+         None
+        Returns:
+         batch - (image path, future) of each image (list of tuples)
+        """
+        loop = asyncio.get_event_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while True:
+            while not self.queue.empty() and len(batch) < self.max_batch_size:
+                batch.append(self.queue.get_nowait())
+            remaining = deadline - loop.time()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                return batch
+
+            # Waits until another image is queued or the time is up
+            self.image_queued.clear()
+            try:
+                await asyncio.wait_for(self.image_queued.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self):
+        """
+        Classifies the micro-batches as they're ready, forever.
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = await self.next_batch()
+            self.batch_sizes[len(batch)] += 1
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, classify_images_batch, self.model_name,
+                    [img_path for img_path, _ in batch])
+            except Exception as error:
+                results = [error] * len(batch)
+
+            # Requests whose client went away have cancelled futures
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def metrics(self):
+        """
+        Returns the metrics of the model's queue.
+        Parameters:
+         None
+        Returns:
+         metrics - Dictionary with the queue depth, batch size distribution
+                   (key = batch size as a string) & latency summary
+        """
+        metrics = {'queue_depth': self.queue.qsize(),
+                   'batch_sizes': dict((str(size), count) for size, count in
+                                       sorted(self.batch_sizes.items()))}
+        metrics.update(self.latency_stats.summary((50, 99)))
+        return metrics
+
+
+class ClassifyService(object):
+    """
+    HTTP service with a MicroBatcher for each model.
+    Parameters:
+     model_names - CNN architectures served, the first one is the default
+                   (list of strings)
+     max_batch_size - most images in a micro-batch (int)
+     max_wait - most seconds the first image of a micro-batch waits (float)
+    """
+    def __init__(self, model_names, max_batch_size, max_wait):
+        self.model_names = model_names
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        # One thread runs all the models, so batches of different models
+        # don't fight over the cores
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.batchers = None
+
+    async def start(self, host, port):
+        """
+        Loads the models, starts their batchers & starts listening.
+        Parameters:
+         host - address to listen on (string)
+         port - port to listen on (int)
+        Returns:
+         server - asyncio server
+        """
+        # Batchers are made in the event loop they run in
+        self.batchers = dict(
+            (model_name, MicroBatcher(model_name, self.max_batch_size,
+                                      self.max_wait, self.executor))
+            for model_name in self.model_names)
+        for batcher in self.batchers.values():
+            asyncio.ensure_future(batcher.run())
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def handle_connection(self, reader, writer):
+        """
+        Answers the requests of one (keep-alive) connection.
+        Parameters:
+         reader - asyncio StreamReader of the connection
+         writer - asyncio StreamWriter of the connection
+        Returns:
+         None
+        """
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, response = await self.handle_request(method, target,
+                                                             body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                write_response(writer, status, response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, method, target, body):
+        """
+        Answers one request.
+        Parameters:
+         method - HTTP method (string)
+         target - request path (string)
+         body - request body (bytes)
+        Returns:
+         status - HTTP status code (int)
+         response - JSON-serializable response (dictionary)
+        """
+        path = urlsplit(target).path
+        if method == 'GET' and path == '/metrics':
+            metrics = dict((model_name, batcher.metrics()) for
+                           model_name, batcher in self.batchers.items())
+            metrics['model_cache'] = model_cache.stats()
+            return 200, metrics
+        if path != '/classify':
+            return 404, {'error': 'not found: ' + path}
+        if method != 'POST':
+            return 405, {'error': 'use POST for /classify'}
+
+        try:
+            request = json.loads(body.decode('utf-8'))
+            img_path = request['img_path']
+            model_name = request.get('arch', self.model_names[0])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return 400, {'error': 'body must be JSON like {"img_path": '
+                                  '"pet_images/Beagle_01141.jpg", "arch": '
+                                  '"vgg"}'}
+        if model_name not in self.batchers:
+            return 400, {'error': 'arch must be one of: ' +
+                                  ', '.join(self.model_names)}
+
+        try:
+            class_id, label = await self.batchers[model_name].classify(
+                img_path)
+        except (IOError, OSError, ValueError) as error:
+            return 400, {'error': "can't load " + img_path + ": " + str(error)}
+        except Exception as error:
+            return 500, {'error': str(error)}
+        return 200, {'label': label, 'class_id': class_id}
+
+
+async def read_request(reader):
+    """
+    Reads one HTTP/1.1 request.
+    Parameters:
+     reader - asyncio StreamReader of the connection
+    Returns:
+     request - (method, target, headers, body) with the header names in
+               lowercase, None if the client closed the connection
+    """
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as error:
+        if not error.partial:
+            return None
+        raise
+    if len(head) > max_header_bytes:
+        raise ValueError("request headers too large")
+
+    lines = head.decode('latin-1').split('\r\n')
+    method, target, _ = lines[0].split(' ', 2)
+    headers = dict()
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    content_length = int(headers.get('content-length', 0))
+    if content_length > max_body_bytes:
+        raise ValueError("request body too large")
+    body = await reader.readexactly(content_length) if content_length else b''
+    return method, target, headers, body
+
+
+def write_response(writer, status, response, keep_alive=True):
+    """
+    Writes a JSON HTTP/1.1 response.
+    Parameters:
+     writer - asyncio StreamWriter of the connection
+     status - HTTP status code (int)
+     response - JSON-serializable response (dictionary)
+     keep_alive - False closes the connection after the response (bool)
+    Returns:
+     None
+    """
+    reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 500: 'Internal Server Error'}
+    body = json.dumps(response).encode('utf-8')
+    writer.write(("HTTP/1.1 %d %s\r\n"
+                  "Content-Type: application/json\r\n"
+                  "Content-Length: %d\r\n"
+                  "Connection: %s\r\n\r\n" %
+                  (status, reasons.get(status, ''), len(body),
+                   'keep-alive' if keep_alive else 'close')).encode('latin-1')
+                 + body)
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
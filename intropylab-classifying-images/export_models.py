@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/export_models.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Exports the CNN models used by classifier.py as frozen TorchScript
+#          files, with the preprocessing constants (resize & crop sizes,
+#          normalization mean & std) embedded in them. When an exported model
+#          is found in classifier.exported_model_dir, classifier.py loads it
+#          directly instead of building the model with torchvision, which
+#          makes starting up faster. With --benchmark this program measures
+#          the time from starting python to the first prediction (cold start)
+#          and the steady-state latency of a batch for both the exported and
+#          the eager (torchvision) models. With --format onnx the models are
+#          exported to ONNX for the onnxruntime inference backend instead, and
+#          --compare_backends compares the speed & predictions of every
+#          inference backend on the same images.
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python export_models.py --arch <models> --benchmark
+#   Example calls:
+#    python export_models.py --arch resnet,alexnet,vgg
+#    python export_models.py --arch vgg --benchmark --dir pet_images/
+#    python export_models.py --format onnx --compare_backends
+##
+
+# Imports python modules
+import argparse
+import os
+import subprocess
+import sys
+from time import time
+
+import torch
+import torch.nn as nn
+
+# Imports classifier model registry & preprocessing
+import classifier
+
+# Imports inference backends & ONNX export
+from inference_backends import backend_names, export_onnx
+
+# Imports scanner of the folder of images
+from image_scanner import scan_images
+
+
+# Main program function defined below
+def main():
+    # Creates & retrieves Command Line Arguments
+    in_arg = get_input_args()
+    arch_list = in_arg.arch.split(',')
+
+    # Child process started by benchmark_cold_start() - classifies one image
+    # and exits
+    if in_arg.first_prediction:
+        classifier.use_exported_models = in_arg.first_prediction == 'exported'
+        classifier.classifier(in_arg.image, arch_list[0])
+        return
+
+    # Exports the models
+    for arch in arch_list:
+        if in_arg.format == 'onnx':
+            export_path = export_onnx_model(arch)
+        else:
+            export_path = export_model(arch)
+        print("Exported %-8s to %s (%.1f MB)" %
+              (arch, export_path, os.path.getsize(export_path) / 2**20))
+
+    # The same images check_images_solution.py classifies - files that
+    # aren't images are skipped
+    img_paths = [os.path.join(in_arg.dir, rel_path) for rel_path, _ in
+                 sorted(scan_images(in_arg.dir))]
+
+    # Compares the inference backends on the same images
+    if in_arg.compare_backends:
+        compare_backends(arch_list, img_paths, in_arg.batch_size)
+
+    # Compares the exported models with the eager models
+    if in_arg.benchmark:
+        print("\n*** Exported vs Eager Models ***")
+        print("%10s%10s%22s%22s" % ('', 'mode', 'cold start (sec)',
+                                    'batch latency (ms)'))
+        for arch in arch_list:
+            for mode in ('eager', 'exported'):
+                cold_start = benchmark_cold_start(arch, mode, img_paths[0])
+                latency = benchmark_batch_latency(arch, mode,
+                                                  img_paths[:in_arg.batch_size])
+                print("%10s%10s%22.2f%22.1f" % (arch, mode, cold_start,
+                                                latency * 1000.0))
+
+
+# Functions defined below
+def get_input_args():
+    """
+    Retrieves and parses the command line arguments created and defined using
+    the argparse module. This function returns these arguments as an
+    ArgumentParser object.
+    Parameters:
+     None - simply using argparse module to create & store command line arguments
+    Returns:
+     parse_args() -data structure that stores the command line arguments object
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--arch', type=str, default='resnet,alexnet,vgg',
+                        help='comma separated models to export')
+    parser.add_argument('--format', type=str, default='torchscript',
+                        choices=['torchscript', 'onnx'],
+                        help='format of the exported models')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='compare exported & eager models after export')
+    parser.add_argument('--compare_backends', action='store_true',
+                        help='compare the inference backends after export')
+    parser.add_argument('--dir', type=str, default='pet_images/',
+                        help='path to folder of images used by --benchmark')
+    parser.add_argument('--batch_size', type=int, default=8,
+                        help='images per batch used by --benchmark')
+
+    # Used internally by --benchmark to time a new process
+    parser.add_argument('--first_prediction', type=str, default=None,
+                        choices=['eager', 'exported'], help=argparse.SUPPRESS)
+    parser.add_argument('--image', type=str, default=None,
+                        help=argparse.SUPPRESS)
+
+    return parser.parse_args()
+
+
+class ExportedClassifier(nn.Module):
+    """
+    Wraps a CNN model so the preprocessing constants it expects are saved
+    along with it as buffers - classifier.load_exported_model() checks them
+    against the preprocessing of classifier.py. The bytes & hash of the
+    model's weights are saved as buffers too, since freezing inlines the
+    weights into the graph and they can't be counted or hashed once loaded.
+    Parameters:
+     model - CNN model in evaluation mode (torch.nn.Module)
+    """
+    def __init__(self, model):
+        super(ExportedClassifier, self).__init__()
+        self.model = model
+        self.register_buffer('resize_size',
+                             torch.tensor(classifier.resize_size))
+        self.register_buffer('crop_size', torch.tensor(classifier.crop_size))
+        self.register_buffer('mean', torch.tensor(classifier.normalize_mean))
+        self.register_buffer('std', torch.tensor(classifier.normalize_std))
+        self.register_buffer('weights_nbytes',
+                             torch.tensor(classifier.model_nbytes(model),
+                                          dtype=torch.int64))
+        self.register_buffer('weights_sha1', torch.tensor(
+            list(classifier.weights_hash(model).digest()), dtype=torch.uint8))
+
+    def forward(self, batch_tensor):
+        return self.model(batch_tensor)
+
+
+def export_model(arch):
+    """
+    Builds the model for architecture arch with torchvision and saves it as a
+    frozen TorchScript file in classifier.exported_model_dir.
+    Parameters:
+     arch - CNN architecture, values must be: resnet alexnet vgg (string)
+    Returns:
+     export_path - path of the exported model file (string)
+    """
+    if not hasattr(torch, 'jit') or not hasattr(torch.jit, 'trace'):
+        raise RuntimeError("exporting models needs pytorch 1.0 or higher "
+                           "(installed: " + torch.__version__ + ")")
+
+    model = classifier.model_builders[arch](pretrained=True).eval()
+    wrapped_model = ExportedClassifier(model).eval()
+    with torch.no_grad():
+        scripted_model = torch.jit.trace(wrapped_model,
+                                         torch.zeros(1, 3,
+                                                     classifier.crop_size,
+                                                     classifier.crop_size))
+
+    # Freezing inlines the weights into the graph (pytorch 1.8 & higher) -
+    # the preprocessing constants and the bytes & hash of the weights are
+    # kept so they can still be checked
+    if hasattr(torch.jit, 'freeze'):
+        scripted_model = torch.jit.freeze(
+            scripted_model,
+            preserved_attrs=['resize_size', 'crop_size', 'mean', 'std',
+                             'weights_nbytes', 'weights_sha1'])
+
+    if not os.path.isdir(classifier.exported_model_dir):
+        os.makedirs(classifier.exported_model_dir)
+    export_path = classifier.exported_model_path(arch)
+    torch.jit.save(scripted_model, export_path)
+    return export_path
+
+
+def export_onnx_model(arch):
+    """
+    Builds the model for architecture arch with torchvision and exports it to
+    ONNX in inference_backends.onnx_model_dir for the onnxruntime backend.
+    Parameters:
+     arch - CNN architecture, values must be: resnet alexnet vgg (string)
+    Returns:
+     export_path - path of the exported model file (string)
+    """
+    export_path = classifier.onnx_model_path(arch)
+    if not os.path.isdir(os.path.dirname(export_path)):
+        os.makedirs(os.path.dirname(export_path))
+
+    model = classifier.model_builders[arch](pretrained=True)
+    export_onnx(model, export_path, classifier.crop_size)
+    return export_path
+
+
+def compare_backends(arch_list, img_paths, batch_size=8):
+    """
+    Classifies the same images with every inference backend and prints the
+    images per second of each backend's forward passes and the percentage of
+    class indexes that agree with the torch backend.
+    Parameters:
+     arch_list - CNN architectures, values must be: resnet alexnet vgg (list
+                 of strings)
+     img_paths - paths to the images classified (list of strings)
+     batch_size - most images given to a model in one forward pass (int)
+    Returns:
+     None - simply printing results.
+    """
+    print("\n*** Inference Backends ***")
+    print("%10s%14s%14s%14s" % ('', 'backend', 'images/sec', 'pct_agree'))
+    for arch in arch_list:
+        torch_ids = None
+        for backend_name in backend_names:
+            try:
+                session = classifier.ClassifierSession(arch,
+                                                       backend=backend_name)
+            except (RuntimeError, ValueError) as error:
+                print("%10s%14s  skipped: %s" % (arch, backend_name, error))
+                continue
+
+            # Class indexes are compared since a few labels (like crane) are
+            # shared by two classes
+            class_ids = session.classify_batch(img_paths, batch_size,
+                                               return_ids=True)
+            if torch_ids is None:
+                torch_ids = class_ids
+            n_agree = sum(1 for class_id, torch_id in zip(class_ids, torch_ids)
+                          if class_id == torch_id)
+            print("%10s%14s%14.1f%14.1f" %
+                  (arch, backend_name, session.images_per_sec(),
+                   n_agree / len(class_ids) * 100.0))
+
+
+def benchmark_cold_start(arch, mode, img_path):
+    """
+    Measures the time from starting a new python process to its first
+    prediction, including importing pytorch and loading the model.
+    Parameters:
+     arch - CNN architecture, values must be: resnet alexnet vgg (string)
+     mode - 'eager' builds the model with torchvision, 'exported' loads the
+            exported model (string)
+     img_path - path to the image classified (string)
+    Returns:
+     cold_start - seconds to the first prediction (float)
+    """
+    start_time = time()
+    subprocess.check_call([sys.executable, os.path.abspath(__file__),
+                           '--arch', arch, '--first_prediction', mode,
+                           '--image', img_path])
+    return time() - start_time
+
+
+def benchmark_batch_latency(arch, mode, img_paths, n_runs=10):
+    """
+    Measures the median time of the forward pass of one batch of images once
+    the model is loaded & warmed up.
+    Parameters:
+     arch - CNN architecture, values must be: resnet alexnet vgg (string)
+     mode - 'eager' builds the model with torchvision, 'exported' loads the
+            exported model (string)
+     img_paths - paths to the images in the batch (list of strings)
+     n_runs - number of times the batch is timed (int)
+    Returns:
+     latency - median seconds per batch (float)
+    """
+    if mode == 'exported':
+        model = classifier.load_exported_model(
+            classifier.exported_model_path(arch))
+    else:
+        model = classifier.model_builders[arch](pretrained=True)
+    model = model.eval()
+
+    batch_tensor = next(classifier.iter_image_batches(img_paths,
+                                                      len(img_paths)))
+    latencies = []
+    with torch.no_grad():
+        # warmup
+        model(batch_tensor)
+        for _ in range(n_runs):
+            start_time = time()
+            model(batch_tensor)
+            latencies.append(time() - start_time)
+
+    return sorted(latencies)[len(latencies) // 2]
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
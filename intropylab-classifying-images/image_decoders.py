@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/image_decoders.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Image decoders for the crop stage of classifier.py's
+#          preprocessing. Every decoder reads an image file and returns its
+#          uint8 Resize/CenterCrop crop as a (height)x(width)x3 numpy array,
+#          the same array TensorCache stores, so the rest of the
+#          preprocessing works the same with any of them. Grayscale, RGBA,
+#          CMYK & palette images are converted to RGB:
+#           - pil         - decodes the full image with PIL, then resizes it
+#           - pil_draft   - asks PIL's JPEG decoder for a reduced resolution
+#                           (1/2, 1/4 or 1/8 scale) that's still at least the
+#                           resize size, so large photos decode much faster
+#           - torchvision - decodes JPEGs with torchvision's native decoder
+#                           straight into a uint8 tensor (torchvision 0.8 &
+#                           higher), other formats with PIL
+#          Decoders other than pil may change a few pixels of the crop and so
+#          a few predictions - benchmark_decoders.py measures both.
+#
+#   Example use:
+#    crop = decoders['pil_draft'](img_path, crop_image, resize_size)
+##
+
+# Imports python modules
+import math
+
+import numpy as np
+from PIL import Image
+
+# torchvision's native JPEG decoder is optional - only needed by the
+# torchvision decoder
+try:
+    from torchvision.io import decode_jpeg, read_file
+except ImportError:
+    decode_jpeg = None
+try:
+    from torchvision.io import ImageReadMode
+except ImportError:
+    ImageReadMode = None
+
+
+def rgb_image(img):
+    """
+    Returns a PIL image converted to RGB, unless it already is RGB.
+    Parameters:
+     img - PIL image of any mode (PIL.Image)
+    Returns:
+     img - RGB PIL image (PIL.Image)
+    """
+    if img.mode == 'RGB':
+        return img
+    return img.convert('RGB')
+
+
+def decode_pil(img_path, crop_image, resize_size):
+    """
+    Decodes the full image with PIL and crops it.
+    Parameters:
+     img_path - path to the image file (string)
+     crop_image - Resize/CenterCrop transform (torchvision.transforms)
+     resize_size - length of the shorter side after resizing (int)
+    Returns:
+     crop - uint8 numpy array of the cropped image
+    """
+    return np.array(crop_image(rgb_image(Image.open(img_path))))
+
+
+def decode_pil_draft(img_path, crop_image, resize_size):
+    """
+    Decodes the image with PIL at the smallest JPEG scale that's still at
+    least resize_size on its shorter side, then crops it. Files that aren't
+    JPEGs are decoded in full.
+    Parameters:
+     img_path - path to the image file (string)
+     crop_image - Resize/CenterCrop transform (torchvision.transforms)
+     resize_size - length of the shorter side after resizing (int)
+    Returns:
+     crop - uint8 numpy array of the cropped image
+    """
+    img = Image.open(img_path)
+
+    # draft() only reads the header here - the pixels are decoded at the
+    # chosen scale when they're first accessed. The mode is kept & converted
+    # to RGB afterwards, like with decode_pil()
+    width, height = img.size
+    scale = float(resize_size) / min(width, height)
+    if scale < 1.0:
+        img.draft(img.mode, (int(math.ceil(width * scale)),
+                             int(math.ceil(height * scale))))
+
+    return np.array(crop_image(rgb_image(img)))
+
+
+def decode_torchvision(img_path, crop_image, resize_size):
+    """
+    Decodes a JPEG with torchvision's native decoder into a 3x(height)x(width)
+    uint8 tensor and crops it as a tensor. Files that aren't JPEGs are
+    decoded with decode_pil().
+    Parameters:
+     img_path - path to the image file (string)
+     crop_image - Resize/CenterCrop transform (torchvision.transforms)
+     resize_size - length of the shorter side after resizing (int)
+    Returns:
+     crop - uint8 numpy array of the cropped image
+    """
+    if decode_jpeg is None:
+        raise RuntimeError("the torchvision decoder needs torchvision 0.8 or "
+                           "higher")
+
+    with open(img_path, 'rb') as img_file:
+        is_jpeg = img_file.read(2) == b'\xff\xd8'
+    if not is_jpeg:
+        return decode_pil(img_path, crop_image, resize_size)
+
+    if ImageReadMode is not None:
+        img_tensor = decode_jpeg(read_file(img_path), mode=ImageReadMode.RGB)
+    else:
+        img_tensor = decode_jpeg(read_file(img_path))
+
+        # Older torchvision can't convert grayscale (or CMYK) JPEGs to RGB
+        if img_tensor.shape[0] != 3:
+            return decode_pil(img_path, crop_image, resize_size)
+
+    # Resizing a uint8 tensor keeps it uint8 - permutes it to the
+    # (height)x(width)x3 layout of the other decoders
+    return crop_image(img_tensor).permute(1, 2, 0).numpy()
+
+
+# Maps each decoder name (chosen with --decoder) to its function
+decoders = {'pil': decode_pil, 'pil_draft': decode_pil_draft,
+            'torchvision': decode_torchvision}
+decoder_names = ['pil', 'pil_draft', 'torchvision']
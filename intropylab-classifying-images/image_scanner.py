@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/image_scanner.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Streaming scanner of a folder of pet images. The folder & all of
+#          the folders inside it are walked lazily with os.scandir, only
+#          files with an image extension are kept, and a (path, pet label)
+#          record is yielded for each image as soon as it's found - so
+#          classifying can start before the scan finishes and memory stays
+#          flat on folders with millions of files. Paths are relative to the
+#          scanned folder (just the filename for images directly in it) and
+#          the pet label comes from the words of the filename.
+#          Records can be split into shards for running one folder on many
+#          machines - an image's shard only depends on a hash of its path, so
+#          every machine picks the same disjoint subset without talking to the
+#          others.
+#
+#   Example use:
+#    for chunk in iter_chunks(scan_images('pet_images/'), 4096):
+#        filenames = [filename for filename, pet_label in chunk]
+#    records = shard_records(scan_images('pet_images/'), *parse_shard('0/4'))
+##
+
+# Imports python modules
+import os
+import zlib
+
+# Extensions of the files that are scanned as images (lowercase)
+image_extensions = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff',
+                    '.webp')
+
+
+def filename_label(filename):
+    """
+    Returns the pet image label of an image file - the words of the filename
+    that are all letters, lowercase with a space between them.
+    Parameters:
+     filename - name of the image file, like Boston_terrier_02259.jpg (string)
+    Returns:
+     pet_label - pet image label, like boston terrier (string)
+    """
+    # Uses split to extract words of filename into list image_name
+    image_name = filename.split("_")
+
+    # Creates temporary label variable to hold pet label name extracted
+    pet_label = ""
+
+    # Processes each of the character strings(words) split by '_' in
+    # list image_name by processing each word - only adding to pet_label
+    # if word is all letters - then process by putting blanks between
+    # these words and putting them in all lowercase letters
+    for word in image_name:
+
+        # Only add to pet_label if word is all letters add blank at end
+        if word.isalpha():
+            pet_label += word.lower() + " "
+
+    # strips off trailing whitespace
+    return pet_label.strip()
+
+
+def scan_images(image_dir, extensions=image_extensions):
+    """
+    Walks image_dir and the folders inside it, yielding a record for each
+    image file as it's found.
+    Parameters:
+     image_dir - path to the folder of images (string)
+     extensions - extensions of the files kept, lowercase (tuple of strings)
+    Returns:
+     generator of (path relative to image_dir, pet image label) tuples of
+     strings
+    """
+    # Folders still to scan, as paths relative to image_dir - only folders
+    # are held, files are yielded one at a time
+    pending_dirs = ['']
+    while pending_dirs:
+        rel_dir = pending_dirs.pop()
+        with os.scandir(os.path.join(image_dir, rel_dir)) as entries:
+            for entry in entries:
+                # Skips files & folders that start with . (like .DS_Store of
+                # Mac OSX) because they aren't pet images
+                if entry.name[0] == ".":
+                    continue
+
+                rel_path = os.path.join(rel_dir, entry.name) if rel_dir \
+                    else entry.name
+                if entry.is_dir():
+                    pending_dirs.append(rel_path)
+                elif os.path.splitext(entry.name)[1].lower() in extensions:
+                    yield rel_path, filename_label(entry.name)
+
+
+def iter_chunks(records, chunk_size):
+    """
+    Groups records from a generator into lists of at most chunk_size records,
+    without reading ahead of the current chunk.
+    Parameters:
+     records - iterable of records (like the tuples from scan_images())
+     chunk_size - most records in a chunk (int)
+    Returns:
+     generator of lists of records
+    """
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_shard(shard):
+    """
+    Parses a shard given as i/N (shard i of N, counting from 0).
+    Parameters:
+     shard - shard like 0/4 (string)
+    Returns:
+     shard_index - index of the shard, from 0 to n_shards - 1 (int)
+     n_shards - count of shards (int)
+    """
+    parts = shard.split('/')
+    if len(parts) != 2 or not parts[0].isdigit() or not parts[1].isdigit():
+        raise ValueError("shard must be i/N, like 0/4: " + shard)
+    shard_index, n_shards = int(parts[0]), int(parts[1])
+    if shard_index >= n_shards:
+        raise ValueError("shard index must be less than the count of "
+                         "shards: " + shard)
+    return shard_index, n_shards
+
+
+def image_shard(rel_path, n_shards):
+    """
+    Returns the shard of an image - CRC32 of its relative path with / between
+    folders, which is the same on every machine & python run (unlike hash()).
+    Parameters:
+     rel_path - path of the image relative to the scanned folder (string)
+     n_shards - count of shards (int)
+    Returns:
+     shard_index - shard of the image, from 0 to n_shards - 1 (int)
+    """
+    key = rel_path.replace(os.sep, '/').encode('utf-8')
+    return zlib.crc32(key) % n_shards
+
+
+def shard_records(records, shard_index, n_shards):
+    """
+    Keeps the records of the images in one shard.
+    Parameters:
+     records - iterable of (path relative to the scanned folder, pet image
+               label) tuples (like from scan_images())
+     shard_index - index of the shard kept (int)
+     n_shards - count of shards (int)
+    Returns:
+     generator of the records in the shard
+    """
+    for record in records:
+        if image_shard(record[0], n_shards) == shard_index:
+            yield record
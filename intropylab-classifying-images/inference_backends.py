@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/inference_backends.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Inference backends that run the forward pass of a CNN model for
+#          classifier.py. Every backend takes a (batch)x3x224x224 tensor of
+#          preprocessed images and returns a (batch)x1000 tensor of class
+#          scores, so ClassifierSession works the same with any of them:
+#           - torch       - runs the pytorch model (eager or TorchScript)
+#           - onnxruntime - runs the model exported to ONNX with ONNX Runtime
+#                           on the CPU (needs: pip install onnxruntime)
+#          Models are exported to ONNX with export_models.py --format onnx.
+#
+#   Example use:
+#    backend = TorchBackend(model)
+#    scores = backend.forward(batch_tensor)
+##
+
+# Imports python modules
+import torch
+from torch.autograd import Variable
+from torch import __version__
+
+# ONNX Runtime is optional - only needed by the onnxruntime backend
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+# pytorch versions 0.4 & higher - Variable depreciated so tensors are given
+# to the model directly and torch.no_grad() turns off gradients. Versions
+# less than 0.4 wrap the input in a Variable with volatile = True instead.
+# Parsed once here instead of for every image.
+pytorch_ver = __version__.split('.')
+tensor_api = int(pytorch_ver[0]) > 0 or int(pytorch_ver[1]) >= 4
+
+# Names of the backends that can be chosen with --backend
+backend_names = ['torch', 'onnxruntime']
+
+# Folder of models exported to ONNX, one <architecture>.onnx file each
+onnx_model_dir = 'onnx_models/'
+
+
+class TorchBackend(object):
+    """
+    Runs the forward pass with pytorch.
+    Parameters:
+     model - pytorch model (torch.nn.Module or torch.jit.ScriptModule)
+     num_threads - number of intra-op threads used by the forward pass, None
+                   for pytorch's default (int)
+     channels_last - True runs the model on channels-last (NHWC) tensors
+                     instead of contiguous (NCHW) ones, pytorch 1.5 & higher
+                     (bool)
+    """
+    name = 'torch'
+
+    def __init__(self, model, num_threads=None, channels_last=False):
+        # puts model in evaluation mode instead of (default)training mode
+        # and turns off gradients for all of its weights
+        self.model = model.eval()
+        for param in self.model.parameters():
+            param.requires_grad = False
+
+        self.num_threads = num_threads
+        self.channels_last = (channels_last and
+                              hasattr(torch, 'channels_last'))
+        if self.channels_last:
+            self.model = self.model.to(memory_format=torch.channels_last)
+
+    def forward(self, batch_tensor):
+        """
+        Applies the model to a batch of preprocessed images.
+        Parameters:
+         batch_tensor - (batch)x3x224x224 tensor of preprocessed images
+        Returns:
+         output - (batch)x1000 tensor of class scores
+        """
+        # intra-op threads are shared by the whole process, so they're set
+        # for each forward pass in case models were tuned differently
+        if self.num_threads and torch.get_num_threads() != self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        if self.channels_last:
+            batch_tensor = batch_tensor.contiguous(
+                memory_format=torch.channels_last)
+
+        if tensor_api:
+            with torch.no_grad():
+                return self.model(batch_tensor).data
+
+        # pytorch versions less than 0.4
+        return self.model(Variable(batch_tensor, volatile = True)).data
+
+
+class OnnxRuntimeBackend(object):
+    """
+    Runs the forward pass of a model exported to ONNX with ONNX Runtime on
+    the CPU.
+    Parameters:
+     onnx_path - path to the exported .onnx model file (string)
+    """
+    name = 'onnxruntime'
+
+    def __init__(self, onnx_path):
+        if onnxruntime is None:
+            raise RuntimeError("the onnxruntime backend needs ONNX Runtime "
+                               "(pip install onnxruntime)")
+        self.session = onnxruntime.InferenceSession(
+            onnx_path, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def forward(self, batch_tensor):
+        """
+        Applies the model to a batch of preprocessed images.
+        Parameters:
+         batch_tensor - (batch)x3x224x224 tensor of preprocessed images
+        Returns:
+         output - (batch)x1000 tensor of class scores
+        """
+        scores = self.session.run(None, {self.input_name:
+                                         batch_tensor.contiguous().numpy()})[0]
+        return torch.from_numpy(scores)
+
+
+def export_onnx(model, onnx_path, crop_size=224):
+    """
+    Exports a pytorch model to an ONNX file that accepts any batch size.
+    Parameters:
+     model - pytorch model (torch.nn.Module)
+     onnx_path - path of the .onnx file written (string)
+     crop_size - height & width of the preprocessed images (int)
+    Returns:
+     None
+    """
+    with torch.no_grad():
+        torch.onnx.export(model.eval(),
+                          torch.zeros(1, 3, crop_size, crop_size),
+                          onnx_path, input_names=['images'],
+                          output_names=['scores'],
+                          dynamic_axes={'images': {0: 'batch'},
+                                        'scores': {0: 'batch'}})
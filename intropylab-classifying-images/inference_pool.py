@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/inference_pool.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Pool of inference processes that classify batches of images in
+#          parallel, for hosts with many cores. The models are loaded once in
+#          the main process and their weights are moved to shared memory
+#          before the processes are forked, so every process runs the same
+#          copy of the weights instead of loading its own. Batches are handed
+#          out one at a time to whichever process is free, and each process
+#          decodes, preprocesses & classifies its batch. The batches are cut
+#          at the same places as classify_batch() cuts them, so every model
+#          sees the same batches as in one process and the labels are the
+#          same. The cores are split evenly between the processes' intra-op
+#          threads.
+#          Weights are only shared with the torch backend on hosts that can
+#          fork processes (Linux & Mac) - otherwise each process loads its
+#          own models.
+#
+#   Example use:
+#    inference_pool = InferencePool(['vgg'], 8)
+#    labels = inference_pool.classify_batch(img_paths, 'vgg')
+#    inference_pool.print_stats()
+#    inference_pool.close()
+##
+
+# Imports python modules
+import multiprocessing
+import os
+from time import time
+
+import torch
+
+# Imports classifier functions & settings
+import classifier
+
+# Sessions & tensor cache of an inference process, set when the process
+# starts by init_inference_process()
+process_state = dict()
+
+
+def init_inference_process(model_names, backend_name, decoder_name,
+                           n_threads, tensor_cache):
+    """
+    Sets up an inference process - runs once in each process of the pool.
+    Parameters:
+     model_names - CNN architectures classified by the pool (list of strings)
+     backend_name - name of the inference backend (string)
+     decoder_name - name of the image decoder (string)
+     n_threads - intra-op threads of this process (int)
+     tensor_cache - TensorCache of image crops to use, None for no cache
+    Returns:
+     None
+    """
+    # Backend & decoder are set again since processes that aren't forked
+    # don't share the main process' settings
+    classifier.set_inference_backend(backend_name)
+    classifier.set_image_decoder(decoder_name)
+
+    # Thread counts tuned by autotune.py are for one process using the whole
+    # host, so each process uses its share of the cores instead
+    torch.set_num_threads(n_threads)
+    classifier.host_tuning = dict(classifier.host_tuning, archs=dict(
+        (model_name, dict(settings, num_threads=n_threads))
+        for model_name, settings in
+        classifier.host_tuning.get('archs', dict()).items()))
+
+    process_state['sessions'] = [classifier.get_session(model_name)
+                                 for model_name in model_names]
+    process_state['tensor_cache'] = tensor_cache
+
+
+def classify_pool_batch(img_paths):
+    """
+    Classifies one batch of images with every model of the pool - runs in the
+    inference processes.
+    Parameters:
+     img_paths - paths to the image files of the batch (list of strings)
+    Returns:
+     pred_idxs_dic - Dictionary with key as architecture and value as the
+                     ImageNet class index of each image (list of ints)
+     forward_time_dic - Dictionary with key as architecture and value as the
+                        seconds of the model's forward pass (float)
+     hits - (hit, bytes written) of each image - hit is True if its crop
+            came from the tensor cache, bytes written are counted by the main
+            process (list of tuples)
+    """
+    tensor_cache = process_state['tensor_cache']
+    batch = []
+    hits = []
+    for img_path in img_paths:
+        img_array, hit, n_bytes = classifier.load_image_array(img_path,
+                                                              tensor_cache)
+        batch.append(torch.from_numpy(img_array))
+        hits.append((hit, n_bytes))
+    batch_tensor = torch.stack(batch)
+
+    pred_idxs_dic = dict()
+    forward_time_dic = dict()
+    for session in process_state['sessions']:
+        start_forward_time = session.forward_time
+        pred_idxs_dic[session.model_name] = session.predict(batch_tensor)
+        forward_time_dic[session.model_name] = (session.forward_time -
+                                                start_forward_time)
+    return pred_idxs_dic, forward_time_dic, hits
+
+
+class InferencePool(object):
+    """
+    Processes that classify batches of images with the same models in
+    parallel.
+    Parameters:
+     model_names - CNN architectures, values must be: resnet alexnet vgg
+                   (list of strings)
+     n_procs - number of inference processes (int)
+     tensor_cache - TensorCache of image crops to use, None for no cache
+    """
+    def __init__(self, model_names, n_procs, tensor_cache=None):
+        self.model_names = list(model_names)
+        self.n_procs = n_procs
+        self.tensor_cache = tensor_cache
+
+        # Loads each model once, sets it up for inference (eval mode, tuned
+        # memory format) & moves its weights to shared memory, so forked
+        # processes use these weights without copying them. Every process
+        # keeps all of the models, so they must fit in the model cache's
+        # budget together - an evicted model would be loaded again by each
+        # process instead of shared
+        if classifier.inference_backend == 'torch':
+            for model_name in self.model_names:
+                classifier.create_backend(model_name, 'torch')
+                classifier.load_model(model_name).share_memory()
+            classifier.check_model_cache_budget(self.model_names)
+
+        # Splits the cores between the processes
+        self.n_threads = max(1, (os.cpu_count() or 1) // n_procs)
+        start_method = ('fork' if 'fork' in
+                        multiprocessing.get_all_start_methods() else None)
+        self.pool = multiprocessing.get_context(start_method).Pool(
+            n_procs, init_inference_process,
+            (self.model_names, classifier.inference_backend,
+             classifier.image_decoder, self.n_threads, tensor_cache))
+
+        # Counts images & seconds for images_per_sec() - wall time of the
+        # whole pool & forward time of each model summed over the processes
+        self.n_images = 0
+        self.wall_time = 0.0
+        self.forward_time = dict((model_name, 0.0)
+                                 for model_name in self.model_names)
+
+    def classify_batch_multi(self, img_paths, batch_size=None,
+                             return_ids=False):
+        """
+        Classifies many images with every model of the pool, like
+        classifier.classify_batch_multi() but spread over the processes.
+        Parameters:
+         img_paths - paths to the image files to classify (list of strings)
+         batch_size - most images given to a model in one forward pass, None
+                      for the smallest (tuned) batch size of the models (int)
+         return_ids - True returns the ImageNet class indexes instead of the
+                      labels (bool)
+        Returns:
+         labels_dic - Dictionary with key as architecture and value as the
+                      ImageNet label (or class index) of each image, in the
+                      same order as img_paths (list of strings or ints)
+        """
+        batch_size = batch_size or min(classifier.tuned_batch_size(model_name)
+                                       for model_name in self.model_names)
+        batches = [img_paths[start:start + batch_size]
+                   for start in range(0, len(img_paths), batch_size)]
+        labels_dic = dict((model_name, []) for model_name in self.model_names)
+
+        # imap hands out one batch at a time to the next free process and
+        # returns the results in the order of the batches
+        start_time = time()
+        for batch, (pred_idxs_dic, forward_time_dic, hits) in zip(
+                batches, self.pool.imap(classify_pool_batch, batches)):
+            for model_name in self.model_names:
+                labels_dic[model_name].extend(
+                    pred_idx if return_ids else
+                    classifier.label_table.names[pred_idx]
+                    for pred_idx in pred_idxs_dic[model_name])
+                self.forward_time[model_name] += forward_time_dic[model_name]
+            if self.tensor_cache is not None:
+                for img_path, (hit, n_bytes) in zip(batch, hits):
+                    self.tensor_cache.record(img_path, hit, n_bytes)
+        self.wall_time += time() - start_time
+        self.n_images += len(img_paths)
+        return labels_dic
+
+    def classify_batch(self, img_paths, model_name, batch_size=None,
+                       return_ids=False):
+        """
+        Classifies many images with one model of the pool, like
+        classifier.classify_batch() but spread over the processes.
+        Parameters:
+         img_paths - paths to the image files to classify (list of strings)
+         model_name - CNN architecture, one of the pool's model_names (string)
+         batch_size - most images given to the model in one forward pass,
+                      None for the (tuned) batch size (int)
+         return_ids - True returns the ImageNet class indexes instead of the
+                      labels (bool)
+        Returns:
+         labels - ImageNet label (or class index) of each image, in the same
+                  order as img_paths (list of strings or ints)
+        """
+        if model_name not in self.model_names:
+            raise ValueError("model_name must be one of the pool's: " +
+                             ", ".join(self.model_names) + " (got " +
+                             repr(model_name) + ")")
+        return self.classify_batch_multi(img_paths, batch_size,
+                                         return_ids)[model_name]
+
+    def images_per_sec(self):
+        """
+        Returns the throughput of the whole pool so far.
+        Parameters:
+         None
+        Returns:
+         images_per_sec - images classified (by every model) per second of
+                          wall time (float)
+        """
+        if self.wall_time <= 0.0:
+            return 0.0
+        return self.n_images / self.wall_time
+
+    def model_images_per_sec(self, model_name):
+        """
+        Returns the throughput of one model's forward passes in a process,
+        comparable to ClassifierSession.images_per_sec().
+        Parameters:
+         model_name - CNN architecture (string)
+        Returns:
+         images_per_sec - images per second of forward passes (float)
+        """
+        if self.forward_time[model_name] <= 0.0:
+            return 0.0
+        return self.n_images / self.forward_time[model_name]
+
+    def print_stats(self):
+        """
+        Prints the throughput of the pool.
+        Parameters:
+         None
+        Returns:
+         None - simply printing results.
+        """
+        print("\n*** Inference Pool Statistics ***")
+        print("%20s: %d x %d threads" % ('N Processes', self.n_procs,
+                                         self.n_threads))
+        print("%20s: %d" % ('N Images', self.n_images))
+        print("%20s: %.1f" % ('Images/sec', self.images_per_sec()))
+
+    def close(self):
+        """
+        Stops the inference processes.
+        """
+        self.pool.close()
+        self.pool.join()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/label_table.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Compiled table of the ImageNet labels. Parsing
+#          imagenet1000_clsid_to_human.txt with ast.literal_eval on every
+#          import is slow, and so is lowercasing & stripping the chosen label
+#          of every image. The labels are compiled once into a .npz file next
+#          to the text file that holds, for each class index, its display name
+#          and its normalized (lowercase & stripped) label. The labels are
+#          indexed by class index only - a few display names (like crane) are
+#          shared by two classes, so a label can't be turned back into its
+#          class. The .npz file stores a hash of the text file & is compiled
+#          again whenever the text file changes.
+#
+#   Example use:
+#    label_table = load_label_table('imagenet1000_clsid_to_human.txt')
+#    label_table.names[pred_idx], label_table.normalized[pred_idx]
+##
+
+# Imports python modules
+import ast
+import hashlib
+import os
+
+import numpy as np
+
+
+class LabelTable(object):
+    """
+    ImageNet labels indexed by class index.
+    Parameters:
+     names - display name of each class (list of strings)
+     normalized - lowercase & stripped label of each class (list of strings)
+    """
+    def __init__(self, names, normalized):
+        self.names = names
+        self.normalized = normalized
+
+
+def file_sha1(file_path):
+    """
+    Returns the hash of a file's contents.
+    Parameters:
+     file_path - path to the file (string)
+    Returns:
+     hash - hexadecimal SHA-1 hash of the file's contents (string)
+    """
+    with open(file_path, 'rb') as infile:
+        return hashlib.sha1(infile.read()).hexdigest()
+
+
+def compile_label_table(txt_path):
+    """
+    Parses the ImageNet labels text file into a LabelTable.
+    Parameters:
+     txt_path - path to the text file of a dictionary with key as class index
+                and value as label (string)
+    Returns:
+     label_table - LabelTable of the labels
+    """
+    with open(txt_path) as txt_file:
+        classes_dict = ast.literal_eval(txt_file.read())
+
+    names = [classes_dict[idx] for idx in range(len(classes_dict))]
+    return LabelTable(names, [name.lower().strip() for name in names])
+
+
+def save_label_table(label_table, table_path, source_hash):
+    """
+    Saves a LabelTable as a .npz file of string & integer arrays.
+    Parameters:
+     label_table - LabelTable to save
+     table_path - path of the .npz file written (string)
+     source_hash - hash of the text file the table was compiled from (string)
+    Returns:
+     None
+    """
+    # Writes to a temporary file first so another process never loads a
+    # partly written table
+    tmp_path = table_path + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp_path, 'wb') as table_file:
+        np.savez(table_file, names=np.array(label_table.names),
+                 normalized=np.array(label_table.normalized),
+                 source_hash=np.array(source_hash))
+    os.replace(tmp_path, table_path)
+
+
+def load_label_table(txt_path, table_path=None):
+    """
+    Returns the LabelTable of the ImageNet labels text file, loaded from its
+    compiled .npz file when that was compiled from the same text, otherwise
+    compiled from the text file and saved.
+    Parameters:
+     txt_path - path to the ImageNet labels text file (string)
+     table_path - path to the compiled .npz file, None for the text file's
+                  path with .npz instead of .txt (string)
+    Returns:
+     label_table - LabelTable of the labels
+    """
+    if table_path is None:
+        table_path = os.path.splitext(txt_path)[0] + '.npz'
+    source_hash = file_sha1(txt_path)
+
+    try:
+        with np.load(table_path) as arrays:
+            if str(arrays['source_hash']) == source_hash:
+                return LabelTable(arrays['names'].tolist(),
+                                  arrays['normalized'].tolist())
+    except (IOError, OSError, KeyError, ValueError):
+        # missing or unreadable - compiled again below
+        pass
+
+    label_table = compile_label_table(txt_path)
+    try:
+        save_label_table(label_table, table_path, source_hash)
+    except (IOError, OSError):
+        # read-only folder - the table is compiled again next time
+        pass
+    return label_table
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/latency_stats.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Percentiles of latencies (like p50 & p99) over a window of the most
+#          recent measurements, so a long-running process keeps a bounded
+#          amount of memory. Percentiles use the nearest-rank method: the
+#          p-th percentile is the smallest latency that at least p percent of
+#          the latencies are less than or equal to.
+#
+#   Example use:
+#    latency_stats = LatencyStats()
+#    latency_stats.add(end_time - start_time)
+#    print(latency_stats.summary())
+##
+
+# Imports python modules
+import math
+from collections import deque
+
+
+def percentile(sorted_values, pct):
+    """
+    Returns the nearest-rank percentile of sorted values.
+    Parameters:
+     sorted_values - values in increasing order (list of floats)
+     pct - percentile, from 0 to 100 (float)
+    Returns:
+     value - the percentile, 0.0 if there are no values (float)
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(math.ceil(pct / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class LatencyStats(object):
+    """
+    Latencies in seconds over a window of the most recent measurements.
+    Parameters:
+     window - most latencies kept (int)
+    """
+    def __init__(self, window=10000):
+        self.latencies = deque(maxlen=window)
+        self.n_total = 0
+
+    def add(self, latency):
+        """
+        Adds one latency.
+        Parameters:
+         latency - latency in seconds (float)
+        Returns:
+         None
+        """
+        self.latencies.append(latency)
+        self.n_total += 1
+
+    def summary(self, pcts=(50, 99)):
+        """
+        Returns the count & percentiles of the latencies.
+        Parameters:
+         pcts - percentiles to return, from 0 to 100 (tuple of floats)
+        Returns:
+         summary - Dictionary with 'n' (count of all latencies added) and
+                   'p<pct>_ms' (percentile of the window in milliseconds)
+        """
+        sorted_latencies = sorted(self.latencies)
+        summary = {'n': self.n_total}
+        for pct in pcts:
+            summary['p%g_ms' % pct] = percentile(sorted_latencies, pct) * 1000.0
+        return summary
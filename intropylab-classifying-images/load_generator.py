@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/load_generator.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Load generator for classify_service.py, so the service can be
+#          benchmarked on one machine. It keeps a fixed number of requests in
+#          flight - each client holds a keep-alive connection and sends its
+#          next request as soon as the last one is answered - cycling over
+#          the images of a folder. It prints the requests per second & the
+#          client side p50/p99 latency, followed by the service's /metrics.
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python load_generator.py --dir <directory with images> --arch <model>
+#             --requests <count> --concurrency <clients>
+#   Example call:
+#    python load_generator.py --dir pet_images/ --arch vgg --requests 2000
+#           --concurrency 64
+##
+
+# Imports python modules
+import argparse
+import asyncio
+import json
+import os
+from time import time
+
+# Imports streaming scanner of the folder of images
+from image_scanner import scan_images
+
+# Imports percentiles of latencies
+from latency_stats import LatencyStats
+
+
+# Main program function defined below
+def main():
+    # Creates & retrieves Command Line Arguments
+    in_arg = get_input_args()
+
+    # Paths are sent as absolute paths since the service reads the images
+    # from its own current folder
+    img_paths = [os.path.abspath(os.path.join(in_arg.dir, rel_path))
+                 for rel_path, _ in scan_images(in_arg.dir)]
+    if not img_paths:
+        raise ValueError("no images found in " + in_arg.dir)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        latency_stats, n_errors, run_time = loop.run_until_complete(
+            run_load(in_arg.host, in_arg.port, in_arg.arch, img_paths,
+                     in_arg.requests, in_arg.concurrency))
+        _, metrics = loop.run_until_complete(
+            http_request(in_arg.host, in_arg.port, 'GET', '/metrics'))
+    finally:
+        loop.close()
+
+    summary = latency_stats.summary((50, 99))
+    print("*** Load (%d requests, %d concurrent, %s) ***" %
+          (in_arg.requests, in_arg.concurrency, in_arg.arch))
+    print("%20s: %.1f" % ('Requests/sec', in_arg.requests / run_time))
+    print("%20s: %d" % ('N Errors', n_errors))
+    print("%20s: %.1f" % ('p50 ms', summary['p50_ms']))
+    print("%20s: %.1f" % ('p99 ms', summary['p99_ms']))
+    print("\n*** Service Metrics ***")
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+
+
+# Functions defined below
+def get_input_args():
+    """
+    Retrieves and parses the command line arguments created and defined using
+    the argparse module. This function returns these arguments as an
+    ArgumentParser object.
+    Parameters:
+     None - simply using argparse module to create & store command line arguments
+    Returns:
+     parse_args() -data structure that stores the command line arguments object
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dir', type=str, default='pet_images/',
+                        help='path to folder of images sent')
+    parser.add_argument('--arch', type=str, default='vgg',
+                        help='model the images are classified with')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='address of classify_service.py')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='port of classify_service.py')
+    parser.add_argument('--requests', type=int, default=1000,
+                        help='total requests sent')
+    parser.add_argument('--concurrency', type=int, default=32,
+                        help='requests in flight at once')
+    return parser.parse_args()
+
+
+async def send_request(reader, writer, host, method, target, body=b''):
+    """
+    Sends one HTTP/1.1 request on an open connection & reads the response.
+    Parameters:
+     reader - asyncio StreamReader of the connection
+     writer - asyncio StreamWriter of the connection
+     host - address of the service, for the Host header (string)
+     method - HTTP method (string)
+     target - request path (string)
+     body - request body (bytes)
+    Returns:
+     status - HTTP status code (int)
+     response - JSON response (dictionary)
+    """
+    writer.write(("%s %s HTTP/1.1\r\n"
+                  "Host: %s\r\n"
+                  "Content-Type: application/json\r\n"
+                  "Content-Length: %d\r\n\r\n" %
+                  (method, target, host, len(body))).encode('latin-1') + body)
+    await writer.drain()
+
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    content_length = 0
+    for line in lines[1:]:
+        if line.lower().startswith('content-length:'):
+            content_length = int(line.split(':', 1)[1])
+    response = await reader.readexactly(content_length)
+    return status, json.loads(response.decode('utf-8'))
+
+
+async def http_request(host, port, method, target, body=b''):
+    """
+    Sends one request on a new connection.
+    Parameters:
+     host - address of the service (string)
+     port - port of the service (int)
+     method - HTTP method (string)
+     target - request path (string)
+     body - request body (bytes)
+    Returns:
+     status - HTTP status code (int)
+     response - JSON response (dictionary)
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return await send_request(reader, writer, host, method, target, body)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, model_name, img_paths, n_requests,
+                   concurrency):
+    """
+    Sends n_requests classify requests from concurrency clients.
+    Parameters:
+     host - address of the service (string)
+     port - port of the service (int)
+     model_name - CNN architecture (string)
+     img_paths - absolute paths to the image files, cycled over (list of
+                 strings)
+     n_requests - total requests sent (int)
+     concurrency - number of clients, each with one request in flight (int)
+    Returns:
+     latency_stats - LatencyStats of the requests
+     n_errors - count of requests that didn't return 200 (int)
+     run_time - seconds from the first request to the last response (float)
+    """
+    latency_stats = LatencyStats(window=n_requests)
+    counts = {'next': 0, 'errors': 0}
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            # Takes the next request number until all requests are sent
+            while counts['next'] < n_requests:
+                img_path = img_paths[counts['next'] % len(img_paths)]
+                counts['next'] += 1
+                body = json.dumps({'img_path': img_path,
+                                   'arch': model_name}).encode('utf-8')
+                start_time = time()
+                status, _ = await send_request(reader, writer, host, 'POST',
+                                               '/classify', body)
+                latency_stats.add(time() - start_time)
+                if status != 200:
+                    counts['errors'] += 1
+        finally:
+            writer.close()
+
+    start_time = time()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return latency_stats, counts['errors'], time() - start_time
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/match_index.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Precomputed matches between pet image labels and ImageNet classes.
+#          Whether a pet image label matches a classifier label only depends
+#          on the pair (pet label, ImageNet class), so instead of comparing
+#          the strings for every image, the match of every distinct pet label
+#          with every class is computed once into a matrix. Matching the
+#          images of a run is then one array lookup over all of them. The
+#          match function is given by the caller, so each way of matching
+#          labels (like label_match() in check_images_solution.py) keeps its
+#          exact results.
+#
+#   Example use:
+#    match_index = get_match_index(set(truths), label_table.normalized,
+#                                  label_match)
+#    matches = match_index.lookup(match_index.truth_codes(truths), class_ids)
+##
+
+# Imports python modules
+import numpy as np
+
+
+class MatchIndex(object):
+    """
+    Matrix of the match (1) or no match (0) of each pet image label with each
+    ImageNet class.
+    Parameters:
+     truths - distinct pet image labels (iterable of strings)
+     class_labels - normalized (lowercase & stripped) label of each ImageNet
+                    class, indexed by class index (list of strings)
+     match_fn - function(truth, model_label) returning 1 if the pet image
+                label matches the normalized classifier label and 0 if not
+    """
+    def __init__(self, truths, class_labels, match_fn):
+        self.class_labels = class_labels
+        self.match_fn = match_fn
+
+        # Code of each pet image label = its row in the matrix
+        self.truths = []
+        self.codes = dict()
+        self.matrix = np.zeros((0, len(class_labels)), dtype=np.uint8)
+        self.add_truths(truths)
+
+    def add_truths(self, truths):
+        """
+        Adds the rows of the pet image labels that aren't in the index yet -
+        codes of the labels already in it don't change.
+        Parameters:
+         truths - pet image labels (iterable of strings)
+        Returns:
+         None
+        """
+        new_truths = sorted(set(truths) - set(self.codes))
+        if not new_truths:
+            return
+
+        rows = np.zeros((len(new_truths), len(self.class_labels)),
+                        dtype=np.uint8)
+        for row, truth in enumerate(new_truths):
+            for class_idx, model_label in enumerate(self.class_labels):
+                rows[row, class_idx] = self.match_fn(truth, model_label)
+            self.codes[truth] = len(self.truths)
+            self.truths.append(truth)
+        self.matrix = np.concatenate((self.matrix, rows))
+
+    def truth_codes(self, truths):
+        """
+        Returns the code (matrix row) of each pet image label.
+        Parameters:
+         truths - pet image labels, all in the index (list of strings)
+        Returns:
+         truth_codes - int numpy array of the codes
+        """
+        return np.array([self.codes[truth] for truth in truths],
+                        dtype=np.int64)
+
+    def lookup(self, truth_codes, class_ids):
+        """
+        Returns the match of each pet image label with its predicted class.
+        Parameters:
+         truth_codes - codes from truth_codes() (int numpy array)
+         class_ids - ImageNet class index predicted for each image, an array
+                     with one more dimension of k classes per image for top k
+                     predictions (int numpy array)
+        Returns:
+         matches - 1/0 numpy array of the same shape as class_ids
+        """
+        if class_ids.ndim > truth_codes.ndim:
+            truth_codes = truth_codes[:, np.newaxis]
+        return self.matrix[truth_codes, class_ids]
+
+
+# Match indexes built so far, key = (ImageNet class labels, match function)
+# - reused by every chunk of images & architecture, only new pet image labels
+# add rows
+match_indexes = dict()
+
+
+def get_match_index(truths, class_labels, match_fn):
+    """
+    Returns the MatchIndex for class_labels & match_fn with rows for the pet
+    image labels, building it the first time it's requested and adding only
+    the labels it doesn't have yet after that.
+    Parameters:
+     truths - distinct pet image labels (iterable of strings)
+     class_labels - normalized label of each ImageNet class (list of strings)
+     match_fn - function(truth, model_label) returning 1/0 (see MatchIndex)
+    Returns:
+     match_index - MatchIndex of the vocabulary
+    """
+    key = (tuple(class_labels), match_fn)
+    if key not in match_indexes:
+        match_indexes[key] = MatchIndex(truths, class_labels, match_fn)
+    else:
+        match_indexes[key].add_truths(truths)
+    return match_indexes[key]
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/merge_shards.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Merges the results journals of a sharded run into the results
+#          statistics of the whole folder of images. Each machine classifies
+#          one shard of the images with check_images_solution.py --shard i/N
+#          --journal <file>, then the journals are merged here. The merged
+#          statistics are calculated by the same adjust_results4_isadog() &
+#          calculates_results_stats() over the per-image results of all the
+#          shards, so they're exactly the statistics of a single machine run.
+#          The journals must all be complete, come from the same settings and
+#          cover every shard exactly once.
+#
+# Use argparse Expected Call with <> indicating expected user input:
+#      python merge_shards.py <journal of each shard>
+#             --dogfile <file that contains dognames>
+#   Example call:
+#    python merge_shards.py shard0.journal shard1.journal shard2.journal
+#           shard3.journal --dogfile dognames.txt --save_stats stats.json
+##
+
+# Imports python modules
+import argparse
+import json
+
+# Imports functions that calculate & print the results - none of the
+# imports below need pytorch or the models
+from results_stats import (adjust_results4_isadog, calculates_results_stats,
+                           print_results)
+
+# Imports ImageNet labels & reading of the results journals
+from label_table import load_label_table
+from results_journal import read_journal, journal_results
+
+# Labels of the ImageNet classes the journals' class indexes refer to
+label_table = load_label_table('imagenet1000_clsid_to_human.txt')
+
+
+# Main program function defined below
+def main():
+    # Creates & retrieves Command Line Arguments
+    in_arg = get_input_args()
+
+    # Merges the results of the shards & calculates the statistics exactly as
+    # a single run over all the images does
+    params, results_dic = merge_journals(in_arg.journals)
+    adjust_results4_isadog(results_dic, in_arg.dogfile)
+    results_stats = calculates_results_stats(results_dic)
+
+    print("*** Merged %d shards of %s (%d images) ***" %
+          (len(in_arg.journals), params['dir'], len(results_dic)))
+    print_results(results_dic, results_stats, params['arch'], True, True)
+
+    # Saves the statistics for comparing runs
+    if in_arg.save_stats:
+        with open(in_arg.save_stats, 'w') as stats_file:
+            json.dump(results_stats, stats_file, indent=2, sort_keys=True)
+
+
+# Functions defined below
+def get_input_args():
+    """
+    Retrieves and parses the command line arguments created and defined using
+    the argparse module. This function returns these arguments as an
+    ArgumentParser object.
+    Parameters:
+     None - simply using argparse module to create & store command line arguments
+    Returns:
+     parse_args() -data structure that stores the command line arguments object
+    """
+    # Creates parse
+    parser = argparse.ArgumentParser()
+
+    # Creates the journal arguments & 2 optional command line arguments
+    # args.dogfile is the file of dognames, args.save_stats is a JSON file
+    # the merged statistics are saved to
+    parser.add_argument('journals', type=str, nargs='+',
+                        help='results journal of each shard')
+    parser.add_argument('--dogfile', type=str, default='dognames.txt',
+                        help='text file that has dognames')
+    parser.add_argument('--save_stats', type=str, default=None,
+                        help='JSON file to save the merged statistics to')
+
+    # returns parsed argument collection
+    return parser.parse_args()
+
+
+def merge_journals(journal_paths):
+    """
+    Reads the results journals of the shards of a run & joins their results,
+    checking that together they're the results of the whole run.
+    Parameters:
+     journal_paths - path to the journal of each shard (list of strings)
+    Returns:
+     params - settings of the run without the shard (dictionary)
+     results_dic - ResultsStore of the results of all the shards
+    """
+    params = None
+    rows = []
+    shard_indexes = set()
+    n_shards = None
+    for journal_path in journal_paths:
+        journal_params, journal_rows, complete_count, _ = \
+            read_journal(journal_path)
+
+        # Only complete journals are merged - a shard that died would be
+        # missing images, so it must be resumed first
+        if complete_count is None or complete_count != len(journal_rows):
+            raise ValueError("journal " + journal_path + " isn't complete, "
+                             "resume its shard with --resume")
+        if not journal_params.get('shard'):
+            raise ValueError("journal " + journal_path + " isn't a shard")
+
+        # Every shard must come from the same settings & count of shards
+        shard_index, shard_count = journal_params.pop('shard')
+        if params is None:
+            params, n_shards = journal_params, shard_count
+        elif journal_params != params or shard_count != n_shards:
+            raise ValueError("journal " + journal_path + " was written with "
+                             "other settings: " + json.dumps(journal_params))
+        if shard_index in shard_indexes:
+            raise ValueError("shard %d/%d is given twice" %
+                             (shard_index, n_shards))
+        shard_indexes.add(shard_index)
+        rows.extend(journal_rows)
+
+    missing = sorted(set(range(n_shards)) - shard_indexes)
+    if missing:
+        raise ValueError("missing shards: " + ", ".join(
+            "%d/%d" % (shard_index, n_shards) for shard_index in missing))
+    return params, journal_results(rows, label_table.normalized)
+
+
+# Call to main function to run the program
+if __name__ == "__main__":
+    main()
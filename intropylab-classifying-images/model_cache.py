@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/model_cache.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Cache of the loaded models with a memory budget. Keeping every
+#          architecture loaded costs the memory of all of them at once (vgg16
+#          alone holds about half a gigabyte), so when the models in the cache
+#          hold more bytes than the budget, the least recently used ones are
+#          evicted and loaded again the next time they're requested. The
+#          model that was just added is never evicted, so a single model
+#          bigger than the budget still works. Each eviction is counted and
+#          the resident bytes of each model are reported. The cache is guarded
+#          by a lock, so a thread (like classify_service.py's event loop) can
+#          read its statistics while another thread loads & evicts models.
+#
+#   Example use:
+#    model_cache = ModelCache(max_bytes=600 * 2**20)
+#    model = model_cache.get('vgg')
+#    if model is None:
+#        model_cache.put('vgg', load_vgg(), vgg_n_bytes)
+#    print(model_cache.stats())
+##
+
+# Imports python modules
+import threading
+from collections import OrderedDict
+
+
+class ModelCache(object):
+    """
+    Loaded models, least recently used first, within a memory budget.
+    Parameters:
+     max_bytes - most bytes held by the models in the cache, None for no
+                 budget (int)
+     on_evict - function(model_name) called after a model is evicted, so
+                anything else holding the model (like a session) can drop
+                it, None for nothing
+    """
+    def __init__(self, max_bytes=None, on_evict=None):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.models = OrderedDict()
+        self.n_bytes = dict()
+
+        # Reentrant since put() & make_room() evict while holding it
+        self.lock = threading.RLock()
+
+        # Evictions of each model & in total
+        self.evictions = dict()
+        self.n_evictions = 0
+
+    def __contains__(self, model_name):
+        with self.lock:
+            return model_name in self.models
+
+    def get(self, model_name):
+        """
+        Returns a model, marking it as the most recently used.
+        Parameters:
+         model_name - CNN architecture (string)
+        Returns:
+         model - the model, None if it isn't in the cache
+        """
+        with self.lock:
+            if model_name not in self.models:
+                return None
+            self.models.move_to_end(model_name)
+            return self.models[model_name]
+
+    def put(self, model_name, model, n_bytes):
+        """
+        Adds a model as the most recently used & evicts the least recently
+        used ones while the cache is over its budget.
+        Parameters:
+         model_name - CNN architecture (string)
+         model - the model
+         n_bytes - bytes held by the model (int)
+        Returns:
+         None
+        """
+        with self.lock:
+            self.models.pop(model_name, None)
+            self.models[model_name] = model
+            self.n_bytes[model_name] = n_bytes
+            self.make_room(0, n_keep=1)
+
+    def make_room(self, n_bytes, n_keep=0):
+        """
+        Evicts the least recently used models until n_bytes more fit in the
+        budget - called before loading a model whose size is known, so the
+        old & new models aren't held at the same time.
+        Parameters:
+         n_bytes - bytes needed (int)
+         n_keep - most recently used models that are never evicted (int)
+        Returns:
+         None
+        """
+        with self.lock:
+            if self.max_bytes is None:
+                return
+            while (len(self.models) > n_keep and
+                   self.resident_bytes() + n_bytes > self.max_bytes):
+                self.evict(next(iter(self.models)))
+
+    def evict(self, model_name):
+        """
+        Removes a model from the cache.
+        Parameters:
+         model_name - CNN architecture (string)
+        Returns:
+         None
+        """
+        with self.lock:
+            del self.models[model_name]
+            self.evictions[model_name] = self.evictions.get(model_name, 0) + 1
+            self.n_evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(model_name)
+
+    def set_max_bytes(self, max_bytes):
+        """
+        Changes the budget, evicting models if the cache is over the new one.
+        Parameters:
+         max_bytes - most bytes held by the models, None for no budget (int)
+        Returns:
+         None
+        """
+        with self.lock:
+            self.max_bytes = max_bytes
+            self.make_room(0, n_keep=1)
+
+    def resident_bytes(self, model_name=None):
+        """
+        Returns the bytes held by the models in the cache.
+        Parameters:
+         model_name - CNN architecture, None for all of the models (string)
+        Returns:
+         n_bytes - bytes held by the model(s), 0 for a model that isn't in
+                   the cache (int)
+        """
+        with self.lock:
+            if model_name is not None:
+                return (self.n_bytes[model_name] if model_name in self.models
+                        else 0)
+            return sum(self.n_bytes[name] for name in self.models)
+
+    def stats(self):
+        """
+        Returns the statistics of the cache.
+        Parameters:
+         None
+        Returns:
+         stats - Dictionary with 'max_bytes', 'resident_bytes',
+                 'n_evictions' and 'models' - a Dictionary with key as
+                 architecture and value as a Dictionary of its
+                 'resident_bytes' & 'n_evictions'
+        """
+        with self.lock:
+            return {'max_bytes': self.max_bytes,
+                    'resident_bytes': self.resident_bytes(),
+                    'n_evictions': self.n_evictions,
+                    'models': dict((model_name, {
+                        'resident_bytes': self.resident_bytes(model_name),
+                        'n_evictions': self.evictions.get(model_name, 0)})
+                        for model_name in self.n_bytes)}
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/pipeline_profiler.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Profiler of the stages of classifying a folder of images - scan,
+#          decode, preprocess, forward, label matching, is-a-dog adjustment,
+#          statistics & printing. Each stage is timed with the monotonic high
+#          resolution perf_counter() and recorded as:
+#           - the total seconds & number of calls of the stage
+#           - the time per image of each image that went through the stage
+#             (a batch's time split evenly between its images), summarized
+#             as p50/p95/p99
+#           - a span in a Chrome trace (open it in chrome://tracing or
+#             https://ui.perfetto.dev)
+#          The profiler is off until enable_profiler() is called, and then
+#          profile_stage() costs nothing. Only stages run by this process are
+#          recorded - with decode worker processes (--workers) or inference
+#          processes (--procs) the time waiting for them is in the 'classify'
+#          stage.
+#
+#   Example use:
+#    profiler = enable_profiler()
+#    with profile_stage('decode', 1):
+#        crop = decode_crop(img_path)
+#    profiler.print_stats()
+#    profiler.save_json('profile.json')
+#    profiler.save_chrome_trace('profile_trace.json')
+##
+
+# Imports python modules
+import json
+import os
+import threading
+from time import perf_counter
+
+# Imports percentiles of latencies
+from latency_stats import LatencyStats
+
+# Profiler that records the stages, None while profiling is off
+active_profiler = None
+
+
+class ProfiledStage(object):
+    """
+    Context manager that times one call of a stage.
+    Parameters:
+     profiler - Profiler the time is recorded by
+     name - name of the stage (string)
+     n_images - images that went through the stage in this call (int)
+    """
+    def __init__(self, profiler, name, n_images):
+        self.profiler = profiler
+        self.name = name
+        self.n_images = n_images
+
+    def __enter__(self):
+        self.start_time = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start_time,
+                             perf_counter() - self.start_time, self.n_images)
+        return False
+
+
+class NullStage(object):
+    """
+    Context manager that does nothing, used while profiling is off.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+null_stage = NullStage()
+
+
+class Profiler(object):
+    """
+    Times & trace spans of the stages of a run.
+    Parameters:
+     max_image_times - most per-image times kept for the percentiles of each
+                       stage (int)
+     max_trace_events - most spans kept for the Chrome trace, later spans
+                        are only counted (int)
+    """
+    def __init__(self, max_image_times=10**6, max_trace_events=10**5):
+        self.start_time = perf_counter()
+        self.max_image_times = max_image_times
+        self.max_trace_events = max_trace_events
+
+        # Stages in the order they first ran, key = stage name
+        self.stage_names = []
+        self.total_time = dict()
+        self.n_calls = dict()
+        self.n_images = dict()
+        self.image_times = dict()
+
+        self.trace_events = []
+        self.n_dropped_events = 0
+
+    def stage(self, name, n_images=0):
+        """
+        Returns a context manager that times one call of a stage.
+        Parameters:
+         name - name of the stage (string)
+         n_images - images that go through the stage in this call, 0 for
+                    stages that aren't per image like printing (int)
+        Returns:
+         stage - ProfiledStage
+        """
+        return ProfiledStage(self, name, n_images)
+
+    def record(self, name, start_time, duration, n_images=0):
+        """
+        Records one call of a stage.
+        Parameters:
+         name - name of the stage (string)
+         start_time - perf_counter() when the call started (float)
+         duration - seconds the call took (float)
+         n_images - images that went through the stage in the call (int)
+        Returns:
+         None
+        """
+        if name not in self.total_time:
+            self.stage_names.append(name)
+            self.total_time[name] = 0.0
+            self.n_calls[name] = 0
+            self.n_images[name] = 0
+            self.image_times[name] = LatencyStats(self.max_image_times)
+        self.total_time[name] += duration
+        self.n_calls[name] += 1
+        self.n_images[name] += n_images
+
+        # Each image gets an even share of the call's time
+        if n_images > 0:
+            image_time = duration / n_images
+            image_times = self.image_times[name]
+            for _ in range(n_images):
+                image_times.add(image_time)
+
+        if len(self.trace_events) < self.max_trace_events:
+            self.trace_events.append({
+                'name': name, 'ph': 'X', 'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'ts': (start_time - self.start_time) * 1e6,
+                'dur': duration * 1e6, 'args': {'n_images': n_images}})
+        else:
+            self.n_dropped_events += 1
+
+    def timed_iter(self, name, iterable):
+        """
+        Yields the items of an iterable (like the records streamed by
+        scan_images()), recording the time spent getting each item as one
+        call of a stage with one image.
+        Parameters:
+         name - name of the stage (string)
+         iterable - items to time
+        Returns:
+         generator of the items of iterable
+        """
+        iterator = iter(iterable)
+        while True:
+            start_time = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(name, start_time, perf_counter() - start_time, 1)
+            yield item
+
+    def summary(self):
+        """
+        Returns the statistics of each stage.
+        Parameters:
+         None
+        Returns:
+         summary - Dictionary with 'wall_sec' (seconds since the profiler
+                   started) and 'stages' - a Dictionary with key as stage
+                   name and value as a Dictionary of 'total_sec', 'n_calls',
+                   'n_images' and for stages with images the 'p50_ms',
+                   'p95_ms' & 'p99_ms' time per image
+        """
+        stages = dict()
+        for name in self.stage_names:
+            stages[name] = {'total_sec': self.total_time[name],
+                            'n_calls': self.n_calls[name],
+                            'n_images': self.n_images[name]}
+            if self.n_images[name] > 0:
+                percentiles = self.image_times[name].summary((50, 95, 99))
+                del percentiles['n']
+                stages[name].update(percentiles)
+        return {'wall_sec': perf_counter() - self.start_time,
+                'stages': stages}
+
+    def print_stats(self):
+        """
+        Prints the time of each stage & its p50/p95/p99 time per image.
+        Parameters:
+         None
+        Returns:
+         None - simply printing results.
+        """
+        summary = self.summary()
+        print("\n*** Profile of Stages (%.3f sec wall time) ***" %
+              summary['wall_sec'])
+        print("%-14s%8s%10s%8s%10s%10s%10s%10s" %
+              ('stage', 'calls', 'sec', '%', 'images', 'p50 ms', 'p95 ms',
+               'p99 ms'))
+        for name in self.stage_names:
+            stage = summary['stages'][name]
+            pct_time = (stage['total_sec'] / summary['wall_sec'] * 100.0
+                        if summary['wall_sec'] > 0 else 0.0)
+            line = "%-14s%8d%10.3f%8.1f%10d" % (name, stage['n_calls'],
+                                                stage['total_sec'], pct_time,
+                                                stage['n_images'])
+            if stage['n_images'] > 0:
+                line += "%10.3f%10.3f%10.3f" % (stage['p50_ms'],
+                                                stage['p95_ms'],
+                                                stage['p99_ms'])
+            print(line)
+
+    def save_json(self, json_path):
+        """
+        Saves summary() as a JSON file.
+        Parameters:
+         json_path - path to the JSON file (string)
+        Returns:
+         None
+        """
+        with open(json_path, 'w') as json_file:
+            json.dump(self.summary(), json_file, indent=2, sort_keys=True)
+
+    def save_chrome_trace(self, trace_path):
+        """
+        Saves the spans of the stages as a Chrome trace file.
+        Parameters:
+         trace_path - path to the trace file (string)
+        Returns:
+         None
+        """
+        with open(trace_path, 'w') as trace_file:
+            json.dump({'traceEvents': self.trace_events,
+                       'displayTimeUnit': 'ms',
+                       'otherData': {'n_dropped_events':
+                                     self.n_dropped_events}}, trace_file)
+
+
+def enable_profiler():
+    """
+    Starts profiling - profile_stage() records into a new Profiler from now
+    on.
+    Parameters:
+     None
+    Returns:
+     profiler - the new active Profiler
+    """
+    global active_profiler
+    active_profiler = Profiler()
+    return active_profiler
+
+
+def profile_stage(name, n_images=0):
+    """
+    Returns a context manager that times one call of a stage with the active
+    profiler, or does nothing while profiling is off.
+    Parameters:
+     name - name of the stage (string)
+     n_images - images that go through the stage in this call (int)
+    Returns:
+     stage - ProfiledStage or NullStage
+    """
+    if active_profiler is None:
+        return null_stage
+    return active_profiler.stage(name, n_images)
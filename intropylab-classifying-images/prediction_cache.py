@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/prediction_cache.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Persistent cache of classifier labels stored in a SQLite database.
+#          Each label & its ImageNet class index (labels like crane are shared
+#          by two classes) is saved under the hash of the image file's
+#          contents, the model architecture and a fingerprint of the model's
+#          weights, so rerunning on an unchanged folder of images skips the
+#          model's forward pass and a change of weights automatically misses
+#          the cache instead of returning stale labels. Labels of a backend
+#          other than torch are saved under the backend & the hash of its
+#          model file instead, since backends may not return exactly the same
+#          labels.
+#
+#   Example use:
+#    prediction_cache = PredictionCache('predictions.db')
+#    labels = prediction_cache.classify_batch(img_paths, 'vgg')
+#    prediction_cache.print_stats()
+##
+
+# Imports python modules
+import hashlib
+import os
+import sqlite3
+
+# Imports classifier module for the current inference backend
+import classifier
+
+# Imports functions for classifying images & fingerprinting model weights
+from classifier import (classify_batch, classify_batch_multi,
+                        model_fingerprint, onnx_model_path, preprocess_params,
+                        crop_params, label_table)
+
+# Hashes of model files already hashed by model_file_hash(), key = path and
+# value = (modification time, size, hash)
+model_file_hashes = dict()
+
+
+def file_hash(file_path):
+    """
+    Returns the hash of a file's contents.
+    Parameters:
+     file_path - path to the file (string)
+    Returns:
+     hash - hexadecimal SHA-1 hash of the file's contents (string)
+    """
+    content_hash = hashlib.sha1()
+    with open(file_path, 'rb') as infile:
+        content_hash.update(infile.read())
+    return content_hash.hexdigest()
+
+
+def model_file_hash(file_path):
+    """
+    Returns the hash of a model file's contents, hashed again only when the
+    file changes (model files are large & this is called for every chunk of
+    images).
+    Parameters:
+     file_path - path to the model file (string)
+    Returns:
+     hash - hexadecimal SHA-1 hash of the file's contents (string)
+    """
+    stat = os.stat(file_path)
+    cached = model_file_hashes.get(file_path)
+    if cached is None or cached[:2] != (stat.st_mtime, stat.st_size):
+        content_hash = hashlib.sha1()
+        with open(file_path, 'rb') as infile:
+            for block in iter(lambda: infile.read(2**20), b''):
+                content_hash.update(block)
+        cached = (stat.st_mtime, stat.st_size, content_hash.hexdigest())
+        model_file_hashes[file_path] = cached
+    return cached[2]
+
+
+def weights_key(model_name):
+    """
+    Returns the key of a model's labels - the fingerprint of its weights,
+    plus the preprocessing when an image decoder other than pil is used since
+    it may change the labels. With the onnxruntime backend it's the backend
+    & the hash of the .onnx file instead, so the torch model isn't loaded and
+    labels of the two backends are never mixed up.
+    Parameters:
+     model_name - CNN architecture (string)
+    Returns:
+     key - fingerprint of the model's weights & preprocessing (string)
+    """
+    if classifier.inference_backend == 'onnxruntime':
+        onnx_path = onnx_model_path(model_name)
+        if not os.path.exists(onnx_path):
+            raise ValueError(onnx_path + " not found - export it with "
+                             "export_models.py --format onnx")
+        key = 'onnxruntime:' + model_file_hash(onnx_path)
+    else:
+        key = model_fingerprint(model_name)
+
+    params = preprocess_params()
+    if params == crop_params:
+        return key
+    return key + ',' + params
+
+
+class PredictionCache(object):
+    """
+    Maps (image hash, architecture, weights fingerprint) to the classifier
+    label & ImageNet class index for that image, stored in a SQLite database
+    file.
+    Parameters:
+     db_path - path to the SQLite database file, created if missing (string)
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " image_hash TEXT NOT NULL,"
+            " arch TEXT NOT NULL,"
+            " weights TEXT NOT NULL,"
+            " label TEXT NOT NULL,"
+            " class_id INTEGER,"
+            " PRIMARY KEY (image_hash, arch, weights))")
+
+        # Databases made before class indexes were cached get the column -
+        # their rows have no class index & are classified again
+        columns = [row[1] for row in
+                   self.connection.execute("PRAGMA table_info(predictions)")]
+        if 'class_id' not in columns:
+            self.connection.execute(
+                "ALTER TABLE predictions ADD COLUMN class_id INTEGER")
+        self.connection.commit()
+
+        # Counters for print_stats()
+        self.n_from_cache = 0
+        self.n_from_model = 0
+
+    def get(self, image_hash, arch, weights):
+        """
+        Returns the cached class index of an image, or None if it isn't
+        cached.
+        Parameters:
+         image_hash - hash of the image file from file_hash() (string)
+         arch - CNN architecture (string)
+         weights - key of the model's labels from weights_key() (string)
+        Returns:
+         class_id - ImageNet class index (int) or None
+        """
+        row = self.connection.execute(
+            "SELECT class_id FROM predictions"
+            " WHERE image_hash = ? AND arch = ? AND weights = ?"
+            " AND class_id IS NOT NULL",
+            (image_hash, arch, weights)).fetchone()
+        return row[0] if row is not None else None
+
+    def put_many(self, image_hashes, arch, weights, class_ids):
+        """
+        Stores the class indexes (and labels) of many images in one
+        transaction.
+        Parameters:
+         image_hashes - hashes of the image files (list of strings)
+         arch - CNN architecture (string)
+         weights - key of the model's labels from weights_key() (string)
+         class_ids - ImageNet class index of each image (list of ints)
+        Returns:
+         None
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO predictions"
+                " (image_hash, arch, weights, label, class_id)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(image_hash, arch, weights, label_table.names[class_id],
+                  class_id)
+                 for image_hash, class_id in zip(image_hashes, class_ids)])
+
+    def classify_batch(self, img_paths, model_name, batch_size=None,
+                       n_workers=0, tensor_cache=None, decode_pool=None,
+                       return_ids=False):
+        """
+        Classifies many images like classifier.classify_batch(), but only runs
+        the model on images whose labels aren't cached, then caches those.
+        Parameters:
+         img_paths - paths to the image files to classify (list of strings)
+         model_name - CNN architecture, values must be: resnet alexnet vgg
+                      (string)
+         batch_size - most images given to the model in one forward pass,
+                      None for the tuned batch size (int)
+         n_workers - number of worker processes that decode & preprocess
+                     upcoming images while the model runs, 0 for none (int)
+         tensor_cache - TensorCache of image crops to use, None for no cache
+         decode_pool - pool of decode workers from create_decode_pool(),
+                       used instead of n_workers, None for none
+         return_ids - True returns the ImageNet class indexes instead of the
+                      labels (bool)
+        Returns:
+         labels - ImageNet label (or class index) of each image, in the same
+                  order as img_paths (list of strings or ints)
+        """
+        weights = weights_key(model_name)
+        image_hashes = [file_hash(img_path) for img_path in img_paths]
+        class_ids = [self.get(image_hash, model_name, weights)
+                     for image_hash in image_hashes]
+
+        # Runs the model only on the images that weren't found in the cache
+        missing = [idx for idx in range(len(class_ids))
+                   if class_ids[idx] is None]
+        if missing:
+            model_ids = classify_batch([img_paths[idx] for idx in missing],
+                                       model_name, batch_size, n_workers,
+                                       tensor_cache, decode_pool,
+                                       return_ids=True)
+            for idx, class_id in zip(missing, model_ids):
+                class_ids[idx] = class_id
+            self.put_many([image_hashes[idx] for idx in missing], model_name,
+                          weights, model_ids)
+
+        self.n_from_cache += len(class_ids) - len(missing)
+        self.n_from_model += len(missing)
+        if return_ids:
+            return class_ids
+        return [label_table.names[class_id] for class_id in class_ids]
+
+    def classify_batch_multi(self, img_paths, model_names, batch_size=None,
+                             n_workers=0, tensor_cache=None,
+                             decode_pool=None, return_ids=False):
+        """
+        Classifies many images with several models like
+        classifier.classify_batch_multi(), but only decodes the images that
+        aren't cached for at least one of the models, then caches those.
+        Parameters:
+         img_paths - paths to the image files to classify (list of strings)
+         model_names - CNN architectures, values must be: resnet alexnet vgg
+                       (list of strings)
+         batch_size - most images given to a model in one forward pass,
+                      None for the tuned batch size (int)
+         n_workers - number of worker processes that decode & preprocess
+                     upcoming images while the models run, 0 for none (int)
+         tensor_cache - TensorCache of image crops to use, None for no cache
+         decode_pool - pool of decode workers from create_decode_pool(),
+                       used instead of n_workers, None for none
+         return_ids - True returns the ImageNet class indexes instead of the
+                      labels (bool)
+        Returns:
+         labels_dic - Dictionary with key as architecture and value as the
+                      ImageNet label (or class index) of each image, in the
+                      same order as img_paths (list of strings or ints)
+        """
+        image_hashes = [file_hash(img_path) for img_path in img_paths]
+        weights_dic = dict()
+        ids_dic = dict()
+        for model_name in model_names:
+            weights_dic[model_name] = weights_key(model_name)
+            ids_dic[model_name] = [self.get(image_hash, model_name,
+                                            weights_dic[model_name])
+                                   for image_hash in image_hashes]
+
+        # Decodes each image missing for any model once, and runs only the
+        # models that are missing at least one image
+        missing = [idx for idx in range(len(img_paths))
+                   if any(ids_dic[model_name][idx] is None
+                          for model_name in model_names)]
+        missing_models = [model_name for model_name in model_names
+                          if None in ids_dic[model_name]]
+        n_new = 0
+        if missing:
+            model_ids_dic = classify_batch_multi(
+                [img_paths[idx] for idx in missing], missing_models,
+                batch_size, n_workers, tensor_cache, decode_pool,
+                return_ids=True)
+
+            # Fills in & caches only the class indexes each model was missing
+            for model_name in missing_models:
+                new_pos = [pos for pos, idx in enumerate(missing)
+                           if ids_dic[model_name][idx] is None]
+                new_ids = [model_ids_dic[model_name][pos] for pos in new_pos]
+                for pos, class_id in zip(new_pos, new_ids):
+                    ids_dic[model_name][missing[pos]] = class_id
+                self.put_many([image_hashes[missing[pos]] for pos in new_pos],
+                              model_name, weights_dic[model_name], new_ids)
+                n_new += len(new_pos)
+
+        self.n_from_cache += len(img_paths) * len(model_names) - n_new
+        self.n_from_model += n_new
+        if return_ids:
+            return ids_dic
+        return dict((model_name, [label_table.names[class_id]
+                                  for class_id in ids_dic[model_name]])
+                    for model_name in model_names)
+
+    def print_stats(self):
+        """
+        Prints how many labels came from the cache and how many from the
+        model.
+        Parameters:
+         None
+        Returns:
+         None - simply printing results.
+        """
+        print("\n*** Prediction Cache Statistics ***")
+        print("%20s: %d" % ('N From Cache', self.n_from_cache))
+        print("%20s: %d" % ('N From Model', self.n_from_model))
+
+    def close(self):
+        """
+        Closes the database file.
+        """
+        self.connection.close()
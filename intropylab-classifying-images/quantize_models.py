@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/quantize_models.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Builds INT8 quantized versions of the CNN models in classifier.py
+#          for faster & smaller inference on CPU-only hosts:
+#           - resnet: torchvision's quantizable resnet18 with pretrained INT8
+#                     weights (static quantization of the convolutions)
+#           - alexnet & vgg: convolutions fused with their ReLUs & statically
+#                     quantized after calibrating on a few images, fully
+#                     connected layers dynamically quantized
+#          Quantized models are saved to disk as TorchScript files so later
+#          runs load them directly - the file name has a hash of the float
+#          weights, the preprocessing & the calibration images, so a model
+#          calibrated on other images or other weights is built again
+#          instead of reused. register_quantized_models() adds them to
+#          classifier.py under the names resnet_int8, alexnet_int8 & vgg_int8
+#          so they're used exactly like the original models.
+#
+#   Example use:
+#    register_quantized_models(calibration_paths=img_paths[:32])
+#    labels = classify_batch(img_paths, 'vgg_int8')
+##
+
+# Imports python modules
+import hashlib
+import os
+
+import torch
+import torch.nn as nn
+
+# torchvision 0.5 & higher provides quantizable models with INT8 weights
+try:
+    from torchvision.models import quantization as quantizable_models
+except ImportError:
+    quantizable_models = None
+
+# Imports classifier model registry & preprocessing for calibration images
+from classifier import (model_builders, iter_image_batches,
+                        model_fingerprint, preprocess_params)
+
+# Suffix added to an architecture name for its quantized model
+quantized_suffix = '_int8'
+
+
+def check_quantization_support():
+    """
+    Raises RuntimeError if the installed pytorch can't quantize models.
+    Parameters:
+     None
+    Returns:
+     None
+    """
+    if not hasattr(torch, 'quantization') or not hasattr(torch, 'jit'):
+        raise RuntimeError("INT8 quantization needs pytorch 1.3 or higher "
+                           "(installed: " + torch.__version__ + ")")
+
+
+def quantize_features(model, calibration_paths):
+    """
+    Statically quantizes the convolutional part (model.features) of an
+    alexnet or vgg model in place: fuses each Conv2d with the ReLU after it,
+    runs calibration images through the model to pick the quantization
+    ranges, then converts the layers to INT8.
+    Parameters:
+     model - alexnet or vgg model in evaluation mode (torch.nn.Module)
+     calibration_paths - paths to the images used for calibration (list of
+                         strings)
+    Returns:
+     None - model is changed in place
+    """
+    features = model.features
+
+    # Fuses each Conv2d with the ReLU right after it
+    fuse_list = [[str(idx), str(idx + 1)] for idx in range(len(features) - 1)
+                 if isinstance(features[idx], nn.Conv2d) and
+                 isinstance(features[idx + 1], nn.ReLU)]
+    torch.quantization.fuse_modules(features, fuse_list, inplace=True)
+
+    # Quantizes the input of the convolutional part & dequantizes its output
+    # so the rest of the model keeps working on float tensors
+    model.features = nn.Sequential(torch.quantization.QuantStub(), features,
+                                   torch.quantization.DeQuantStub())
+    model.features.qconfig = torch.quantization.get_default_qconfig(
+        torch.backends.quantized.engine)
+    torch.quantization.prepare(model.features, inplace=True)
+
+    # Calibrates - observers record the range of values in each layer
+    with torch.no_grad():
+        for batch_tensor in iter_image_batches(calibration_paths, 8):
+            model(batch_tensor)
+
+    torch.quantization.convert(model.features, inplace=True)
+
+
+def build_quantized_model(model_name, calibration_paths):
+    """
+    Builds the INT8 quantized version of the model for architecture
+    model_name.
+    Parameters:
+     model_name - CNN architecture, values must be: resnet alexnet vgg (string)
+     calibration_paths - paths to the images used to calibrate static
+                         quantization of alexnet & vgg (list of strings)
+    Returns:
+     model - quantized model in evaluation mode (torch.nn.Module)
+    """
+    check_quantization_support()
+
+    # torchvision provides resnet18 with pretrained INT8 weights
+    if model_name == 'resnet' and quantizable_models is not None:
+        return quantizable_models.resnet18(pretrained=True,
+                                           quantize=True).eval()
+
+    # Builds a fresh float model - quantizing changes the model in place.
+    # Only alexnet & vgg have a plain stack of convolutions (features) that
+    # can be statically quantized this way
+    model = model_builders[model_name](pretrained=True).eval()
+    if hasattr(model, 'features') and calibration_paths:
+        quantize_features(model, calibration_paths)
+
+    # Fully connected layers are quantized dynamically - their weights are
+    # INT8 and their inputs are quantized on the fly, no calibration needed
+    return torch.quantization.quantize_dynamic(model, {nn.Linear},
+                                               dtype=torch.qint8)
+
+
+def quantized_model_key(model_name, calibration_paths):
+    """
+    Returns a short hash of what the quantized model for architecture
+    model_name is built from - the fingerprint of the float model's weights,
+    the preprocessing and the paths & contents of the calibration images.
+    torchvision's pretrained INT8 resnet18 is built from neither.
+    Parameters:
+     model_name - CNN architecture, values must be: resnet alexnet vgg (string)
+     calibration_paths - paths to the images used to calibrate static
+                         quantization of alexnet & vgg (list of strings)
+    Returns:
+     key - first 12 hexadecimal digits of the SHA-1 hash (string)
+    """
+    key_hash = hashlib.sha1()
+    if model_name == 'resnet' and quantizable_models is not None:
+        key_hash.update(b'torchvision resnet18 int8')
+    else:
+        key_hash.update(model_fingerprint(model_name).encode('utf-8'))
+        key_hash.update(preprocess_params().encode('utf-8'))
+        for img_path in calibration_paths or []:
+            key_hash.update(img_path.encode('utf-8'))
+            with open(img_path, 'rb') as img_file:
+                key_hash.update(hashlib.sha1(img_file.read()).digest())
+    return key_hash.hexdigest()[:12]
+
+
+def load_quantized_model(model_name, cache_dir='quantized_models/',
+                         calibration_paths=None):
+    """
+    Returns the INT8 quantized model for architecture model_name, loading it
+    from cache_dir if it was saved there before from the same float weights
+    & calibration images, otherwise building it and saving it as a
+    TorchScript file named with quantized_model_key().
+    Parameters:
+     model_name - CNN architecture, values must be: resnet alexnet vgg (string)
+     cache_dir - folder that holds the saved quantized models (string)
+     calibration_paths - paths to the images used to calibrate static
+                         quantization of alexnet & vgg (list of strings)
+    Returns:
+     model - quantized model (torch.jit.ScriptModule)
+    """
+    check_quantization_support()
+
+    model_path = os.path.join(cache_dir, model_name + quantized_suffix + '_' +
+                              quantized_model_key(model_name,
+                                                  calibration_paths) + '.pt')
+    if os.path.exists(model_path):
+        return torch.jit.load(model_path).eval()
+
+    model = build_quantized_model(model_name, calibration_paths)
+    with torch.no_grad():
+        scripted_model = torch.jit.trace(model, torch.zeros(1, 3, 224, 224))
+
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    torch.jit.save(scripted_model, model_path)
+
+    return scripted_model.eval()
+
+
+def register_quantized_models(cache_dir='quantized_models/',
+                              calibration_paths=None):
+    """
+    Adds the quantized version of each architecture to classifier.py's model
+    registry under the architecture name plus '_int8' (e.g. vgg_int8). Like
+    the original models, they're only built or loaded when first used.
+    Parameters:
+     cache_dir - folder that holds the saved quantized models (string)
+     calibration_paths - paths to the images used to calibrate static
+                         quantization of alexnet & vgg (list of strings)
+    Returns:
+     None - quantized models are added to classifier.model_builders
+    """
+    check_quantization_support()
+
+    for model_name in list(model_builders):
+        if model_name.endswith(quantized_suffix):
+            continue
+
+        # Default argument binds the current model_name to each builder
+        def builder(pretrained=True, model_name=model_name):
+            return load_quantized_model(model_name, cache_dir,
+                                        calibration_paths)
+
+        model_builders[model_name + quantized_suffix] = builder
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/results_journal.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Append-only journal of the results of classifying images, so a run
+#          that dies partway through a large folder can be resumed instead of
+#          starting over. classify_images() appends the results of each chunk
+#          of images as one JSON line per image - [filename, pet label,
+#          ImageNet class index, match] - after a header line with the
+#          settings of the run. Resuming reads the journal back, skips the
+#          images already in it and rebuilds their results. A crash can leave
+#          the last line partly written - it's dropped (and cut off the file)
+#          when the journal is opened again, so that image is classified
+#          again. When the run finishes a last line {"complete": count} marks
+#          the journal as complete (see merge_shards.py, which only merges
+#          complete journals of shards).
+#
+#   Example use:
+#    journal = ResultsJournal('results.journal', {'arch': 'vgg'}, resume=True)
+#    results_dic = journal.load_results(label_table.normalized)
+#    journal.append(chunk_results_dic)
+#    journal.finish()
+##
+
+# Imports python modules
+import json
+import os
+
+import numpy as np
+
+# Imports columnar store of the results
+from results_store import ResultsStore
+
+
+class ResultsJournal(object):
+    """
+    Journal file of per-image results, opened for appending.
+    Parameters:
+     journal_path - path to the journal file (string)
+     params - settings of the run, like the architecture - resuming with
+              different settings raises ValueError (dictionary)
+     resume - True keeps the results already in the journal, False starts a
+              new journal (bool)
+    """
+    def __init__(self, journal_path, params, resume=False):
+        self.journal_path = journal_path
+        self.params = params
+
+        # Results read back from the journal, in the order they were written,
+        # as [filename, pet label, class index, match] rows
+        self.rows = []
+
+        if resume and os.path.exists(journal_path) and self.read():
+            self.journal_file = open(journal_path, 'a')
+        else:
+            self.journal_file = open(journal_path, 'w')
+            self.write_lines([json.dumps(params, sort_keys=True)])
+
+        # Filenames already journaled, skipped when resuming
+        self.done = set(row[0] for row in self.rows)
+        self.n_results = len(self.rows)
+
+    def read(self):
+        """
+        Reads the results back from the journal, dropping a partly written
+        last line.
+        Parameters:
+         None
+        Returns:
+         has_header - False if the crash happened before the header was
+                      written, so there's nothing to resume (bool)
+        """
+        params, self.rows, complete_count, complete_size = \
+            read_journal(self.journal_path)
+
+        # Cuts a partly written last line off the file
+        if complete_size < os.path.getsize(self.journal_path):
+            with open(self.journal_path, 'r+b') as journal_file:
+                journal_file.truncate(complete_size)
+
+        if params is None:
+            return False
+
+        # Compares the settings as JSON values (like lists instead of tuples)
+        if params != json.loads(json.dumps(self.params)):
+            raise ValueError("journal " + self.journal_path + " was written "
+                             "with other settings: " + json.dumps(params))
+        return True
+
+    def load_results(self, class_labels):
+        """
+        Returns the results read back from the journal.
+        Parameters:
+         class_labels - normalized label of each ImageNet class (list of
+                        strings)
+        Returns:
+         results_dic - ResultsStore of the journaled results
+        """
+        return journal_results(self.rows, class_labels)
+
+    def append(self, results_dic):
+        """
+        Appends the results of a chunk of images & flushes them to disk.
+        Parameters:
+         results_dic - ResultsStore of the chunk
+        Returns:
+         None
+        """
+        self.write_lines([json.dumps([filename, results_dic.pet_label(row),
+                                      int(results_dic.class_ids[row]),
+                                      int(results_dic.match[row])])
+                          for row, filename in
+                          enumerate(results_dic.filenames)])
+        self.n_results += len(results_dic)
+
+    def finish(self):
+        """
+        Marks the journal as complete - every image of the run has its result
+        in it.
+        Parameters:
+         None
+        Returns:
+         None
+        """
+        self.write_lines([json.dumps({'complete': self.n_results})])
+
+    def write_lines(self, lines):
+        """
+        Writes lines to the journal & flushes them to disk so they survive a
+        crash.
+        Parameters:
+         lines - lines without newlines (list of strings)
+        Returns:
+         None
+        """
+        if not lines:
+            return
+        self.journal_file.write('\n'.join(lines) + '\n')
+        self.journal_file.flush()
+        os.fsync(self.journal_file.fileno())
+
+    def close(self):
+        """
+        Closes the journal file.
+        """
+        self.journal_file.close()
+
+
+def read_journal(journal_path):
+    """
+    Reads a journal file, ignoring a partly written last line.
+    Parameters:
+     journal_path - path to the journal file (string)
+    Returns:
+     params - settings of the run from the header, None if the header wasn't
+              written (dictionary)
+     rows - [filename, pet label, class index, match] of each result, in the
+            order they were written (list of lists)
+     complete_count - count of results when the journal was marked complete
+                      if that's its last line, otherwise None (int)
+     complete_size - bytes of the file that were completely written (int)
+    """
+    with open(journal_path, 'rb') as journal_file:
+        content = journal_file.read()
+
+    # Only lines ending with a newline were completely written
+    complete_size = content.rfind(b'\n') + 1
+    lines = content[:complete_size].decode('utf-8').splitlines()
+    if not lines:
+        return None, [], None, complete_size
+
+    # Result lines are lists, the complete marks are dictionaries - a resumed
+    # run can leave an old mark in the middle, only the last line counts
+    rows = []
+    complete_count = None
+    for line in lines[1:]:
+        value = json.loads(line)
+        if isinstance(value, dict):
+            complete_count = value['complete']
+        else:
+            rows.append(value)
+            complete_count = None
+    return json.loads(lines[0]), rows, complete_count, complete_size
+
+
+def journal_results(rows, class_labels):
+    """
+    Returns the results of journal rows as a ResultsStore.
+    Parameters:
+     rows - [filename, pet label, class index, match] of each result (list of
+            lists)
+     class_labels - normalized label of each ImageNet class (list of strings)
+    Returns:
+     results_dic - ResultsStore of the results, in the order of rows
+    """
+    pet_labels = sorted(set(row[1] for row in rows))
+    codes = dict((label, code) for code, label in enumerate(pet_labels))
+    return ResultsStore([row[0] for row in rows], pet_labels,
+                        np.array([codes[row[1]] for row in rows],
+                                 dtype=np.int32),
+                        class_labels,
+                        np.array([row[2] for row in rows], dtype=np.int16),
+                        np.array([row[3] for row in rows], dtype=np.uint8))
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/results_stats.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Is-a-dog adjustment, statistics & printing of the results of a run
+#          (a ResultsStore). These don't need pytorch or the models, so
+#          merge_shards.py can calculate the statistics of a sharded run on a
+#          machine without them, exactly as check_images_solution.py does.
+#
+#   Example use:
+#    adjust_results4_isadog(results_dic, 'dognames.txt')
+#    results_stats = calculates_results_stats(results_dic)
+#    print_results(results_dic, results_stats, 'vgg', True, True)
+##
+
+# Imports python modules
+import numpy as np
+
+# Imports index of categories (like dogs) over the ImageNet classes
+from category_index import get_category_index
+
+def adjust_results4_isadog(results_dic, dogsfile):
+    """
+    Adjusts the results dictionary to determine if classifier correctly 
+    classified images 'as a dog' or 'not a dog' especially when not a match. 
+    Demonstrates if model architecture correctly classifies dog images even if
+    it gets dog breed wrong (not a match).
+    Parameters:
+      results_dic - ResultsStore of the results (see compare_labels()), as a
+                    Dictionary with key as image filename and value as a List 
+             (index)idx 0 = pet image label (string)
+                    idx 1 = classifier label (string)
+                    idx 2 = 1/0 (int)  where 1 = match between pet image and 
+                            classifer labels and 0 = no match between labels
+                    --- where idx 3 & idx 4 are added by this function ---
+                    idx 3 = 1/0 (int)  where 1 = pet image 'is-a' dog and 
+                            0 = pet Image 'is-NOT-a' dog. 
+                    idx 4 = 1/0 (int)  where 1 = Classifier classifies image 
+                            'as-a' dog and 0 = Classifier classifies image  
+                            'as-NOT-a' dog.
+     dogsfile - A text file that contains names of all dogs from ImageNet 
+                1000 labels (used by classifier model) and dog names from
+                the pet image files. This file has one dog name per line
+                dog names are all in lowercase with spaces separating the 
+                distinct words of the dogname. This file should have been
+                passed in as a command line argument. (string - indicates 
+                text file's name)
+    Returns:
+           None - results_dic is mutable data type so no return needed.
+    """           
+    # Gets the index of the dognames file over the ImageNet labels of the
+    # results - the file is only read the first time, into a mask over the
+    # ImageNet classes & the set of dognames
+    category_index = get_category_index([dogsfile], results_dic.class_labels)
+    
+    # Add to whether pet labels & classifier labels are dogs by setting the
+    # two is-a-dog columns of results_dic (the dictionary view gets them as
+    # List Index 3 = whether(1) or not(0) Pet Image Label is a dog AND 
+    # List Index 4 = whether(1) or not(0) Classifier Label is a dog)
+    # How - each distinct pet label is looked up in the dognames once and 
+    # indexed by the pet label codes, classifier labels index the mask of dog
+    # classes with their class index - label "is a dog" =1 otherwise =0 
+    # "not a dog"
+    pet_is_dog = category_index.label_mask(dogsfile, results_dic.pet_labels)
+    clf_is_dog = category_index.class_mask(dogsfile)
+    results_dic.set_is_dog(pet_is_dog[results_dic.pet_codes],
+                           clf_is_dog[results_dic.class_ids])
+
+
+def calculates_results_stats(results_dic):
+    """
+    Calculates statistics of the results of the run using classifier's model 
+    architecture on classifying images. Then puts the results statistics in a 
+    dictionary (results_stats) so that it's returned for printing as to help
+    the user to determine the 'best' model for classifying images. Note that 
+    the statistics calculated as the results are either percentages or counts.
+    Parameters:
+      results_dic - ResultsStore of the results (see compare_labels()), as a
+                    Dictionary with key as image filename and value as a List 
+             (index)idx 0 = pet image label (string)
+                    idx 1 = classifier label (string)
+                    idx 2 = 1/0 (int)  where 1 = match between pet image and 
+                            classifer labels and 0 = no match between labels
+                    idx 3 = 1/0 (int)  where 1 = pet image 'is-a' dog and 
+                            0 = pet Image 'is-NOT-a' dog. 
+                    idx 4 = 1/0 (int)  where 1 = Classifier classifies image 
+                            'as-a' dog and 0 = Classifier classifies image  
+                            'as-NOT-a' dog.
+    Returns:
+     results_stats - Dictionary that contains the results statistics (either a
+                     percentage or a count) where the key is the statistic's 
+                     name (starting with 'pct' for percentage or 'n' for count)
+                     and the value is the statistic's value 
+    """
+    # creates empty dictionary for results_stats
+    results_stats=dict()
+
+    # Columns of results as booleans - counts are made over whole columns
+    # instead of processing through the results one image at a time
+    match = results_dic.match.astype(bool)
+    pet_is_dog = results_dic.pet_is_dog.astype(bool)
+    clf_is_dog = results_dic.clf_is_dog.astype(bool)
+    
+    # Pet Image Label is a Dog - counts number of dog images
+    results_stats['n_dogs_img'] = int(np.count_nonzero(pet_is_dog))
+
+    # Labels Match Exactly
+    results_stats['n_match'] = int(np.count_nonzero(match))
+
+    # Classifier classifies image as Dog (& pet image is a dog)
+    # counts number of correct dog classifications
+    results_stats['n_correct_dogs'] = int(np.count_nonzero(pet_is_dog &
+                                                           clf_is_dog))
+
+    # Classifier classifies image as NOT a Dog(& pet image isn't a dog)
+    # counts number of correct NOT dog clasifications.
+    results_stats['n_correct_notdogs'] = int(np.count_nonzero(~pet_is_dog &
+                                                              ~clf_is_dog))
+
+    # Pet Image Label is a Dog AND Labels match- counts Correct Breed
+    results_stats['n_correct_breed'] = int(np.count_nonzero(match &
+                                                            pet_is_dog &
+                                                            clf_is_dog))
+
+    # Calculates run statistics (counts & percentages) below that are calculated
+    # using counts from above.
+    
+    # calculates number of total images
+    results_stats['n_images'] = len(results_dic)
+
+    # calculates number of not-a-dog images using - images & dog images counts
+    results_stats['n_notdogs_img'] = (results_stats['n_images'] - 
+                                      results_stats['n_dogs_img']) 
+
+    # Calculates % correct for matches
+    results_stats['pct_match'] = (results_stats['n_match'] / 
+                                  results_stats['n_images'])*100.0
+    
+    # Calculates % correct dogs
+    results_stats['pct_correct_dogs'] = (results_stats['n_correct_dogs'] / 
+                                         results_stats['n_dogs_img'])*100.0    
+
+    # Calculates % correct breed of dog
+    results_stats['pct_correct_breed'] = (results_stats['n_correct_breed'] / 
+                                          results_stats['n_dogs_img'])*100.0
+
+    # Calculates % correct not-a-dog images
+    # Uses conditional statement for when no 'not a dog' images were submitted 
+    if results_stats['n_notdogs_img'] > 0:
+        results_stats['pct_correct_notdogs'] = (results_stats['n_correct_notdogs'] /
+                                                results_stats['n_notdogs_img'])*100.0
+    else:
+        results_stats['pct_correct_notdogs'] = 0.0
+        
+    # returns results_stast dictionary 
+    return results_stats
+
+
+def print_results(results_dic, results_stats, model, 
+                  print_incorrect_dogs = False, print_incorrect_breed = False):
+    """
+    Prints summary results on the classification and then prints incorrectly 
+    classified dogs and incorrectly classified dog breeds if user indicates 
+    they want those printouts (use non-default values)
+    Parameters:
+      results_dic - ResultsStore of the results (see compare_labels()), as a
+                    Dictionary with key as image filename and value as a List 
+             (index)idx 0 = pet image label (string)
+                    idx 1 = classifier label (string)
+                    idx 2 = 1/0 (int)  where 1 = match between pet image and 
+                            classifer labels and 0 = no match between labels
+                    idx 3 = 1/0 (int)  where 1 = pet image 'is-a' dog and 
+                            0 = pet Image 'is-NOT-a' dog. 
+                    idx 4 = 1/0 (int)  where 1 = Classifier classifies image 
+                            'as-a' dog and 0 = Classifier classifies image  
+                            'as-NOT-a' dog.
+      results_stats - Dictionary that contains the results statistics (either a
+                     percentage or a count) where the key is the statistic's 
+                     name (starting with 'pct' for percentage or 'n' for count)
+                     and the value is the statistic's value 
+      model - pretrained CNN whose architecture is indicated by this parameter,
+              values must be: resnet alexnet vgg (string)
+      print_incorrect_dogs - True prints incorrectly classified dog images and 
+                             False doesn't print anything(default) (bool)  
+      print_incorrect_breed - True prints incorrectly classified dog breeds and 
+                              False doesn't print anything(default) (bool) 
+    Returns:
+           None - simply printing results.
+    """    
+    # Prints summary statistics over the run
+    print("\n\n*** Results Summary for CNN Model Architecture",model.upper(), 
+          "***")
+    print("%20s: %3d" % ('N Images', results_stats['n_images']))
+    print("%20s: %3d" % ('N Dog Images', results_stats['n_dogs_img']))
+    print("%20s: %3d" % ('N Not-Dog Images', results_stats['n_notdogs_img']))
+
+    # Prints summary statistics (percentages) on Model Run
+    print(" ")
+    for key in results_stats:
+        if key[0] == "p":
+            print("%20s: %5.1f" % (key, results_stats[key]))
+    
+
+    # IF print_incorrect_dogs == True AND there were images incorrectly 
+    # classified as dogs or vice versa - print out these cases
+    if (print_incorrect_dogs and 
+        ( (results_stats['n_correct_dogs'] + results_stats['n_correct_notdogs'])
+          != results_stats['n_images'] ) 
+       ):
+        print("\nINCORRECT Dog/NOT Dog Assignments:")
+
+        # process through results, printing incorrectly classified dogs -
+        # Pet Image Label is a Dog - Classified as NOT-A-DOG -OR- 
+        # Pet Image Label is NOT-a-Dog - Classified as a-DOG
+        for row in np.flatnonzero(results_dic.pet_is_dog !=
+                                  results_dic.clf_is_dog):
+            print("Real: %-26s   Classifier: %-30s" % (
+                  results_dic.pet_label(row),
+                  results_dic.classifier_label(row)))
+
+    # IF print_incorrect_breed == True AND there were dogs whose breeds 
+    # were incorrectly classified - print out these cases                    
+    if (print_incorrect_breed and 
+        (results_stats['n_correct_dogs'] != results_stats['n_correct_breed']) 
+       ):
+        print("\nINCORRECT Dog Breed Assignment:")
+
+        # process through results, printing incorrectly classified breeds -
+        # Pet Image Label is-a-Dog, classified as-a-dog but is WRONG breed
+        for row in np.flatnonzero((results_dic.pet_is_dog == 1) &
+                                  (results_dic.clf_is_dog == 1) &
+                                  (results_dic.match == 0)):
+            print("Real: %-26s   Classifier: %-30s" % (
+                  results_dic.pet_label(row),
+                  results_dic.classifier_label(row)))
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/results_store.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Columnar store of the results of classifying the pet images. A
+#          results_dic of one python list per image costs a lot of memory and
+#          time at millions of images, so the results are kept as one numpy
+#          array per column instead:
+#           - pet image labels    - codes into the distinct pet image labels
+#           - classifier labels   - ImageNet class indexes into the
+#                                   normalized ImageNet labels
+#           - match, pet label is-a-dog, classifier label is-a-dog - 1/0
+#          Statistics are counted over whole columns at once. ResultsStore is
+#          also a read-only dictionary with the old results_dic shape - key
+#          as image filename & value as the list [pet label, classifier label,
+#          match(, is-a-dog, classifier is-a-dog)] - for code that still
+#          expects results_dic.
+#
+#   Example use:
+#    results_dic = ResultsStore(filenames, pet_labels, pet_codes,
+#                               label_table.normalized, class_ids, matches)
+#    n_match = int(np.count_nonzero(results_dic.match))
+#    pet_label, classifier_label, match = results_dic[filename]
+##
+
+# Imports python modules
+from collections.abc import Mapping
+
+import numpy as np
+
+
+class ResultsStore(Mapping):
+    """
+    Results of classifying images, one numpy array per column, in the same
+    order as filenames.
+    Parameters:
+     filenames - pet image filenames (list of strings)
+     pet_labels - distinct pet image labels, the categories of pet_codes
+                  (list of strings)
+     pet_codes - index into pet_labels of each image's pet image label (int
+                 numpy array)
+     class_labels - normalized label of each ImageNet class, the categories
+                    of class_ids (list of strings)
+     class_ids - ImageNet class index of each image's classifier label (int
+                 numpy array)
+     match - 1/0 match between each image's pet image & classifier labels
+             (int numpy array)
+    """
+    def __init__(self, filenames, pet_labels, pet_codes, class_labels,
+                 class_ids, match):
+        self.filenames = filenames
+        self.pet_labels = pet_labels
+        self.pet_codes = np.asarray(pet_codes, dtype=np.int32)
+        self.class_labels = class_labels
+        self.class_ids = np.asarray(class_ids, dtype=np.int16)
+        self.match = np.asarray(match, dtype=np.uint8)
+
+        # 1/0 is-a-dog columns, set by set_is_dog() (see
+        # adjust_results4_isadog())
+        self.pet_is_dog = None
+        self.clf_is_dog = None
+
+        # Row of each filename, only built if the dictionary view is used
+        self.rows = None
+
+    def set_is_dog(self, pet_is_dog, clf_is_dog):
+        """
+        Sets whether each image's pet image label & classifier label are dogs.
+        Parameters:
+         pet_is_dog - 1/0 (or bool) pet image label is-a-dog of each image
+                      (numpy array)
+         clf_is_dog - 1/0 (or bool) classifier label is-a-dog of each image
+                      (numpy array)
+        Returns:
+         None
+        """
+        self.pet_is_dog = np.asarray(pet_is_dog, dtype=np.uint8)
+        self.clf_is_dog = np.asarray(clf_is_dog, dtype=np.uint8)
+
+    def pet_label(self, row):
+        """
+        Returns the pet image label of the image in a row.
+        Parameters:
+         row - row of the image (int)
+        Returns:
+         pet_label - pet image label (string)
+        """
+        return self.pet_labels[self.pet_codes[row]]
+
+    def classifier_label(self, row):
+        """
+        Returns the (normalized) classifier label of the image in a row.
+        Parameters:
+         row - row of the image (int)
+        Returns:
+         classifier_label - classifier label (string)
+        """
+        return self.class_labels[self.class_ids[row]]
+
+    def row_values(self, row):
+        """
+        Returns the results of the image in a row in the old results_dic shape.
+        Parameters:
+         row - row of the image (int)
+        Returns:
+         values - [pet label, classifier label, match] plus [pet is-a-dog,
+                  classifier is-a-dog] once set_is_dog() was called (list)
+        """
+        values = [self.pet_label(row), self.classifier_label(row),
+                  int(self.match[row])]
+        if self.pet_is_dog is not None:
+            values.extend((int(self.pet_is_dog[row]),
+                           int(self.clf_is_dog[row])))
+        return values
+
+    def as_dict(self):
+        """
+        Returns the results as a plain results_dic.
+        Parameters:
+         None
+        Returns:
+         results_dic - Dictionary with key as image filename and value as the
+                       list of row_values()
+        """
+        return dict((filename, self.row_values(row))
+                    for row, filename in enumerate(self.filenames))
+
+    # Read-only dictionary view with the old results_dic shape
+    def __getitem__(self, filename):
+        if self.rows is None:
+            self.rows = dict((name, row) for row, name in
+                             enumerate(self.filenames))
+        return self.row_values(self.rows[filename])
+
+    def __iter__(self):
+        return iter(self.filenames)
+
+    def __len__(self):
+        return len(self.filenames)
+
+
+def concat_results(stores, class_labels):
+    """
+    Joins ResultsStores of consecutive chunks of images into one ResultsStore,
+    merging the distinct pet image labels of the chunks.
+    Parameters:
+     stores - ResultsStores over the same class_labels, in order (list)
+     class_labels - normalized label of each ImageNet class (list of strings)
+    Returns:
+     results_dic - ResultsStore of all the images, in the order of stores
+    """
+    if len(stores) == 1:
+        return stores[0]
+
+    # Codes of each chunk are mapped onto the merged distinct pet labels
+    pet_labels = sorted(set(label for store in stores
+                            for label in store.pet_labels))
+    codes = dict((label, code) for code, label in enumerate(pet_labels))
+    pet_codes = [np.array([codes[label] for label in store.pet_labels],
+                          dtype=np.int32)[store.pet_codes]
+                 for store in stores]
+
+    def concat(columns, dtype):
+        return np.concatenate(columns) if columns else np.zeros(0, dtype)
+
+    results_dic = ResultsStore(
+        [filename for store in stores for filename in store.filenames],
+        pet_labels, concat(pet_codes, np.int32), class_labels,
+        concat([store.class_ids for store in stores], np.int16),
+        concat([store.match for store in stores], np.uint8))
+
+    # is-a-dog columns are kept if every chunk has them
+    if stores and all(store.pet_is_dog is not None for store in stores):
+        results_dic.set_is_dog(
+            concat([store.pet_is_dog for store in stores], np.uint8),
+            concat([store.clf_is_dog for store in stores], np.uint8))
+    return results_dic
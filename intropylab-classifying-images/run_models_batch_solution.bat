@@ -12,6 +12,6 @@ REM
 REM Usage: run_models_batch_solution.bat  -- will run program from commandline on Window OS
 REM 
 @echo on
-python check_images_solution.py --dir pet_images/ --arch resnet  --dogfile dognames.txt > resnet_solution.txt
-python check_images_solution.py --dir pet_images/ --arch alexnet  --dogfile dognames.txt > alexnet_solution.txt
-python check_images_solution.py --dir pet_images/ --arch vgg  --dogfile dognames.txt > vgg_solution.txt
+python check_images_solution.py --dir pet_images/ --arch resnet  --dogfile dognames.txt --cache_dir tensor_cache/ > resnet_solution.txt
+python check_images_solution.py --dir pet_images/ --arch alexnet  --dogfile dognames.txt --cache_dir tensor_cache/ > alexnet_solution.txt
+python check_images_solution.py --dir pet_images/ --arch vgg  --dogfile dognames.txt --cache_dir tensor_cache/ > vgg_solution.txt
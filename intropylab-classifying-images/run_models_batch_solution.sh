@@ -9,6 +9,6 @@
 #
 # Usage: sh run_models_batch_solution.sh  -- will run program from commandline
 #  
-python check_images_solution.py --dir pet_images/ --arch resnet  --dogfile dognames.txt > resnet_solution.txt
-python check_images_solution.py --dir pet_images/ --arch alexnet  --dogfile dognames.txt > alexnet_solution.txt
-python check_images_solution.py --dir pet_images/ --arch vgg  --dogfile dognames.txt > vgg_solution.txt
+python check_images_solution.py --dir pet_images/ --arch resnet  --dogfile dognames.txt --cache_dir tensor_cache/ > resnet_solution.txt
+python check_images_solution.py --dir pet_images/ --arch alexnet  --dogfile dognames.txt --cache_dir tensor_cache/ > alexnet_solution.txt
+python check_images_solution.py --dir pet_images/ --arch vgg  --dogfile dognames.txt --cache_dir tensor_cache/ > vgg_solution.txt
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/tensor_cache.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: On-disk cache of decoded & cropped images. Every architecture in
+#          classifier.py uses the same Resize/CenterCrop preprocessing, so the
+#          224x224 crop of an image is stored once as a uint8 array keyed by
+#          a hash of the image file's contents and the preprocessing
+#          parameters. Later runs (and runs with other architectures) load the
+#          crop from the cache with a memory map instead of decoding the JPEG.
+#          The cache evicts the least recently used crops when it grows past
+#          its size limit, down to a low watermark below the limit so the
+#          folder isn't scanned again on the very next miss. Worker processes only write crops & return the
+#          bytes they wrote - the size is kept & the crops are evicted by the
+#          process that owns the cache, in record().
+#
+#   Example use:
+#    tensor_cache = TensorCache('tensor_cache/', crop_params)
+#    labels = classify_batch(img_paths, 'vgg', tensor_cache=tensor_cache)
+#    tensor_cache.print_stats()
+##
+
+# Imports python modules
+import hashlib
+import os
+
+import numpy as np
+
+
+class TensorCache(object):
+    """
+    Stores the uint8 224x224 crop of each image in its own .npy file in
+    cache_dir, named by the hash of the image file's contents and the
+    preprocessing parameters so a changed image or changed preprocessing never
+    returns a stale crop.
+    Parameters:
+     cache_dir - folder that holds the cached crops, created if missing
+                 (string)
+     params - description of the preprocessing that produced the crops, part
+              of every key (string)
+     max_bytes - most bytes the cached crops may take up on disk before the
+                 least recently used ones are removed (int)
+     low_water - fraction of max_bytes the cache is evicted down to, so each
+                 eviction makes room for many more crops (float)
+    """
+    def __init__(self, cache_dir, params, max_bytes=2**30, low_water=0.9):
+        self.cache_dir = cache_dir
+        self.params = params
+        self.max_bytes = max_bytes
+        self.low_water_bytes = int(max_bytes * low_water)
+
+        # Counters for print_stats() - only updated by record() in the process
+        # that owns the cache, worker processes just read & write crops (a
+        # worker gets a copy of the cache, so its counters would be lost)
+        self.n_hits = 0
+        self.n_misses = 0
+        self.bytes_saved = 0
+        self.n_evictions = 0
+
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+        # Total size of the cached crops, kept up to date by record() with
+        # the bytes each put() wrote so the folder only needs to be scanned
+        # again when evicting
+        self.n_bytes = sum(entry.stat().st_size for entry in
+                           os.scandir(cache_dir) if entry.name.endswith('.npy'))
+
+    def image_key(self, img_path):
+        """
+        Returns the key of an image - the hash of the preprocessing parameters
+        and the image file's contents.
+        Parameters:
+         img_path - path to the image file (string)
+        Returns:
+         key - hexadecimal hash (string)
+        """
+        key_hash = hashlib.sha1(self.params.encode('utf-8'))
+        with open(img_path, 'rb') as img_file:
+            key_hash.update(img_file.read())
+        return key_hash.hexdigest()
+
+    def get(self, key):
+        """
+        Returns the cached crop for key, or None if it isn't cached.
+        Parameters:
+         key - key from image_key() (string)
+        Returns:
+         crop - 224x224(x3) uint8 numpy array or None
+        """
+        crop_path = os.path.join(self.cache_dir, key + '.npy')
+        try:
+            crop = np.load(crop_path, mmap_mode='r')
+        except (IOError, OSError, ValueError):
+            return None
+
+        # Marks the crop as recently used so evict() keeps it
+        os.utime(crop_path, None)
+
+        # Copies out of the memory map - transforms expect a writable array
+        return np.array(crop)
+
+    def put(self, key, crop):
+        """
+        Stores the crop for key. Can run in a worker process, so the size of
+        the cache isn't updated here - the bytes written are returned to be
+        given to record() by the process that owns the cache.
+        Parameters:
+         key - key from image_key() (string)
+         crop - 224x224(x3) uint8 numpy array
+        Returns:
+         n_bytes - bytes written to the cache (int)
+        """
+        crop_path = os.path.join(self.cache_dir, key + '.npy')
+
+        # Writes to a temporary file first so another process never loads a
+        # partly written crop
+        tmp_path = crop_path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_path, 'wb') as crop_file:
+            np.save(crop_file, np.ascontiguousarray(crop, dtype=np.uint8))
+        os.replace(tmp_path, crop_path)
+        return os.path.getsize(crop_path)
+
+    def evict(self):
+        """
+        Removes the least recently used crops until the cache is at most
+        low_water_bytes in size - the folder is scanned once per eviction, so
+        evicting only just under max_bytes would scan it on every miss.
+        Parameters:
+         None
+        Returns:
+         None
+        """
+        entries = [entry for entry in os.scandir(self.cache_dir)
+                   if entry.name.endswith('.npy')]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+
+        self.n_bytes = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if self.n_bytes <= self.low_water_bytes:
+                break
+            try:
+                os.remove(entry.path)
+                self.n_evictions += 1
+            except OSError:
+                # already removed by another process
+                pass
+            self.n_bytes -= entry.stat().st_size
+
+    def record(self, img_path, hit, n_bytes=0):
+        """
+        Counts one lookup for print_stats() & adds the bytes put() wrote for
+        it to the size of the cache, evicting the least recently used crops
+        if the cache grows past max_bytes.
+        Parameters:
+         img_path - path to the image file that was looked up (string)
+         hit - True if the crop came from the cache (bool)
+         n_bytes - bytes put() wrote for the image, 0 for none (int)
+        Returns:
+         None
+        """
+        if hit:
+            self.n_hits += 1
+            self.bytes_saved += os.path.getsize(img_path)
+        else:
+            self.n_misses += 1
+
+        self.n_bytes += n_bytes
+        if self.n_bytes > self.max_bytes:
+            self.evict()
+
+    def print_stats(self):
+        """
+        Prints the hit rate of the cache and how many bytes of image files
+        didn't need to be decoded.
+        Parameters:
+         None
+        Returns:
+         None - simply printing results.
+        """
+        n_lookups = self.n_hits + self.n_misses
+        hit_rate = (self.n_hits / n_lookups) * 100.0 if n_lookups > 0 else 0.0
+        print("\n*** Tensor Cache Statistics ***")
+        print("%20s: %d" % ('N Hits', self.n_hits))
+        print("%20s: %d" % ('N Misses', self.n_misses))
+        print("%20s: %5.1f" % ('pct_hit', hit_rate))
+        print("%20s: %.1f MB" % ('Decode Bytes Saved', self.bytes_saved / 2**20))
+        print("%20s: %.1f MB" % ('Cache Size', self.n_bytes / 2**20))
+        print("%20s: %d" % ('N Evictions', self.n_evictions))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_image_scanner.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Tests the streaming scanner of a folder of images
+#          (image_scanner.py) - only image files are found, hidden files &
+#          folders are skipped - and that the hash-based shards of the images
+#          are disjoint and together cover every image, as merge_shards.py
+#          expects.
+#
+# Usage: python -m pytest test_image_scanner.py
+##
+
+# Imports python modules
+import os
+
+import pytest
+
+# Imports scanner of the folder of images & its sharding
+from image_scanner import (scan_images, parse_shard, shard_records,
+                           filename_label)
+
+# Image files of the temporary folder, relative to it
+image_paths = ['Beagle_01125.jpg', 'cat_01.JPG', 'Boxer_02426.png',
+               os.path.join('dogs', 'Collie_03797.jpg'),
+               os.path.join('dogs', 'Great_dane_05320.jpeg'),
+               os.path.join('dogs', 'more', 'Poodle_07927.jpg'),
+               os.path.join('others', 'gecko_80.bmp')]
+
+# Files that aren't scanned - not images, or hidden
+skipped_paths = ['notes.txt', 'dognames', '.DS_Store', '.hidden_01.jpg',
+                 os.path.join('dogs', 'labels.csv'),
+                 os.path.join('.thumbnails', 'Beagle_01125.jpg')]
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    for rel_path in image_paths + skipped_paths:
+        file_path = tmp_path / rel_path
+        if not file_path.parent.is_dir():
+            file_path.parent.mkdir(parents=True)
+        file_path.write_bytes(b'')
+    return str(tmp_path)
+
+
+def test_scan_finds_only_images(image_dir):
+    records = list(scan_images(image_dir))
+    assert sorted(rel_path for rel_path, _ in records) == sorted(image_paths)
+    labels = dict(records)
+    assert labels['Beagle_01125.jpg'] == 'beagle'
+    assert labels[os.path.join('dogs', 'Great_dane_05320.jpeg')] == \
+        'great dane'
+
+
+@pytest.mark.parametrize('n_shards', [1, 2, 3, 5])
+def test_shards_are_disjoint_and_cover_every_image(image_dir, n_shards):
+    shards = [set(shard_records(scan_images(image_dir), shard_index,
+                                n_shards))
+              for shard_index in range(n_shards)]
+    for shard_index in range(n_shards):
+        for other_index in range(shard_index + 1, n_shards):
+            assert not shards[shard_index] & shards[other_index]
+    assert set.union(*shards) == set(scan_images(image_dir))
+
+    # The same image always falls in the same shard
+    assert shards == [set(shard_records(scan_images(image_dir), shard_index,
+                                        n_shards))
+                      for shard_index in range(n_shards)]
+
+
+def test_parse_shard():
+    assert parse_shard('2/4') == (2, 4)
+    for shard in ('4/4', '1', 'a/4', '-1/4'):
+        with pytest.raises(ValueError):
+            parse_shard(shard)
+
+
+def test_filename_label():
+    assert filename_label('Boston_terrier_02259.jpg') == 'boston terrier'
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_merge_shards.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Tests that merging the results journals of a sharded run
+#          (merge_shards.py) gives exactly the results & statistics of a
+#          single run over all the images. Only needs numpy - merge_shards.py
+#          doesn't import pytorch or the models.
+#
+# Usage: python -m pytest test_merge_shards.py
+##
+
+# Imports python modules
+import pytest
+
+# Imports merging of the shards & the statistics of the results
+from merge_shards import merge_journals, label_table
+from results_stats import adjust_results4_isadog, calculates_results_stats
+
+# Imports columnar store of the results, journal & sharding of the images
+from results_store import ResultsStore
+from results_journal import ResultsJournal
+from image_scanner import image_shard
+
+n_shards = 3
+params = {'dir': 'pet_images/', 'arch': 'vgg', 'backend': 'torch'}
+
+# Pet image filename, pet image label & ImageNet class index of each image -
+# dogs & not dogs, matches & wrong breeds
+images = [('Beagle_01125.jpg', 'beagle', 162),
+          ('Beagle_01141.jpg', 'beagle', 231),
+          ('Basenji_00963.jpg', 'basenji', 253),
+          ('Collie_03797.jpg', 'collie', 231),
+          ('Great_dane_05320.jpg', 'great dane', 246),
+          ('cat_01.jpg', 'cat', 281),
+          ('cat_02.jpg', 'cat', 282),
+          ('cat_07.jpg', 'cat', 162),
+          ('fox_squirrel_01.jpg', 'fox squirrel', 335),
+          ('gecko_02.jpg', 'gecko', 281),
+          ('Dalmatian_04017.jpg', 'dalmatian', 246),
+          ('Boxer_02426.jpg', 'boxer', 162)]
+
+
+def results_of(rows):
+    """
+    Returns the ResultsStore of (filename, pet label, class index) rows, like
+    compare_labels() - a match is the pet label being a word of the
+    classifier label.
+    """
+    pet_labels = sorted(set(row[1] for row in rows))
+    return ResultsStore(
+        [row[0] for row in rows], pet_labels,
+        [pet_labels.index(row[1]) for row in rows], label_table.normalized,
+        [row[2] for row in rows],
+        [int(row[1] in label_table.normalized[row[2]]) for row in rows])
+
+
+def write_shards(tmp_path, shard_indexes):
+    """
+    Journals the results of the images of each shard, like each machine of a
+    sharded run does, & returns the paths of the journals.
+    """
+    journal_paths = []
+    for shard_index in shard_indexes:
+        journal_path = str(tmp_path / ('shard%d.journal' % shard_index))
+        journal = ResultsJournal(journal_path,
+                                 dict(params, shard=[shard_index, n_shards]))
+        shard_rows = [row for row in images
+                      if image_shard(row[0], n_shards) == shard_index]
+        if shard_rows:
+            journal.append(results_of(shard_rows))
+        journal.finish()
+        journal.close()
+        journal_paths.append(journal_path)
+    return journal_paths
+
+
+def test_merged_statistics_equal_single_run(tmp_path):
+    journal_paths = write_shards(tmp_path, range(n_shards))
+    merged_params, merged = merge_journals(journal_paths)
+    assert merged_params == params
+
+    single = results_of(images)
+    adjust_results4_isadog(merged, 'dognames.txt')
+    adjust_results4_isadog(single, 'dognames.txt')
+    assert merged.as_dict() == single.as_dict()
+    assert calculates_results_stats(merged) == \
+        calculates_results_stats(single)
+
+
+def test_missing_shard_is_rejected(tmp_path):
+    journal_paths = write_shards(tmp_path, range(n_shards - 1))
+    with pytest.raises(ValueError, match="missing shards"):
+        merge_journals(journal_paths)
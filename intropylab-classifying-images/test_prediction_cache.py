@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_prediction_cache.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Tests that the persistent cache of classifier labels
+#          (prediction_cache.py) returns the cached class index of an
+#          unchanged image, and misses - so the model runs again - when the
+#          image's bytes change, the model's weights change or another
+#          inference backend is used. The model is replaced by a stub that
+#          counts the images it classifies.
+#
+# Usage: python -m pytest test_prediction_cache.py
+##
+
+# Imports python modules
+import pytest
+
+# prediction_cache.py imports classifier.py, which needs pytorch
+pytest.importorskip('torch')
+pytest.importorskip('torchvision')
+
+# Imports persistent cache of classifier labels & the classifier module
+import classifier
+import prediction_cache
+from prediction_cache import PredictionCache, file_hash, weights_key
+
+
+@pytest.fixture
+def stub_model(monkeypatch):
+    """
+    Replaces the model run by PredictionCache with a stub that returns class
+    index 162 for every image, and the weights fingerprint with 'weights-1'.
+    Returns the list of images the stub classified.
+    """
+    classified = []
+
+    def classify_batch(img_paths, model_name, *args, **kwargs):
+        classified.extend(img_paths)
+        return [162] * len(img_paths)
+
+    monkeypatch.setattr(prediction_cache, 'classify_batch', classify_batch)
+    monkeypatch.setattr(prediction_cache, 'model_fingerprint',
+                        lambda model_name: 'weights-1')
+    monkeypatch.setattr(classifier, 'inference_backend', 'torch')
+    monkeypatch.setattr(classifier, 'image_decoder', 'pil')
+    return classified
+
+
+def write_images(tmp_path, n_images):
+    img_paths = []
+    for idx in range(n_images):
+        img_path = tmp_path / ('image%d.jpg' % idx)
+        img_path.write_bytes(b'image %d' % idx)
+        img_paths.append(str(img_path))
+    return img_paths
+
+
+def test_hit_for_unchanged_images(tmp_path, stub_model):
+    img_paths = write_images(tmp_path, 3)
+    cache = PredictionCache(str(tmp_path / 'predictions.db'))
+    assert cache.classify_batch(img_paths, 'vgg', return_ids=True) == \
+        [162, 162, 162]
+    assert len(stub_model) == 3
+    cache.close()
+
+    # A new run over the same database doesn't run the model
+    cache = PredictionCache(str(tmp_path / 'predictions.db'))
+    assert cache.classify_batch(img_paths, 'vgg', return_ids=True) == \
+        [162, 162, 162]
+    assert len(stub_model) == 3
+    assert (cache.n_from_cache, cache.n_from_model) == (3, 0)
+    assert cache.classify_batch(img_paths[:1], 'vgg') == \
+        [classifier.label_table.names[162]]
+    cache.close()
+
+
+def test_miss_for_changed_bytes(tmp_path, stub_model):
+    img_paths = write_images(tmp_path, 3)
+    cache = PredictionCache(str(tmp_path / 'predictions.db'))
+    cache.classify_batch(img_paths, 'vgg')
+
+    with open(img_paths[1], 'ab') as img_file:
+        img_file.write(b' changed')
+    del stub_model[:]
+    cache.classify_batch(img_paths, 'vgg')
+    assert stub_model == [img_paths[1]]
+    cache.close()
+
+
+def test_miss_for_other_weights(tmp_path, stub_model, monkeypatch):
+    img_paths = write_images(tmp_path, 2)
+    cache = PredictionCache(str(tmp_path / 'predictions.db'))
+    cache.classify_batch(img_paths, 'vgg')
+    image_hash = file_hash(img_paths[0])
+    assert cache.get(image_hash, 'vgg', 'weights-1') == 162
+    assert cache.get(image_hash, 'vgg', 'weights-2') is None
+    assert cache.get(image_hash, 'alexnet', 'weights-1') is None
+
+    monkeypatch.setattr(prediction_cache, 'model_fingerprint',
+                        lambda model_name: 'weights-2')
+    del stub_model[:]
+    cache.classify_batch(img_paths, 'vgg')
+    assert stub_model == img_paths
+    cache.close()
+
+
+def test_other_backend_has_other_key(tmp_path, stub_model, monkeypatch):
+    torch_key = weights_key('vgg')
+
+    # The onnxruntime key is the hash of the .onnx file, which must exist
+    onnx_path = tmp_path / 'vgg.onnx'
+    monkeypatch.setattr(prediction_cache, 'onnx_model_path',
+                        lambda model_name: str(onnx_path))
+    monkeypatch.setattr(classifier, 'inference_backend', 'onnxruntime')
+    with pytest.raises(ValueError):
+        weights_key('vgg')
+    onnx_path.write_bytes(b'onnx model')
+    onnx_key = weights_key('vgg')
+    assert onnx_key.startswith('onnxruntime:')
+    assert onnx_key != torch_key
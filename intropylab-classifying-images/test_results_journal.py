@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_results_journal.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Tests that a run that crashed while writing its journal of results
+#          (results_journal.py) is resumed from the last completely written
+#          result - the partly written line is dropped & cut off the file.
+#
+# Usage: python -m pytest test_results_journal.py
+##
+
+# Imports python modules
+import json
+
+import pytest
+
+# Imports journal of results & columnar store of the results
+from results_journal import ResultsJournal, read_journal
+from results_store import ResultsStore
+
+# Normalized labels of the (few) classes used by the tests
+class_labels = ['beagle', 'tabby, tabby cat', 'great dane']
+params = {'dir': 'pet_images/', 'arch': 'vgg', 'backend': 'torch'}
+
+
+def chunk_results(filenames, pet_labels, class_ids, matches):
+    """
+    Returns the ResultsStore of a chunk of images, like compare_labels().
+    """
+    distinct = sorted(set(pet_labels))
+    return ResultsStore(filenames, distinct,
+                        [distinct.index(label) for label in pet_labels],
+                        class_labels, class_ids, matches)
+
+
+def test_resume_drops_partly_written_line(tmp_path):
+    journal_path = str(tmp_path / 'results.journal')
+
+    journal = ResultsJournal(journal_path, params)
+    journal.append(chunk_results(['Beagle_01.jpg', 'Cat_02.jpg'],
+                                 ['beagle', 'cat'], [0, 1], [1, 1]))
+    journal.append(chunk_results(['Great_dane_03.jpg'], ['great dane'], [0],
+                                 [0]))
+    journal.close()
+
+    # Crashes in the middle of writing the next result
+    with open(journal_path, 'rb') as journal_file:
+        complete = journal_file.read()
+    with open(journal_path, 'ab') as journal_file:
+        journal_file.write(b'["Cat_04.jpg", "cat", 1')
+
+    journal = ResultsJournal(journal_path, params, resume=True)
+    assert journal.rows == [['Beagle_01.jpg', 'beagle', 0, 1],
+                            ['Cat_02.jpg', 'cat', 1, 1],
+                            ['Great_dane_03.jpg', 'great dane', 0, 0]]
+    assert journal.done == set(['Beagle_01.jpg', 'Cat_02.jpg',
+                                'Great_dane_03.jpg'])
+    assert journal.n_results == 3
+
+    # The file is cut back to the last completely written result
+    with open(journal_path, 'rb') as journal_file:
+        assert journal_file.read() == complete
+
+    # The crashed image is classified again & appended after it
+    journal.append(chunk_results(['Cat_04.jpg'], ['cat'], [1], [1]))
+    journal.finish()
+    journal.close()
+    read_params, rows, complete_count, _ = read_journal(journal_path)
+    assert read_params == json.loads(json.dumps(params))
+    assert [row[0] for row in rows] == ['Beagle_01.jpg', 'Cat_02.jpg',
+                                        'Great_dane_03.jpg', 'Cat_04.jpg']
+    assert complete_count == 4
+
+
+def test_resume_rebuilds_results(tmp_path):
+    journal_path = str(tmp_path / 'results.journal')
+
+    journal = ResultsJournal(journal_path, params)
+    journal.append(chunk_results(['Beagle_01.jpg', 'Cat_02.jpg'],
+                                 ['beagle', 'cat'], [0, 2], [1, 0]))
+    journal.close()
+    with open(journal_path, 'ab') as journal_file:
+        journal_file.write(b'["Gre')
+
+    journal = ResultsJournal(journal_path, params, resume=True)
+    results_dic = journal.load_results(class_labels)
+    journal.close()
+    assert results_dic['Beagle_01.jpg'] == ['beagle', 'beagle', 1]
+    assert results_dic['Cat_02.jpg'] == ['cat', 'great dane', 0]
+    assert len(results_dic) == 2
+
+
+def test_resume_with_other_backend_is_rejected(tmp_path):
+    journal_path = str(tmp_path / 'results.journal')
+
+    journal = ResultsJournal(journal_path, params)
+    journal.append(chunk_results(['Beagle_01.jpg'], ['beagle'], [0], [1]))
+    journal.close()
+
+    # Labels of another backend mustn't be mixed into the same run
+    with pytest.raises(ValueError, match="other settings"):
+        ResultsJournal(journal_path, dict(params, backend='onnxruntime'),
+                       resume=True)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# */AIPND/intropylab-classifying-images/test_tensor_cache.py
+#
+# DATE CREATED: 10/17/2026
+# REVISED DATE:             <=(Date Revised - if any)
+# PURPOSE: Tests that the on-disk cache of cropped images (tensor_cache.py)
+#          stays within its size limit when it's filled past it, and that it
+#          evicts down to its low watermark so the cache folder is only
+#          scanned once every few misses instead of on every miss.
+#
+# Usage: python -m pytest test_tensor_cache.py
+##
+
+# Imports python modules
+import os
+
+import numpy as np
+
+# Imports cache of decoded & cropped images
+from tensor_cache import TensorCache
+
+
+def test_fills_past_max_bytes(tmp_path):
+    crop = np.zeros((224, 224, 3), dtype=np.uint8)
+    cache_dir = str(tmp_path / 'tensor_cache')
+
+    # Size of one cached crop, then a cache with room for 20 of them
+    probe = TensorCache(str(tmp_path / 'probe'), 'params')
+    crop_bytes = probe.put('probe', crop)
+    tensor_cache = TensorCache(cache_dir, 'params', max_bytes=20 * crop_bytes)
+
+    # Counts the scans of the cache folder
+    n_scans = [0]
+    evict = tensor_cache.evict
+
+    def counted_evict():
+        n_scans[0] += 1
+        evict()
+    tensor_cache.evict = counted_evict
+
+    for idx in range(50):
+        key = 'crop%02d' % idx
+        tensor_cache.record(__file__, False, tensor_cache.put(key, crop))
+
+    # Each eviction goes down to 18 crops (90% of max_bytes), so the next
+    # one is 3 misses later - 10 evictions of 3 crops after the 20th crop
+    file_names = [name for name in os.listdir(cache_dir)
+                  if name.endswith('.npy')]
+    assert len(file_names) == 20
+    assert tensor_cache.n_evictions == 30
+    assert n_scans[0] == 10
+    assert tensor_cache.n_bytes == sum(
+        os.path.getsize(os.path.join(cache_dir, name)) for name in file_names)
+    assert tensor_cache.n_bytes <= tensor_cache.max_bytes
+    assert tensor_cache.n_misses == 50
+
+    # A new cache over the same folder starts from its size on disk
+    assert TensorCache(cache_dir, 'params').n_bytes == tensor_cache.n_bytes
+
+
+def test_get_returns_put_crop(tmp_path):
+    tensor_cache = TensorCache(str(tmp_path / 'tensor_cache'), 'params')
+    crop = np.arange(224 * 224 * 3, dtype=np.uint64).astype(np.uint8) \
+        .reshape(224, 224, 3)
+    assert tensor_cache.get('missing') is None
+    tensor_cache.put('key', crop)
+    assert np.array_equal(tensor_cache.get('key'), crop)